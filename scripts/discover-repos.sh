@@ -24,9 +24,22 @@
 #   3. Matches by git remote URL (not directory name)
 #   4. Returns first match for each repo
 #
+# Cache:
+#   Each candidate's origin URL is cached in $ENTOURAGE_REPO_CACHE
+#   (default ~/.cache/entourage/repo-index.tsv). A cached entry is reused
+#   while neither the directory nor its .git/config is newer than the
+#   cache file, so repeat calls run no git commands. New or changed
+#   candidates are scanned in parallel. Pass --refresh to rescan all.
+#
 
 set -euo pipefail
 
+CACHE_FILE="${ENTOURAGE_REPO_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/entourage/repo-index.tsv}"
+SCAN_JOBS="${ENTOURAGE_SCAN_JOBS:-8}"
+
+REFRESH=0
+[[ "${1:-}" == "--refresh" ]] && REFRESH=1
+
 # Read JSON input from stdin
 INPUT=$(cat)
 
@@ -39,16 +52,10 @@ if [[ "$REPO_COUNT" -eq 0 ]]; then
     exit 0
 fi
 
-# Build list of candidate directories to search
-build_candidate_list() {
-    local candidates=()
-
-    # Sibling directories (relative to current working directory)
-    if [[ -d ".." ]]; then
-        for dir in ../*/; do
-            [[ -d "$dir" ]] && candidates+=("$(cd "$dir" && pwd)")
-        done
-    fi
+# Directories whose subdirectories are candidates
+build_search_roots() {
+    # Parent of the current directory (sibling directories)
+    [[ -d ".." ]] && (cd .. && pwd)
 
     # Common development directories
     local common_dirs=(
@@ -62,97 +69,122 @@ build_candidate_list() {
     )
 
     for base_dir in "${common_dirs[@]}"; do
-        if [[ -d "$base_dir" ]]; then
-            for dir in "$base_dir"/*/; do
-                [[ -d "$dir" ]] && candidates+=("$(cd "$dir" && pwd)")
-            done
-        fi
+        [[ -d "$base_dir" ]] && printf '%s\n' "$base_dir"
     done
+    return 0
+}
+
+# Build list of candidate directories to search
+build_candidate_list() {
+    local roots="$1"
+    local candidates=() root dir
+
+    while IFS= read -r root; do
+        [[ -z "$root" ]] && continue
+        for dir in "$root"/*/; do
+            [[ -d "$dir" ]] && candidates+=("${dir%/}")
+        done
+    done <<< "$roots"
 
     # Deduplicate and print
-    printf '%s\n' "${candidates[@]}" | sort -u
+    [[ ${#candidates[@]} -gt 0 ]] && printf '%s\n' "${candidates[@]}" | sort -u
+    return 0
 }
 
-# Get normalized git remote URL for a directory
-get_git_remote() {
-    local dir="$1"
-    local remote_url
-
-    remote_url=$(git -C "$dir" config --get remote.origin.url 2>/dev/null) || return 1
+# Print "dir<TAB>origin URL" (empty URL if none) for each directory argument
+scan_remotes() {
+    local dir
+    for dir in "$@"; do
+        printf '%s\t%s\n' "$dir" "$(git -C "$dir" config --get remote.origin.url 2>/dev/null || true)"
+    done
+}
+export -f scan_remotes
 
-    # Normalize URL: convert SSH to comparable format
-    # git@github.com:org/repo.git -> org/repo
-    # https://github.com/org/repo.git -> org/repo
-    # https://github.com/org/repo -> org/repo
+# Scan directories (one per line on stdin) on parallel git processes
+scan_parallel() {
+    tr '\n' '\0' | xargs -0 -n 16 -P "$SCAN_JOBS" bash -c 'scan_remotes "$@"' _
+}
 
-    # Remove .git suffix
-    remote_url="${remote_url%.git}"
+# Print "dir<TAB>origin URL" for every candidate, in candidate order, from
+# the cache where it is still valid and by scanning otherwise, and update
+# the cache. Entries for directories outside today's candidates are kept
+# (other projects' siblings), except ones gone from a searched root.
+index_candidates() {
+    local roots="$1" candidates="$2"
+    local stale="" dir
+
+    # Builtin -nt tests only: no process per candidate
+    while IFS= read -r dir; do
+        if [[ "$REFRESH" -eq 1 || ! -f "$CACHE_FILE" || "$dir" -nt "$CACHE_FILE" \
+              || "$dir/.git/config" -nt "$CACHE_FILE" ]]; then
+            stale+="$dir"$'\n'
+        fi
+    done <<< "$candidates"
 
-    # Handle SSH format: git@github.com:org/repo
-    if [[ "$remote_url" =~ ^git@github\.com:(.+)$ ]]; then
-        echo "${BASH_REMATCH[1]}"
-        return 0
+    mkdir -p "$(dirname "$CACHE_FILE")"
+    local stamp tmp
+    stamp=$(mktemp "${CACHE_FILE}.stamp.XXXXXX")  # Scan start: later changes stay newer than the cache
+    tmp=$(mktemp "${CACHE_FILE}.tmp.XXXXXX")
+
+    # Valid cache entries, then stale candidates rescanned
+    if [[ -f "$CACHE_FILE" ]]; then
+        awk -F '\t' '
+            FILENAME == ARGV[1] { root[$0] = 1; next }
+            FILENAME == ARGV[2] { candidate[$0] = 1; next }
+            FILENAME == ARGV[3] { stale[$0] = 1; next }
+            {
+                parent = $1
+                sub("/[^/]*$", "", parent)
+                if (($1 in stale) || (!($1 in candidate) && (parent in root)) || seen[$1]++) next
+                print
+            }' <(printf '%s\n' "$roots") <(printf '%s\n' "$candidates") \
+               <(printf '%s' "$stale") "$CACHE_FILE" > "$tmp"
     fi
+    printf '%s' "$stale" | scan_parallel >> "$tmp"
 
-    # Handle HTTPS format: https://github.com/org/repo
-    if [[ "$remote_url" =~ ^https://github\.com/(.+)$ ]]; then
-        echo "${BASH_REMATCH[1]}"
-        return 0
-    fi
+    # Candidates the cache never had (e.g. siblings of another project)
+    awk -F '\t' 'FILENAME == ARGV[1] { have[$1] = 1; next } $0 != "" && !($0 in have)' \
+        "$tmp" <(printf '%s\n' "$candidates") | scan_parallel >> "$tmp"
 
-    # Return empty for non-GitHub remotes
-    return 1
+    touch -r "$stamp" "$tmp"
+    mv "$tmp" "$CACHE_FILE"
+    rm -f "$stamp"
+
+    awk -F '\t' 'FILENAME == ARGV[1] { remote[$1] = $2; next } $0 in remote { print $0 "\t" remote[$0] }' \
+        "$CACHE_FILE" <(printf '%s\n' "$candidates")
+}
+
+# Match repos against candidate remotes: each candidate, in order, is
+# assigned to the first repo still unmatched whose github field equals its
+# normalized remote (git@github.com:org/repo or https://github.com/org/repo)
+match_repos() {
+    jq -R -s --argjson repos "$REPOS" '
+        def github_path:
+            sub("\\.git$"; "")
+            | if test("^git@github\\.com:.+$") then sub("^git@github\\.com:"; "")
+              elif test("^https://github\\.com/.+$") then sub("^https://github\\.com/"; "")
+              else empty end;
+        [split("\n")[] | select(length > 0) | split("\t")
+         | select((.[1] // "") != "")
+         | {path: .[0], remote: (.[1] | github_path | ascii_downcase)}]
+        | reduce .[] as $c ({};
+            . as $result
+            | ([$repos[] | . as $repo
+                | select(($repo.github // "") != "" and ($result | has($repo.name) | not)
+                         and ($repo.github | ascii_downcase) == $c.remote)][0]) as $repo
+            | if $repo then .[$repo.name] = $c.path else . end)'
 }
 
 # Main discovery logic
 discover_repos() {
-    local result="{}"
-    local found_count=0
-    local total_needed="$REPO_COUNT"
-
-    # Get list of candidate directories
-    local candidates
-    candidates=$(build_candidate_list)
-
-    # For each candidate directory, check if it matches any needed repo
-    while IFS= read -r candidate_dir; do
-        # Skip if we've found all repos
-        [[ "$found_count" -ge "$total_needed" ]] && break
-
-        # Skip if not a directory or not accessible
-        [[ ! -d "$candidate_dir" ]] && continue
-
-        # Get git remote for this candidate
-        local remote_path
-        remote_path=$(get_git_remote "$candidate_dir" 2>/dev/null) || continue
-
-        # Check each repo to see if it matches
-        for ((i=0; i<REPO_COUNT; i++)); do
-            local repo_name repo_github
-            repo_name=$(echo "$REPOS" | jq -r ".[$i].name")
-            repo_github=$(echo "$REPOS" | jq -r ".[$i].github // empty")
-
-            # Skip if already found
-            if echo "$result" | jq -e ".[\"$repo_name\"]" > /dev/null 2>&1; then
-                continue
-            fi
-
-            # Skip if no github field to match against
-            [[ -z "$repo_github" ]] && continue
-
-            # Compare normalized URLs (case-insensitive)
-            local remote_lower repo_github_lower
-            remote_lower=$(echo "$remote_path" | tr '[:upper:]' '[:lower:]')
-            repo_github_lower=$(echo "$repo_github" | tr '[:upper:]' '[:lower:]')
-            if [[ "$remote_lower" == "$repo_github_lower" ]]; then
-                result=$(echo "$result" | jq --arg name "$repo_name" --arg path "$candidate_dir" '.[$name] = $path')
-                ((found_count++))
-                break
-            fi
-        done
-    done <<< "$candidates"
-
-    echo "$result"
+    local roots candidates
+    roots=$(build_search_roots)
+    candidates=$(build_candidate_list "$roots")
+    if [[ -z "$candidates" ]]; then
+        echo "{}"
+        return
+    fi
+    index_candidates "$roots" "$candidates" | match_repos
 }
 
 # Run discovery
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Context Search Index - SQLite FTS5
+
+Full-text index over a context repo's data/ directory: converted Notion
+Markdown, Notion/Hailer transcripts, WhatsApp chats and Hyprnote sessions.
+Queries return BM25-ranked matches anchored to a file and line, so claims
+can be checked without grepping every document on every question.
+
+Documents are split into paragraph chunks that remember their first line.
+Frontmatter fields (notion_id, title, created, last_edited) are stored as
+filterable columns. `update` is incremental: files whose size and mtime
+are unchanged are skipped, changed files are re-hashed and only reindexed
+when their content differs, and deleted files are dropped.
+
+Indexed files:
+    *.md, *.txt              line numbers are file lines
+    _transcript.json         Hyprnote words joined into speaker turns;
+                             "line" N is the Nth turn
+
+Usage:
+    python search_index.py update [--root data] [--db .claude/state/search-index.db] [--rebuild]
+    python search_index.py query <terms...> [--limit 10] [--path PREFIX] [--notion-id ID]
+                                            [--since DATE] [--until DATE] [--any] [--json]
+                                            [--update]
+    python search_index.py stats
+
+Example:
+    python search_index.py update
+    python search_index.py query supabase pgvector --since 2025-12-01
+    python search_index.py query "vector database" --path transcripts --json
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_ROOT = "data"
+DEFAULT_DB = ".claude/state/search-index.db"
+
+TEXT_SUFFIXES = (".md", ".txt")
+TRANSCRIPT_NAME = "_transcript.json"
+# Directories never holding searchable text (converter assets, raw API exports)
+SKIP_DIRS = {"_assets", "_exports", "node_modules"}
+
+CHUNK_LINES = 20      # Most lines per chunk
+CHUNK_CHARS = 2000    # Most characters per chunk
+# Chunk rowids are doc_id * CHUNK_SPAN + n, so a document's chunks are one rowid range
+CHUNK_SPAN = 1 << 20
+
+BATCH_SIZE = 500      # Documents read ahead and written per transaction during update
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,     -- relative to the indexed root
+    kind TEXT NOT NULL,            -- "text" or "transcript"
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    title TEXT,
+    notion_id TEXT,
+    created TEXT,
+    last_edited TEXT,
+    chunk_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS docs_notion_id ON docs (notion_id);
+CREATE INDEX IF NOT EXISTS docs_last_edited ON docs (last_edited);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+    title, body, line UNINDEXED,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+);
+"""
+
+FRONTMATTER_FIELDS = ("notion_id", "title", "created", "last_edited")
+# Timestamped file names (Notion transcripts: 2025-12-12T01_00_00Z.md)
+NAME_DATE = re.compile(r"(\d{4}-\d{2}-\d{2})(?:T(\d{2})_(\d{2})_(\d{2})Z)?")
+
+
+def get_option(name: str, default: str = None) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+# =============================================================================
+# Document Parsing
+# =============================================================================
+
+def parse_frontmatter(lines: list) -> tuple:
+    """Split YAML frontmatter off a Markdown file.
+
+    Returns (fields, body_start): the flat key/value pairs and the index of
+    the first line after the closing "---". Only plain `key: value` lines
+    are read, which covers what converter.py writes.
+    """
+    if not lines or lines[0].strip() != "---":
+        return {}, 0
+    fields = {}
+    for i, line in enumerate(lines[1:], 1):
+        if line.strip() == "---":
+            return fields, i + 1
+        key, sep, value = line.partition(":")
+        if not sep or line[:1].isspace():
+            continue
+        value = value.strip()
+        if value.startswith('"') and value.endswith('"') and len(value) > 1:
+            value = value[1:-1].replace('\\"', '"')
+        fields[key.strip()] = value
+    return {}, 0  # Unterminated: not frontmatter
+
+
+def date_from_name(path: Path) -> str:
+    """A timestamp from a file or folder name, if it has one."""
+    for name in (path.name, path.parent.name):
+        match = NAME_DATE.search(name)
+        if match:
+            day, hh, mm, ss = match.groups()
+            return f"{day} {hh}:{mm}:{ss} UTC" if hh else day
+    return None
+
+
+def read_text_document(path: Path, data: bytes) -> tuple:
+    """Markdown/text file -> (fields, [(line number, text)])."""
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    fields, body_start = parse_frontmatter(lines) if path.suffix == ".md" else ({}, 0)
+    fields = {key: fields[key] for key in FRONTMATTER_FIELDS if fields.get(key)}
+    if "title" not in fields:
+        heading = next((line for line in lines[body_start:] if line.startswith("# ")), None)
+        fields["title"] = heading[2:].strip() if heading else path.stem
+    if "created" not in fields and "last_edited" not in fields:
+        created = date_from_name(path)
+        if created:
+            fields["created"] = created
+    return fields, [(i + 1, line) for i, line in enumerate(lines) if i >= body_start]
+
+
+def read_transcript(path: Path, data: bytes) -> tuple:
+    """Hyprnote _transcript.json -> (fields, [(turn number, "Speaker N: text")]).
+
+    Consecutive words on the same channel form one turn. Title and
+    creation time come from the session's _meta.json when present.
+    """
+    session = json.loads(data)
+    transcripts = session.get("transcripts", []) if isinstance(session, dict) else None
+    if not isinstance(transcripts, list) or not all(isinstance(t, dict) for t in transcripts):
+        raise ValueError("not a Hyprnote transcript")
+    turns = []
+    channel, words = None, []
+    for transcript in transcripts:
+        for word in transcript.get("words", []):
+            if word.get("channel") != channel and words:
+                turns.append(f"Speaker {channel}: {''.join(words).strip()}")
+                words = []
+            channel = word.get("channel")
+            words.append(word.get("text", ""))
+    if words:
+        turns.append(f"Speaker {channel}: {''.join(words).strip()}")
+
+    fields = {}
+    meta_file = path.parent / "_meta.json"
+    if meta_file.exists():
+        with open(meta_file, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("title"):
+            fields["title"] = meta["title"]
+        if meta.get("created_at"):
+            fields["created"] = meta["created_at"]
+    fields.setdefault("title", path.parent.name)
+    return fields, list(enumerate(turns, 1))
+
+
+def chunk_lines(numbered: list) -> list:
+    """Group (line number, text) pairs into paragraph chunks: [(first line, body)].
+
+    Chunks break at blank lines and are capped at CHUNK_LINES lines or
+    CHUNK_CHARS characters, so a match can be anchored near its line.
+    """
+    chunks = []
+    start, body, size = None, [], 0
+    for number, text in numbered:
+        if not text.strip():
+            if body:
+                chunks.append((start, "\n".join(body)))
+                start, body, size = None, [], 0
+            continue
+        if body and (len(body) >= CHUNK_LINES or size + len(text) > CHUNK_CHARS):
+            chunks.append((start, "\n".join(body)))
+            start, body, size = None, [], 0
+        if start is None:
+            start = number
+        body.append(text)
+        size += len(text)
+    if body:
+        chunks.append((start, "\n".join(body)))
+    return chunks[:CHUNK_SPAN - 1]
+
+
+def read_document(path: Path) -> tuple:
+    """Read and parse one file: (data hash, kind, fields, chunks)."""
+    data = path.read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if path.name == TRANSCRIPT_NAME:
+        fields, numbered = read_transcript(path, data)
+        kind = "transcript"
+    else:
+        fields, numbered = read_text_document(path, data)
+        kind = "text"
+    return digest, kind, fields, chunk_lines(numbered)
+
+
+# =============================================================================
+# Index
+# =============================================================================
+
+def iter_source_files(root: Path):
+    """Yield (relative path, stat) for every indexable file under root."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            if not (name.endswith(TEXT_SUFFIXES) or name == TRANSCRIPT_NAME):
+                continue
+            full = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(full)
+            except FileNotFoundError:
+                continue  # Removed while walking
+            yield os.path.relpath(full, root), stat
+
+
+class SearchIndex:
+    """FTS5 index of the documents under one root directory."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get_meta(self, key: str, default: str = None) -> str:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    # -------------------------------------------------------------------------
+    # Updating
+    # -------------------------------------------------------------------------
+
+    def _delete_chunks(self, doc_id: int) -> None:
+        self.conn.execute("DELETE FROM chunks WHERE rowid >= ? AND rowid < ?",
+                          (doc_id * CHUNK_SPAN, (doc_id + 1) * CHUNK_SPAN))
+
+    def _store(self, rel_path: str, stat, doc_id: int, document: tuple) -> None:
+        digest, kind, fields, chunks = document
+        values = (kind, stat.st_mtime_ns, stat.st_size, digest, fields.get("title"),
+                  fields.get("notion_id"), fields.get("created"), fields.get("last_edited"),
+                  len(chunks))
+        if doc_id is None:
+            doc_id = self.conn.execute(
+                "INSERT INTO docs (kind, mtime_ns, size, hash, title, notion_id, created, "
+                "last_edited, chunk_count, path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                values + (rel_path,),
+            ).lastrowid
+        else:
+            self._delete_chunks(doc_id)
+            self.conn.execute(
+                "UPDATE docs SET kind = ?, mtime_ns = ?, size = ?, hash = ?, title = ?, "
+                "notion_id = ?, created = ?, last_edited = ?, chunk_count = ? WHERE id = ?",
+                values + (doc_id,),
+            )
+        title = fields.get("title", "")
+        self.conn.executemany(
+            "INSERT INTO chunks (rowid, title, body, line) VALUES (?, ?, ?, ?)",
+            [(doc_id * CHUNK_SPAN + n, title, body, line) for n, (line, body) in enumerate(chunks)],
+        )
+
+    def update(self, root: Path, rebuild: bool = False, workers: int = 4) -> dict:
+        """Bring the index in line with the files under root.
+
+        Returns counts of added, updated, unchanged, touched (stat changed,
+        same content) and removed documents.
+        """
+        root = root.resolve()
+        if rebuild or self.get_meta("root") not in (None, str(root)):
+            if self.get_meta("root") not in (None, str(root)):
+                logging.info(f"Index was built for {self.get_meta('root')}, rebuilding for {root}")
+            with self.conn:
+                self.conn.execute("DELETE FROM docs")
+                self.conn.execute("DELETE FROM chunks")
+        with self.conn:
+            self.set_meta("root", str(root))
+
+        known = {path: (doc_id, mtime_ns, size, digest) for doc_id, path, mtime_ns, size, digest
+                 in self.conn.execute("SELECT id, path, mtime_ns, size, hash FROM docs")}
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "touched": 0, "removed": 0}
+
+        # Stat everything first; only files whose size or mtime moved are read
+        changed = []
+        seen = set()
+        for rel_path, stat in iter_source_files(root):
+            seen.add(rel_path)
+            previous = known.get(rel_path)
+            if previous and previous[1] == stat.st_mtime_ns and previous[2] == stat.st_size:
+                counts["unchanged"] += 1
+            else:
+                changed.append((rel_path, stat))
+
+        def load(item):
+            rel_path, stat = item
+            try:
+                return item, read_document(root / rel_path)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping {rel_path}: {e}")
+                return item, None
+
+        # Files are read and parsed on a thread pool, BATCH_SIZE at a time so
+        # parsed documents never pile up ahead of the writes on this thread
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(changed), BATCH_SIZE):
+                for (rel_path, stat), document in pool.map(load, changed[start:start + BATCH_SIZE]):
+                    if document is None:
+                        continue
+                    previous = known.get(rel_path)
+                    if previous and previous[3] == document[0]:
+                        self.conn.execute("UPDATE docs SET mtime_ns = ?, size = ? WHERE id = ?",
+                                          (stat.st_mtime_ns, stat.st_size, previous[0]))
+                        counts["touched"] += 1
+                    else:
+                        self._store(rel_path, stat, previous[0] if previous else None, document)
+                        counts["updated" if previous else "added"] += 1
+                self.conn.commit()
+
+        with self.conn:
+            for rel_path in known.keys() - seen:
+                doc_id = known[rel_path][0]
+                self._delete_chunks(doc_id)
+                self.conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                counts["removed"] += 1
+            self.set_meta("updated_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        if counts["added"] + counts["updated"] + counts["removed"] > BATCH_SIZE:
+            with self.conn:
+                self.conn.execute("INSERT INTO chunks (chunks) VALUES ('optimize')")
+        return counts
+
+    # -------------------------------------------------------------------------
+    # Querying
+    # -------------------------------------------------------------------------
+
+    def search(self, terms: list, limit: int = 10, any_term: bool = False, path: str = None,
+               notion_id: str = None, since: str = None, until: str = None) -> list:
+        """BM25-ranked matches, best first, at most one per document chunk.
+
+        Filters: path prefix (relative to the root), notion_id, and
+        since/until bounds on last_edited (or created) compared as text,
+        so "2025-12" and "2025-12-01" both work.
+        """
+        match = fts_query(terms, any_term)
+        if not match:
+            return []
+        # Rank chunks first and join documents only for the hits; document
+        # filters become one id set checked per matching chunk
+        filters, params = [], []
+        if path:
+            filters.append("path LIKE ? ESCAPE '\\'")
+            params.append(path.strip("/").replace("\\", "\\\\").replace("%", "\\%")
+                          .replace("_", "\\_") + "%")
+        if notion_id:
+            filters.append("notion_id = ?")
+            params.append(notion_id)
+        if since:
+            filters.append("COALESCE(last_edited, created) >= ?")
+            params.append(since)
+        if until:
+            # "2025-12" should include all of December: compare against the next prefix
+            filters.append("COALESCE(last_edited, created) < ?")
+            params.append(until + "\uffff")
+        doc_filter = ""
+        if filters:
+            doc_filter = f"AND rowid / {CHUNK_SPAN} IN (SELECT id FROM docs WHERE {' AND '.join(filters)})"
+        sql = (
+            "SELECT docs.path, docs.kind, docs.title, docs.notion_id, docs.created, "
+            "docs.last_edited, hits.line, hits.body, hits.rank FROM ("
+            "  SELECT rowid, line, body, bm25(chunks, 4.0, 1.0) AS rank FROM chunks"
+            f"  WHERE chunks MATCH ? {doc_filter} ORDER BY rank LIMIT ?"
+            f") AS hits JOIN docs ON docs.id = hits.rowid / {CHUNK_SPAN} ORDER BY hits.rank"
+        )
+        params = [match] + params + [limit]
+
+        root = self.get_meta("root", "")
+        stems = term_stems(terms)
+        results = []
+        for doc_path, kind, title, doc_notion_id, created, last_edited, line, body, rank in \
+                self.conn.execute(sql, params):
+            offset, text = anchor_line(body, stems)
+            results.append({
+                "path": os.path.join(root, doc_path),
+                "line": line + offset,
+                "kind": kind,
+                "title": title,
+                "notion_id": doc_notion_id,
+                "created": created,
+                "last_edited": last_edited,
+                "text": text,
+                "score": round(-rank, 3),
+            })
+        return results
+
+    def stats(self) -> dict:
+        docs, chunk_count = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0) FROM docs").fetchone()
+        kinds = dict(self.conn.execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind"))
+        return {"root": self.get_meta("root"), "updated_at": self.get_meta("updated_at"),
+                "documents": docs, "chunks": chunk_count, "kinds": kinds,
+                "size_mb": round(self.db_path.stat().st_size / 1e6, 1)}
+
+
+# =============================================================================
+# Query Helpers
+# =============================================================================
+
+WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_query(terms: list, any_term: bool = False) -> str:
+    """Turn command-line terms into an FTS5 MATCH expression.
+
+    Each argument is one term; an argument with spaces is a phrase, and a
+    trailing * makes a prefix search. Everything is quoted, so FTS5
+    operators and punctuation in the input are never interpreted.
+    """
+    parts = []
+    for term in terms:
+        prefix = term.endswith("*")
+        words = WORD.findall(term)
+        if not words:
+            continue
+        parts.append('"' + " ".join(words) + '"' + ("*" if prefix else ""))
+    return (" OR " if any_term else " ").join(parts)
+
+
+def term_stems(terms: list) -> list:
+    """Lowercase word prefixes used to find the matching line in a chunk.
+
+    The index stems words (porter), so "deciding" matches "decided";
+    trimming long words to a prefix approximates that when anchoring.
+    """
+    stems = []
+    for term in terms:
+        for word in WORD.findall(term.lower()):
+            stems.append(word if len(word) <= 4 else word[:max(4, len(word) - 3)])
+    return stems
+
+
+def anchor_line(body: str, stems: list, width: int = 200) -> tuple:
+    """The first line of a chunk mentioning a term: (offset in chunk, trimmed text)."""
+    lines = body.split("\n")
+    for offset, text in enumerate(lines):
+        lower = text.lower()
+        positions = [lower.find(stem) for stem in stems if stem in lower]
+        if positions:
+            start = max(0, min(positions) - width // 4)
+            snippet = text[start:start + width].strip()
+            return offset, ("…" if start else "") + snippet + ("…" if start + width < len(text) else "")
+    return 0, lines[0][:width]
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def print_usage():
+    print(__doc__)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print_usage()
+        sys.exit(0 if sys.argv[1:] else 1)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO)
+
+    command = sys.argv[1]
+    root = Path(get_option("--root", DEFAULT_ROOT)).expanduser()
+    index = SearchIndex(Path(get_option("--db", DEFAULT_DB)).expanduser())
+
+    try:
+        if command == "update" or (command == "query" and "--update" in sys.argv):
+            if not root.is_dir():
+                logging.error(f"Not a directory: {root}")
+                sys.exit(1)
+            started = time.perf_counter()
+            counts = index.update(root, rebuild="--rebuild" in sys.argv)
+            if command == "update":
+                print(f"Indexed {root} in {time.perf_counter() - started:.2f}s: "
+                      + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+        if command == "query":
+            # Positional arguments after "query" that are not option values
+            value_flags = {"--limit", "--path", "--notion-id", "--since", "--until", "--root", "--db"}
+            terms, skip = [], False
+            for arg in sys.argv[2:]:
+                if skip:
+                    skip = False
+                elif arg in value_flags:
+                    skip = True
+                elif not arg.startswith("--"):
+                    terms.append(arg)
+            if not terms:
+                logging.error("No search terms given")
+                sys.exit(1)
+
+            started = time.perf_counter()
+            results = index.search(
+                terms, limit=int(get_option("--limit", "10")), any_term="--any" in sys.argv,
+                path=get_option("--path"), notion_id=get_option("--notion-id"),
+                since=get_option("--since"), until=get_option("--until"),
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if "--json" in sys.argv:
+                print(json.dumps({"query": terms, "ms": round(elapsed_ms, 1), "results": results},
+                                 indent=2, ensure_ascii=False))
+                return
+            cwd = os.getcwd()
+            for result in results:
+                shown = os.path.relpath(result["path"], cwd) if result["path"].startswith(cwd) else result["path"]
+                date = result["last_edited"] or result["created"] or ""
+                print(f"{shown}:{result['line']}  [{result['title']}{' | ' + date if date else ''}]")
+                print(f"    {result['text']}")
+            print(f"{len(results)} results in {elapsed_ms:.1f} ms")
+
+        elif command == "stats":
+            print(json.dumps(index.stats(), indent=2))
+
+        elif command != "update":
+            logging.error(f"Unknown command: {command}")
+            print_usage()
+            sys.exit(1)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
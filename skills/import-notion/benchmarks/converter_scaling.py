@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Converter Scaling Benchmark
+
+Regression check that convert_workspace time grows linearly with page
+count. Converts synthetic workspaces of increasing size (comments per page
+held constant) and fails if the per-page cost at the largest size exceeds
+the smallest by more than the tolerance factor. A per-page comment scan,
+for example, makes per-page cost grow with workspace size.
+
+Usage:
+    python converter_scaling.py [--sizes 500,1000,2000,4000] [--comments-per-page 3]
+                                [--tolerance 1.6] [--repeat 2]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import converter  # noqa: E402
+from synthetic import generate_workspace, to_export  # noqa: E402
+
+
+def get_option(name: str, default: str) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+def time_conversion(data: dict, repeat: int) -> float:
+    """Best-of-N wall time for convert_workspace into a scratch directory."""
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            converter.convert_workspace(data, Path(tmp))
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(s) for s in get_option("--sizes", "500,1000,2000,4000").split(",")]
+    comments_per_page = float(get_option("--comments-per-page", "3"))
+    tolerance = float(get_option("--tolerance", "1.6"))
+    repeat = int(get_option("--repeat", "2"))
+
+    logging.disable(logging.INFO)
+
+    print("Converter Scaling Benchmark")
+    print("=" * 30)
+    print(f"{'pages':>8} {'items':>8} {'comments':>9} {'seconds':>9} {'ms/item':>8}")
+
+    per_item = []
+    for size in sizes:
+        data = to_export(generate_workspace(pages=size, comments_per_page=comments_per_page, seed=1))
+        items = len(data["pages"])
+        seconds = time_conversion(data, repeat)
+        per_item.append(seconds / items)
+        print(f"{size:>8} {items:>8} {data['comment_count']:>9} {seconds:>9.3f} {seconds / items * 1000:>8.3f}")
+
+    growth = per_item[-1] / per_item[0]
+    print()
+    print(f"Per-item cost growth {sizes[0]} -> {sizes[-1]} pages: {growth:.2f}x (limit {tolerance}x)")
+    if growth > tolerance:
+        print("FAIL: conversion time grows faster than linearly with page count")
+        sys.exit(1)
+    print("OK: conversion time is linear in page count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+In-Process Notion API Stand-In
+
+Serves a synthetic Workspace (see synthetic.py) through the same calls
+exporter.py makes on notion_client.Client, with cursor pagination, so
+export_workspace can be benchmarked without network access or API quota.
+
+Usage (as a library):
+    from fake_notion import FakeNotionClient, WorkspaceAPI, asset_transport
+    api = WorkspaceAPI(generate_workspace(pages=1000, seed=1))
+    client = FakeNotionClient(api)
+    http = httpx.Client(transport=asset_transport(api.ws))
+"""
+
+import hashlib
+from collections import Counter
+from types import SimpleNamespace
+
+import httpx
+
+from synthetic import Workspace
+
+
+class WorkspaceAPI:
+    """Notion API responses for a synthetic workspace.
+
+    Objects are returned by id and lists in cursor pages of at most
+    `page_size` results. Unknown ids raise KeyError. Every call is counted
+    per endpoint in `requests`.
+    """
+
+    def __init__(self, ws: Workspace, page_size: int = 100):
+        self.ws = ws
+        self.page_size = page_size
+        self.users = ws.users
+        self.search_results = ws.search_results()
+        self.requests = Counter()
+        self.blocks = None  # block id -> block, indexed on first retrieve
+
+    def paginate(self, items: list, start_cursor: str = None, page_size: int = None) -> dict:
+        """One page of a list response; cursors are offsets into items."""
+        size = min(page_size or self.page_size, self.page_size)
+        start = int(start_cursor or 0)
+        end = start + size
+        has_more = end < len(items)
+        return {
+            "object": "list",
+            "results": [dict(item) for item in items[start:end]],
+            "next_cursor": str(end) if has_more else None,
+            "has_more": has_more,
+        }
+
+    def search(self, start_cursor: str = None, page_size: int = None, sort: dict = None) -> dict:
+        self.requests["search"] += 1
+        results = self.search_results
+        if sort:
+            results = sorted(results, key=lambda item: item.get(sort.get("timestamp"), ""),
+                             reverse=sort.get("direction") == "descending")
+        return self.paginate(results, start_cursor, page_size)
+
+    def list_block_children(self, block_id: str, start_cursor: str = None,
+                            page_size: int = None) -> dict:
+        self.requests["blocks.children.list"] += 1
+        if block_id not in self.ws.children:
+            raise KeyError(block_id)
+        return self.paginate(self.ws.children[block_id], start_cursor, page_size)
+
+    def retrieve_block(self, block_id: str) -> dict:
+        self.requests["blocks.retrieve"] += 1
+        if self.blocks is None:
+            self.blocks = {block["id"]: block for children in self.ws.children.values()
+                           for block in children}
+        return dict(self.blocks[block_id])
+
+    def retrieve_page(self, page_id: str) -> dict:
+        self.requests["pages.retrieve"] += 1
+        return dict(self.ws.pages[page_id])
+
+    def retrieve_database(self, database_id: str) -> dict:
+        self.requests["databases.retrieve"] += 1
+        return dict(self.ws.databases[database_id])
+
+    def retrieve_data_source(self, data_source_id: str) -> dict:
+        self.requests["data_sources.retrieve"] += 1
+        return dict(self.ws.data_sources[data_source_id])
+
+    def query_data_source(self, data_source_id: str, start_cursor: str = None,
+                          page_size: int = None) -> dict:
+        self.requests["data_sources.query"] += 1
+        entries = [self.ws.pages[e] for e in self.ws.entries[data_source_id]]
+        return self.paginate(entries, start_cursor, page_size)
+
+    def list_users(self, start_cursor: str = None, page_size: int = None) -> dict:
+        self.requests["users.list"] += 1
+        return self.paginate(self.users, start_cursor, page_size)
+
+    def list_comments(self, block_id: str, start_cursor: str = None,
+                      page_size: int = None) -> dict:
+        self.requests["comments.list"] += 1
+        return self.paginate(self.ws.comments.get(block_id, []), start_cursor, page_size)
+
+
+class FakeNotionClient:
+    """Drop-in for notion_client.Client, backed by a WorkspaceAPI.
+
+    Assign it to RateLimitedClient.client to run the exporter against it.
+    """
+
+    def __init__(self, api: WorkspaceAPI):
+        self.api = api
+        self.search = api.search
+        self.blocks = SimpleNamespace(children=SimpleNamespace(list=api.list_block_children),
+                                      retrieve=api.retrieve_block)
+        self.pages = SimpleNamespace(retrieve=api.retrieve_page)
+        self.databases = SimpleNamespace(retrieve=api.retrieve_database)
+        self.data_sources = SimpleNamespace(retrieve=api.retrieve_data_source,
+                                            query=api.query_data_source)
+        self.users = SimpleNamespace(list=api.list_users)
+        self.comments = SimpleNamespace(list=api.list_comments)
+
+
+def asset_content(url: str, size: int) -> bytes:
+    """Deterministic file body for an asset URL.
+
+    The signature query is ignored, so re-signed URLs of the same file (as
+    synthetic.py generates for reused assets) serve identical bytes.
+    """
+    seed = hashlib.sha256(url.split("?")[0].encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+def asset_transport(ws: Workspace) -> httpx.MockTransport:
+    """httpx transport serving every asset in the workspace from memory."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        size = ws.assets.get(url)
+        if size is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=asset_content(url, size))
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Local Notion API Stand-In Server
+
+Serves a seeded synthetic workspace (see synthetic.py) over HTTP with the
+endpoints exporter.py uses, so throughput and retry behavior can be load
+tested without touching a real integration's quota:
+
+    POST /v1/search                      GET /v1/pages/{id}
+    GET  /v1/blocks/{id}/children        GET /v1/databases/{id}
+    GET  /v1/data_sources/{id}           POST /v1/data_sources/{id}/query
+    GET  /v1/users                       GET /v1/comments?block_id={id}
+    GET  /v1/blocks/{id}
+
+Lists are paginated with cursors. Every API response can be delayed
+(--latency-ms plus up to --jitter-ms), and a fraction can be answered with
+429 (with Retry-After) or 5xx instead. --rate-limit enforces a token bucket
+the way Notion does, answering 429 once it is exhausted. File URLs in
+responses are re-signed on every response and expire, like Notion's S3
+URLs, and are served from /files/. GET /__stats returns request counts.
+
+Point the exporter at it with --base-url (any API key value works):
+    python mock_server.py --pages 2000 --latency-ms 80 --rate-429 0.02
+    python ../scripts/exporter.py myspace --base-url http://127.0.0.1:8765
+
+Usage:
+    python mock_server.py [--host 127.0.0.1] [--port 8765] [--pages 1000] [--seed 1]
+                          [--page-size 100] [--latency-ms 0] [--jitter-ms 0]
+                          [--rate-429 0] [--rate-5xx 0] [--retry-after 1]
+                          [--rate-limit 0] [--url-ttl 3600]
+"""
+
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fake_notion import WorkspaceAPI, asset_content
+from synthetic import generate_workspace
+
+ASSET_HOST = "https://prod-files.example.com/"
+ASSET_URL = re.compile(re.escape(ASSET_HOST) + r'([^"?]+)(?:\?[^"]*)?')
+SIGNING_KEY = b"notion-mock-server"
+
+
+def get_option(name: str, default: str) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+def sign(path: str, expires: int) -> str:
+    return hmac.new(SIGNING_KEY, f"{path}:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class MockNotion:
+    """Routing, fault injection and file signing around a WorkspaceAPI."""
+
+    def __init__(self, api: WorkspaceAPI, latency: float = 0, jitter: float = 0,
+                 rate_429: float = 0, rate_5xx: float = 0, retry_after: int = 1,
+                 rate_limit: float = 0, url_ttl: int = 3600, seed: int = 0):
+        self.api = api
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.url_ttl = url_ttl
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.asset_sizes = {url.split("?")[0][len(ASSET_HOST):]: size
+                            for url, size in api.ws.assets.items()}
+        self.base_url = ""
+        self.stats = Counter()
+
+    def roll(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+    def route(self, method: str, path: str, query: dict, body: dict):
+        """Dispatch an API call; returns the response object."""
+        parts = path.strip("/").split("/")[1:]  # Drop "v1"
+        cursor = body.get("start_cursor") or query.get("start_cursor")
+        page_size = body.get("page_size") or query.get("page_size")
+        page_size = int(page_size) if page_size else None
+        api = self.api
+
+        if method == "POST" and parts == ["search"]:
+            return "search", api.search(cursor, page_size, body.get("sort"))
+        if method == "GET" and len(parts) == 3 and parts[0] == "blocks" and parts[2] == "children":
+            return "blocks.children.list", api.list_block_children(parts[1], cursor, page_size)
+        if method == "GET" and len(parts) == 2 and parts[0] == "blocks":
+            return "blocks.retrieve", api.retrieve_block(parts[1])
+        if method == "GET" and len(parts) == 2 and parts[0] == "pages":
+            return "pages.retrieve", api.retrieve_page(parts[1])
+        if method == "GET" and len(parts) == 2 and parts[0] == "databases":
+            return "databases.retrieve", api.retrieve_database(parts[1])
+        if method == "GET" and len(parts) == 2 and parts[0] == "data_sources":
+            return "data_sources.retrieve", api.retrieve_data_source(parts[1])
+        if method == "POST" and len(parts) == 3 and parts[0] == "data_sources" and parts[2] == "query":
+            return "data_sources.query", api.query_data_source(parts[1], cursor, page_size)
+        if method == "GET" and parts == ["users"]:
+            return "users.list", api.list_users(cursor, page_size)
+        if method == "GET" and parts == ["comments"]:
+            return "comments.list", api.list_comments(query.get("block_id", ""), cursor, page_size)
+        raise LookupError(f"Invalid request URL: {method} {path}")
+
+    def sign_assets(self, text: str) -> str:
+        """Point every file URL at this server with a fresh expiring signature."""
+        expires = int(time.time()) + self.url_ttl
+
+        def replace(match):
+            path = match.group(1)
+            return f"{self.base_url}/files/{path}?X-Amz-Expires={expires}&X-Amz-Signature={sign(path, expires)}"
+
+        return ASSET_URL.sub(replace, text)
+
+    def fault(self) -> tuple:
+        """An injected error response (status, code, headers), or None."""
+        if self.limiter and not self.limiter.allow():
+            return 429, "rate_limited", {"Retry-After": str(self.retry_after)}
+        roll = self.roll()
+        if roll < self.rate_429:
+            return 429, "rate_limited", {"Retry-After": str(self.retry_after)}
+        if roll < self.rate_429 + self.rate_5xx:
+            status = (500, 502, 503)[int(roll * 1000) % 3]
+            code = "service_unavailable" if status == 503 else "internal_server_error"
+            return status, code, {}
+        return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NotionMock/1.0"
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients stall ~40ms per request waiting on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # Request logging would dominate at load-test rates
+
+    def send_json(self, status: int, payload, headers: dict = None, text: str = None):
+        data = (text if text is not None else json.dumps(payload)).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_error_json(self, status: int, code: str, message: str, headers: dict = None):
+        self.send_json(status, {"object": "error", "status": status, "code": code,
+                                "message": message}, headers)
+
+    def handle_api(self, method: str):
+        mock = self.server.mock
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        if url.path == "/__stats":
+            self.send_json(200, dict(mock.stats))
+            return
+        if url.path.startswith("/files/"):
+            self.serve_file(url.path[len("/files/"):], query)
+            return
+
+        delay = mock.latency + (mock.jitter * mock.roll() if mock.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        fault = mock.fault()
+        if fault:
+            status, code, headers = fault
+            mock.stats[f"status.{status}"] += 1
+            self.send_error_json(status, code, "Injected error", headers)
+            return
+
+        try:
+            endpoint, payload = mock.route(method, url.path, query, body)
+        except KeyError as e:
+            mock.stats["status.404"] += 1
+            self.send_error_json(404, "object_not_found",
+                                 f"Could not find object with ID: {e.args[0]}")
+            return
+        except LookupError as e:
+            mock.stats["status.400"] += 1
+            self.send_error_json(400, "invalid_request_url", str(e))
+            return
+
+        mock.stats[endpoint] += 1
+        mock.stats["status.200"] += 1
+        self.send_json(200, None, text=mock.sign_assets(json.dumps(payload)))
+
+    def serve_file(self, path: str, query: dict):
+        mock = self.server.mock
+        size = mock.asset_sizes.get(path)
+        if size is None:
+            mock.stats["files.404"] += 1
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        expires = int(query.get("X-Amz-Expires", "0") or 0)
+        signature = query.get("X-Amz-Signature", "")
+        if expires < time.time() or not hmac.compare_digest(signature, sign(path, expires)):
+            mock.stats["files.403"] += 1
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        data = asset_content(ASSET_HOST + path, size)
+        mock.stats["files.200"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.handle_api("GET")
+
+    def do_POST(self):
+        self.handle_api("POST")
+
+
+def make_server(api: WorkspaceAPI, host: str = "127.0.0.1", port: int = 8765,
+                **options) -> ThreadingHTTPServer:
+    """Create (but do not start) a server for api; options go to MockNotion."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.mock = MockNotion(api, **options)
+    server.mock.base_url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def main():
+    if "-h" in sys.argv or "--help" in sys.argv:
+        print(__doc__)
+        sys.exit(0)
+
+    host = get_option("--host", "127.0.0.1")
+    port = int(get_option("--port", "8765"))
+    pages = int(get_option("--pages", "1000"))
+    seed = int(get_option("--seed", "1"))
+
+    ws = generate_workspace(pages=pages, seed=seed)
+    api = WorkspaceAPI(ws, page_size=int(get_option("--page-size", "100")))
+    server = make_server(
+        api, host, port,
+        latency=float(get_option("--latency-ms", "0")) / 1000,
+        jitter=float(get_option("--jitter-ms", "0")) / 1000,
+        rate_429=float(get_option("--rate-429", "0")),
+        rate_5xx=float(get_option("--rate-5xx", "0")),
+        retry_after=int(get_option("--retry-after", "1")),
+        rate_limit=float(get_option("--rate-limit", "0")),
+        url_ttl=int(get_option("--url-ttl", "3600")),
+        seed=seed,
+    )
+
+    print(f"Mock Notion API on {server.mock.base_url} "
+          f"({len(ws.search_results())} items, {len(ws.assets)} assets)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print()
+        for key, count in sorted(server.mock.stats.items()):
+            print(f"  {key}: {count}")
+
+
+if __name__ == "__main__":
+    main()
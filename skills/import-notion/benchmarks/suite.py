@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Import Pipeline Benchmark Suite
+
+Runs the exporter and converter end to end on seeded synthetic workspaces
+and reports wall time, peak RSS and per-stage timings for each size:
+
+    export   export_workspace against an in-process fake Notion API
+             (fetching, journaling, compaction; asset downloads overlap)
+    assets   AssetDownloader alone: every asset URL downloaded, hashed,
+             deduplicated and written
+    load     json.load of the exported export.json (with --stream: the
+             StreamingExport scan plus decoding each page)
+    index    page index, comment map and link resolver
+    convert  convert_page for every page
+    write    writing the Markdown and schema files
+
+Each size runs in its own process so peak RSS is per size; it includes
+the synthetic workspace, which is released before the converter stages.
+With --repeat N each size runs N times and the best time per stage is
+kept. With a stored baseline the run fails if any stage (or peak RSS)
+exceeds its baseline by more than the tolerance factor; --save-baseline
+records the current run. Baselines are machine-specific, so record one on
+the machine that checks it.
+
+Usage:
+    python suite.py [--sizes 1000,10000,50000] [--stream] [--repeat 1]
+                    [--baseline <path>] [--save-baseline] [--tolerance 1.5]
+                    [--depth 4] [--blocks-per-page 20] [--databases 5]
+                    [--comments-per-page 1] [--asset-ratio 0.03] [--seed 1]
+"""
+
+import json
+import logging
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "scripts"))
+
+STAGES = ["export", "assets", "load", "index", "convert", "write"]
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+# Ignore regressions smaller than this, in seconds or MB: they are noise
+MIN_DELTA = {"seconds": 0.2, "rss_mb": 32}
+
+# Generator options passed through to generate_workspace
+GENERATOR_OPTIONS = {
+    "--depth": ("depth", int, "4"),
+    "--blocks-per-page": ("blocks_per_page", int, "20"),
+    "--databases": ("databases", int, "5"),
+    "--comments-per-page": ("comments_per_page", float, "1"),
+    "--asset-ratio": ("asset_ratio", float, "0.03"),
+    "--seed": ("seed", int, "1"),
+}
+
+
+def get_option(name: str, default: str) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# =============================================================================
+# Single Size (child process)
+# =============================================================================
+
+def run_size(pages: int, options: dict, stream: bool = False) -> dict:
+    """Run every stage once for a workspace of `pages` pages."""
+    import httpx
+
+    import converter
+    import exporter
+    from fake_notion import FakeNotionClient, WorkspaceAPI, asset_transport
+    from synthetic import generate_workspace
+
+    logging.disable(logging.WARNING)
+    stages = {}
+    started = time.perf_counter()
+
+    ws = generate_workspace(pages=pages, **options)
+    api = WorkspaceAPI(ws)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # Exporter, unthrottled, against the fake API
+        client = exporter.RateLimitedClient("benchmark", rate=0)
+        client.client = FakeNotionClient(api)
+        export_dir = tmp / "export"
+        export_dir.mkdir()
+        start = time.perf_counter()
+        exporter.export_workspace(client, export_dir,
+                                  http_client=httpx.Client(transport=asset_transport(ws)))
+        stages["export"] = time.perf_counter() - start
+
+        # Asset downloads on their own
+        downloader = exporter.AssetDownloader(tmp / "assets",
+                                              http_client=httpx.Client(transport=asset_transport(ws)))
+        start = time.perf_counter()
+        futures = [downloader.submit(url) for url in ws.assets]
+        for future in futures:
+            future.result()
+        downloader.close()
+        stages["assets"] = time.perf_counter() - start
+
+        requests, asset_count = sum(api.requests.values()), len(ws.assets)
+        del ws, api, client
+
+        start = time.perf_counter()
+        if stream:
+            data = converter.StreamingExport(export_dir / "export.json").scan()
+            index_data = data.index_data()
+        else:
+            with open(export_dir / "export.json", "r", encoding="utf-8") as f:
+                data = json.load(f)
+            index_data = data
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        page_index = converter.build_page_index(index_data)
+        comment_map = converter.build_comment_map(data.get("_comments", {}))
+        links = converter.LinkResolver(page_index)
+        stages["index"] = time.perf_counter() - start
+
+        # Decode (streaming), convert and write per page, timing each separately
+        users = data.get("_users", {})
+        assets_map = data.get("_assets", {})
+        output_dir = tmp / "notion"
+        pages_iter = data.iter_pages() if stream else iter(data["pages"].items())
+        convert_time = write_time = 0.0
+        while True:
+            start = time.perf_counter()
+            item = next(pages_iter, None)
+            load_time += time.perf_counter() - start
+            if item is None:
+                break
+            page_id, page = item
+            rel_path = page_index[page_id]
+            start = time.perf_counter()
+            markdown = converter.convert_page(page, users, page_index, assets_map=assets_map,
+                                              source_path=rel_path, comment_map=comment_map,
+                                              links=links)
+            convert_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            output_file = output_dir / rel_path
+            converter.write_text(output_file, markdown)
+            if page.get("object") == "database":
+                schema = {"id": page_id, "title": converter.get_title(page),
+                          "data_sources": page.get("data_sources_full", [])}
+                converter.write_text(output_file.parent / "_schema.json",
+                                     json.dumps(schema, indent=2))
+            write_time += time.perf_counter() - start
+        stages["load"] = load_time
+        stages["convert"] = convert_time
+        stages["write"] = write_time
+
+    return {
+        "pages": pages,
+        "items": len(page_index),
+        "requests": requests,
+        "assets": asset_count,
+        "wall": time.perf_counter() - started,
+        "rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+# =============================================================================
+# Suite
+# =============================================================================
+
+def measure(pages: int, repeat: int = 1) -> dict:
+    """Run one size in fresh processes; keep the best time per stage."""
+    args = [sys.executable, __file__, "--run", str(pages)]
+    for flag in GENERATOR_OPTIONS:
+        if flag in sys.argv:
+            args += [flag, get_option(flag, "")]
+    if "--stream" in sys.argv:
+        args.append("--stream")
+
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        if best is None:
+            best = result
+            continue
+        for key in ("wall", "rss_mb"):
+            best[key] = min(best[key], result[key])
+        for name in STAGES:
+            best["stages"][name] = min(best["stages"][name], result["stages"][name])
+    return best
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list:
+    """Stages (and peak RSS) slower or larger than baseline beyond tolerance."""
+    failures = []
+    checks = [(f"stage {name}", result["stages"][name], baseline["stages"].get(name), "seconds")
+              for name in STAGES]
+    checks.append(("peak RSS", result["rss_mb"], baseline.get("rss_mb"), "rss_mb"))
+    for label, value, base, unit in checks:
+        if base is None:
+            continue
+        if value > base * tolerance and value - base > MIN_DELTA[unit]:
+            failures.append(f"{result['pages']} pages: {label} {value:.2f} vs baseline "
+                            f"{base:.2f} ({value / base:.2f}x)")
+    return failures
+
+
+def main():
+    if "--run" in sys.argv:
+        options = {key: cast(get_option(flag, default))
+                   for flag, (key, cast, default) in GENERATOR_OPTIONS.items()}
+        print(json.dumps(run_size(int(get_option("--run", "1000")), options,
+                                  "--stream" in sys.argv)))
+        return
+
+    sizes = [int(s) for s in get_option("--sizes", "1000,10000,50000").split(",")]
+    baseline_file = Path(get_option("--baseline", str(DEFAULT_BASELINE)))
+    tolerance = float(get_option("--tolerance", "1.5"))
+    repeat = int(get_option("--repeat", "1"))
+
+    baseline = {}
+    if baseline_file.exists():
+        with open(baseline_file, "r") as f:
+            baseline = json.load(f)
+
+    print("Import Pipeline Benchmark")
+    print("=" * 30)
+    header = f"{'pages':>7} {'items':>7} {'requests':>9} {'wall':>8} {'rss MB':>7}"
+    print(header + "".join(f" {name:>8}" for name in STAGES))
+
+    results = {}
+    failures = []
+    compared = 0
+    for size in sizes:
+        result = measure(size, repeat)
+        # Streaming runs are kept apart in the baseline: their profile differs
+        key = f"{size}-stream" if "--stream" in sys.argv else str(size)
+        results[key] = result
+        row = (f"{size:>7} {result['items']:>7} {result['requests']:>9} "
+               f"{result['wall']:>8.2f} {result['rss_mb']:>7.0f}")
+        print(row + "".join(f" {result['stages'][name]:>8.2f}" for name in STAGES))
+        if key in baseline.get("sizes", {}):
+            failures += regressions(result, baseline["sizes"][key], tolerance)
+            compared += 1
+
+    print()
+    if "--save-baseline" in sys.argv:
+        baseline.setdefault("sizes", {}).update(results)
+        with open(baseline_file, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Saved baseline: {baseline_file}")
+        return
+
+    if not compared:
+        print(f"No baseline for these sizes in {baseline_file}; "
+              f"run with --save-baseline to record one")
+        return
+    if failures:
+        print(f"FAIL: regressions beyond {tolerance}x baseline")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"OK: every stage within {tolerance}x of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Synthetic Notion Workspaces
+
+Seeded generator for Notion-shaped workspaces used by the import-notion
+benchmarks. The same seed and parameters always produce the same workspace.
+
+A Workspace holds raw API objects (what the Notion API would return);
+to_export() shapes it into the export.json document exporter.py writes.
+
+Usage (as a library):
+    from synthetic import generate_workspace, to_export
+    ws = generate_workspace(pages=1000, seed=1)
+    data = to_export(ws)
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+
+BASE_TIME = "2025-06-01T09:00:00.000Z"
+
+WORDS = (
+    "roadmap launch metrics onboarding review budget hiring design api auth "
+    "billing search latency retention pricing partner release sprint backlog "
+    "incident migration customer feedback analytics dashboard security mobile"
+).split()
+
+
+@dataclass
+class Workspace:
+    """Raw API objects for a synthetic workspace, keyed the way the API serves them."""
+    seed: int
+    users: list = field(default_factory=list)
+    pages: dict = field(default_factory=dict)         # page_id -> page (search result shape)
+    databases: dict = field(default_factory=dict)     # database_id -> database
+    data_sources: dict = field(default_factory=dict)  # data_source_id -> data source
+    entries: dict = field(default_factory=dict)       # data_source_id -> [entry page_id]
+    children: dict = field(default_factory=dict)      # block/page id -> [child blocks]
+    comments: dict = field(default_factory=dict)      # page_id -> [comments]
+    assets: dict = field(default_factory=dict)        # asset url -> size in bytes
+
+    def search_results(self) -> list:
+        """Everything search returns: pages, database entries and databases."""
+        return list(self.pages.values()) + list(self.databases.values())
+
+
+class _Generator:
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def words(self, count: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def timestamp(self) -> str:
+        day = self.rng.randint(1, 28)
+        return f"2025-06-{day:02d}T{self.rng.randint(0, 23):02d}:{self.rng.randint(0, 59):02d}:00.000Z"
+
+    def text(self, content: str, href: str = None, **annotations) -> dict:
+        return {
+            "type": "text",
+            "text": {"content": content, "link": {"url": href} if href else None},
+            "annotations": {
+                "bold": False, "italic": False, "strikethrough": False,
+                "underline": False, "code": False, "color": "default", **annotations,
+            },
+            "plain_text": content,
+            "href": href,
+        }
+
+
+def _rich_text(gen: _Generator, ws: Workspace, known_pages: list) -> list:
+    """A sentence with occasional formatting, links and mentions."""
+    parts = [gen.text(gen.words(gen.rng.randint(3, 12)) + " ")]
+    roll = gen.rng.random()
+    if roll < 0.15:
+        parts.append(gen.text(gen.words(2), bold=True))
+    elif roll < 0.25:
+        parts.append(gen.text(gen.words(1), code=True))
+    elif roll < 0.35 and known_pages:
+        target = gen.rng.choice(known_pages)
+        parts.append(gen.text("see " + gen.words(1),
+                              href=f"https://www.notion.so/{target.replace('-', '')}"))
+    elif roll < 0.42 and known_pages:
+        target = gen.rng.choice(known_pages)
+        parts.append({
+            "type": "mention",
+            "mention": {"type": "page", "page": {"id": target}},
+            "annotations": gen.text("")["annotations"],
+            "plain_text": gen.words(2),
+            "href": f"https://www.notion.so/{target.replace('-', '')}",
+        })
+    elif roll < 0.47 and ws.users:
+        user = gen.rng.choice(ws.users)
+        parts.append({
+            "type": "mention",
+            "mention": {"type": "user", "user": {"object": "user", "id": user["id"]}},
+            "annotations": gen.text("")["annotations"],
+            "plain_text": "@" + user["name"],
+            "href": None,
+        })
+    return parts
+
+
+def _asset_url(gen: _Generator, ws: Workspace, name: str, reuse_ratio: float) -> str:
+    """A signed file URL; some point at content already used elsewhere."""
+    if ws.assets and gen.rng.random() < reuse_ratio:
+        # Re-uploaded file: new URL, same bytes (same size marks same content)
+        original = gen.rng.choice(list(ws.assets))
+        base = original.split("?")[0]
+    else:
+        base = f"https://prod-files.example.com/{gen.uuid()}/{name}"
+    url = f"{base}?X-Amz-Signature={gen.uuid().replace('-', '')}"
+    ws.assets[url] = gen.rng.randint(2_000, 400_000)
+    return url
+
+
+def _make_blocks(gen: _Generator, ws: Workspace, parent_id: str, count: int, depth: int,
+                 known_pages: list, asset_ratio: float, reuse_ratio: float) -> list:
+    blocks = []
+    for _ in range(count):
+        block_id = gen.uuid()
+        roll = gen.rng.random()
+        if roll < 0.30:
+            block_type = "paragraph"
+        elif roll < 0.40:
+            block_type = gen.rng.choice(["heading_1", "heading_2", "heading_3"])
+        elif roll < 0.55:
+            block_type = "bulleted_list_item"
+        elif roll < 0.65:
+            block_type = "numbered_list_item"
+        elif roll < 0.70:
+            block_type = "to_do"
+        elif roll < 0.76:
+            block_type = "toggle"
+        elif roll < 0.80:
+            block_type = "code"
+        elif roll < 0.83:
+            block_type = "quote"
+        elif roll < 0.86:
+            block_type = "callout"
+        elif roll < 0.88:
+            block_type = "divider"
+        elif roll < 0.91:
+            block_type = "table"
+        elif roll < 0.91 + asset_ratio:
+            block_type = "image"
+        else:
+            block_type = "bookmark"
+
+        block = {
+            "object": "block",
+            "id": block_id,
+            "parent": {"type": "block_id", "block_id": parent_id},
+            "created_time": BASE_TIME,
+            "last_edited_time": gen.timestamp(),
+            "has_children": False,
+            "type": block_type,
+        }
+
+        if block_type in ("paragraph", "heading_1", "heading_2", "heading_3", "quote",
+                          "bulleted_list_item", "numbered_list_item", "toggle"):
+            block[block_type] = {"rich_text": _rich_text(gen, ws, known_pages), "color": "default"}
+        elif block_type == "to_do":
+            block[block_type] = {"rich_text": _rich_text(gen, ws, known_pages),
+                                 "checked": gen.rng.random() < 0.5}
+        elif block_type == "code":
+            block[block_type] = {"rich_text": [gen.text(f"print('{gen.words(3)}')")],
+                                 "language": "python", "caption": []}
+        elif block_type == "callout":
+            block[block_type] = {"rich_text": _rich_text(gen, ws, known_pages),
+                                 "icon": {"type": "emoji", "emoji": "💡"}}
+        elif block_type == "divider":
+            block[block_type] = {}
+        elif block_type == "image":
+            url = _asset_url(gen, ws, f"{gen.words(1)}.png", reuse_ratio)
+            block[block_type] = {"type": "file", "caption": [],
+                                 "file": {"url": url, "expiry_time": BASE_TIME}}
+        elif block_type == "bookmark":
+            block[block_type] = {"url": f"https://example.com/{gen.words(1)}", "caption": []}
+        elif block_type == "table":
+            width = gen.rng.randint(2, 4)
+            block[block_type] = {"table_width": width, "has_column_header": True,
+                                 "has_row_header": False}
+            rows = []
+            for _ in range(gen.rng.randint(2, 5)):
+                rows.append({
+                    "object": "block", "id": gen.uuid(), "type": "table_row",
+                    "has_children": False, "last_edited_time": BASE_TIME,
+                    "table_row": {"cells": [[gen.text(gen.words(1))] for _ in range(width)]},
+                })
+            ws.children[block_id] = rows
+            block["has_children"] = True
+
+        # Nested children for list items and toggles
+        if depth > 0 and block_type in ("bulleted_list_item", "numbered_list_item", "toggle") \
+                and gen.rng.random() < 0.4:
+            ws.children[block_id] = _make_blocks(
+                gen, ws, block_id, gen.rng.randint(1, 4), depth - 1,
+                known_pages, asset_ratio, reuse_ratio,
+            )
+            block["has_children"] = True
+
+        blocks.append(block)
+    return blocks
+
+
+def _title_property(gen: _Generator, title: str) -> dict:
+    return {"id": "title", "type": "title", "title": [gen.text(title)]}
+
+
+def generate_workspace(pages: int = 1000, depth: int = 4, blocks_per_page: int = 20,
+                       block_depth: int = 2, databases: int = 5, entries_per_database: int = 40,
+                       comments_per_page: float = 1.0, asset_ratio: float = 0.03,
+                       asset_reuse_ratio: float = 0.2, users: int = 10, seed: int = 0) -> Workspace:
+    """Generate a workspace with `pages` regular pages plus databases and their entries.
+
+    Args:
+        pages: Number of regular (non-entry) pages
+        depth: Maximum page nesting depth
+        blocks_per_page: Top-level blocks per page (children come on top)
+        block_depth: Maximum nesting of list items and toggles
+        databases: Number of databases, each with one data source
+        entries_per_database: Entries (pages) per database
+        comments_per_page: Average comments per page
+        asset_ratio: Fraction of blocks that are images
+        asset_reuse_ratio: Fraction of assets that repeat existing content
+        users: Workspace members
+        seed: Random seed
+    """
+    gen = _Generator(seed)
+    ws = Workspace(seed=seed)
+
+    for i in range(users):
+        name = f"{gen.words(1).title()} {chr(65 + i % 26)}."
+        ws.users.append({
+            "object": "user", "id": gen.uuid(), "name": name, "type": "person",
+            "person": {"email": f"user{i}@example.com"}, "avatar_url": None,
+        })
+
+    def page_object(page_id: str, parent: dict, title: str, properties: dict = None) -> dict:
+        author = gen.rng.choice(ws.users)["id"] if ws.users else gen.uuid()
+        return {
+            "object": "page",
+            "id": page_id,
+            "created_time": BASE_TIME,
+            "last_edited_time": gen.timestamp(),
+            "created_by": {"object": "user", "id": author},
+            "last_edited_by": {"object": "user", "id": author},
+            "parent": parent,
+            "archived": False,
+            "properties": properties or {"title": _title_property(gen, title)},
+            "url": f"https://www.notion.so/{title.replace(' ', '-')}-{page_id.replace('-', '')}",
+        }
+
+    # Page tree: each page hangs under a random earlier page above max depth
+    page_ids = []
+    page_depth = {}
+    for i in range(pages):
+        page_id = gen.uuid()
+        candidates = [p for p in page_ids[-50:] if page_depth[p] < depth - 1]
+        if not page_ids or not candidates or gen.rng.random() < 0.05:
+            parent = {"type": "workspace", "workspace": True}
+            page_depth[page_id] = 0
+        else:
+            parent_id = gen.rng.choice(candidates)
+            parent = {"type": "page_id", "page_id": parent_id}
+            page_depth[page_id] = page_depth[parent_id] + 1
+        ws.pages[page_id] = page_object(page_id, parent, f"{gen.words(2).title()} {i}")
+        page_ids.append(page_id)
+
+    # Databases under random pages, one data source each
+    entry_ids = []
+    for d in range(databases):
+        database_id, ds_id = gen.uuid(), gen.uuid()
+        host = gen.rng.choice(page_ids) if page_ids else None
+        parent = {"type": "page_id", "page_id": host} if host else {"type": "workspace", "workspace": True}
+        title = f"{gen.words(1).title()} Tracker {d}"
+        ws.databases[database_id] = {
+            "object": "database", "id": database_id,
+            "created_time": BASE_TIME, "last_edited_time": gen.timestamp(),
+            "title": [gen.text(title)], "parent": parent,
+            "data_sources": [{"id": ds_id, "name": title}],
+            "url": f"https://www.notion.so/{database_id.replace('-', '')}",
+        }
+        ws.data_sources[ds_id] = {
+            "object": "data_source", "id": ds_id,
+            "parent": {"type": "database_id", "database_id": database_id},
+            "title": [gen.text(title)],
+            "properties": {
+                "Name": {"id": "title", "name": "Name", "type": "title", "title": {}},
+                "Status": {"id": "st", "name": "Status", "type": "select", "select": {"options": []}},
+                "Tags": {"id": "tg", "name": "Tags", "type": "multi_select", "multi_select": {"options": []}},
+                "Files": {"id": "fl", "name": "Files", "type": "files", "files": {}},
+            },
+        }
+        ws.entries[ds_id] = []
+        for e in range(entries_per_database):
+            entry_id = gen.uuid()
+            files = []
+            if gen.rng.random() < asset_ratio * 3:
+                name = f"{gen.words(1)}.pdf"
+                files.append({"name": name, "type": "file",
+                              "file": {"url": _asset_url(gen, ws, name, asset_reuse_ratio),
+                                       "expiry_time": BASE_TIME}})
+            properties = {
+                "Name": _title_property(gen, f"{gen.words(2).title()} {e}"),
+                "Status": {"id": "st", "type": "select",
+                           "select": {"name": gen.rng.choice(["Todo", "Doing", "Done"])}},
+                "Tags": {"id": "tg", "type": "multi_select",
+                         "multi_select": [{"name": gen.words(1)} for _ in range(gen.rng.randint(0, 3))]},
+                "Files": {"id": "fl", "type": "files", "files": files},
+            }
+            parent = {"type": "data_source_id", "data_source_id": ds_id, "database_id": database_id}
+            ws.pages[entry_id] = page_object(entry_id, parent, "", properties)
+            ws.entries[ds_id].append(entry_id)
+            entry_ids.append(entry_id)
+
+    # Blocks (and child_page links) for every page and entry
+    all_page_ids = page_ids + entry_ids
+    for page_id in all_page_ids:
+        count = blocks_per_page if page_id in page_depth else max(1, blocks_per_page // 4)
+        ws.children[page_id] = _make_blocks(
+            gen, ws, page_id, count, block_depth, page_ids, asset_ratio, asset_reuse_ratio,
+        )
+    for page_id in page_ids:
+        parent = ws.pages[page_id]["parent"]
+        if parent["type"] == "page_id":
+            title = "".join(t["plain_text"] for t in ws.pages[page_id]["properties"]["title"]["title"])
+            ws.children[parent["page_id"]].append({
+                "object": "block", "id": page_id, "type": "child_page", "has_children": True,
+                "last_edited_time": BASE_TIME, "child_page": {"title": title},
+            })
+    for database_id, database in ws.databases.items():
+        host = database["parent"].get("page_id")
+        if host:
+            ws.children[host].append({
+                "object": "block", "id": database_id, "type": "child_database",
+                "has_children": False, "last_edited_time": BASE_TIME,
+                "child_database": {"title": database["title"][0]["plain_text"]},
+            })
+
+    # Comments: page-level and on top-level blocks
+    for page_id in all_page_ids:
+        count = int(comments_per_page) + (gen.rng.random() < comments_per_page % 1)
+        for _ in range(count):
+            top_level = ws.children.get(page_id) or []
+            if top_level and gen.rng.random() < 0.6:
+                parent = {"type": "block_id", "block_id": gen.rng.choice(top_level)["id"]}
+            else:
+                parent = {"type": "page_id", "page_id": page_id}
+            ws.comments.setdefault(page_id, []).append({
+                "object": "comment", "id": gen.uuid(), "parent": parent,
+                "discussion_id": gen.uuid(), "created_time": gen.timestamp(),
+                "created_by": {"object": "user", "id": gen.rng.choice(ws.users)["id"]},
+                "rich_text": [gen.text(gen.words(gen.rng.randint(3, 15)))],
+            })
+
+    return ws
+
+
+def block_tree(ws: Workspace, parent_id: str) -> list:
+    """Blocks under parent_id with children nested the way exporter.py stores them."""
+    blocks = []
+    for block in ws.children.get(parent_id, []):
+        block = dict(block)
+        if block.get("has_children") and block["type"] not in ("child_page", "child_database"):
+            block["children"] = block_tree(ws, block["id"])
+        blocks.append(block)
+    return blocks
+
+
+def to_export(ws: Workspace) -> dict:
+    """Shape a workspace like the export.json that exporter.py writes.
+
+    Asset URLs are mapped to assets/<n>.<ext> local paths, as if every
+    download had succeeded.
+    """
+    assets = {url: f"assets/{i:06d}.{url.split('?')[0].rsplit('.', 1)[-1]}"
+              for i, url in enumerate(ws.assets)}
+
+    def localize(file_info: dict):
+        if file_info.get("url") in assets:
+            file_info["_local_path"] = assets[file_info["url"]]
+
+    def with_local_paths(blocks: list) -> list:
+        for block in blocks:
+            if block["type"] == "image":
+                block["image"] = dict(block["image"], file=dict(block["image"]["file"]))
+                localize(block["image"]["file"])
+            with_local_paths(block.get("children", []))
+        return blocks
+
+    pages = {}
+    for page_id, page in ws.pages.items():
+        page = dict(page)
+        page["blocks"] = with_local_paths(block_tree(ws, page_id))
+        pages[page_id] = page
+    for database_id, database in ws.databases.items():
+        database = dict(database)
+        database["data_sources_full"] = [ws.data_sources[ds["id"]] for ds in database["data_sources"]]
+        database["entries"] = [pages[e] for ds in database["data_sources"] for e in ws.entries[ds["id"]]]
+        pages[database_id] = database
+
+    users = {
+        user["id"]: {"name": user["name"], "type": user["type"],
+                     "email": user["person"]["email"], "avatar_url": user["avatar_url"]}
+        for user in ws.users
+    }
+    comments = {page_id: list(c) for page_id, c in ws.comments.items()}
+
+    return {
+        "exported_at": BASE_TIME.replace(".000", ""),
+        "api_version": "2025-09-03",
+        "export_status": "complete",
+        "progress": f"{len(pages)}/{len(pages)}",
+        "page_count": sum(1 for p in pages.values() if p["object"] == "page"),
+        "database_count": len(ws.databases),
+        "data_source_count": len(ws.data_sources),
+        "referenced_database_count": len(ws.databases),
+        "user_count": len(users),
+        "comment_count": sum(len(c) for c in comments.values()),
+        "asset_count": len(assets),
+        "_users": users,
+        "_comments": comments,
+        "_assets": assets,
+        "_databases": dict(ws.databases),
+        "pages": pages,
+    }
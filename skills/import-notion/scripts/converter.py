@@ -5,22 +5,32 @@ Notion Converter - JSON to Markdown
 Converts notion-exporter JSON output to structured Markdown files.
 
 Usage:
-    python converter.py <space_name> [--input <json_path>]
+    python converter.py <space_name> [--input <json_path>] [--stream] [--jobs N] [--incremental]
 
 Example:
     python converter.py viran
     python converter.py viran --input /path/to/notion_content.json
+    python converter.py viran --input /path/to/export.db
+    python converter.py viran --stream
+    python converter.py viran --jobs 8
+    python converter.py viran --incremental
 """
 
+import hashlib
 import json
 import logging
+import multiprocessing
 import os
 import re
 import shutil
 import sys
+from collections import deque
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 
+from export_store import STORE_NAME, ExportStore, page_stub
+
 logging.basicConfig(
     format="%(asctime)s %(levelname)s: %(message)s",
     level=logging.INFO
@@ -32,7 +42,7 @@ logging.basicConfig(
 # =============================================================================
 
 def convert_rich_text(rich_text: list, users: dict = None, page_index: dict = None,
-                      source_path: str = None) -> str:
+                      source_path: str = None, links: "LinkResolver" = None) -> str:
     """Convert Notion rich text array to Markdown string.
 
     Args:
@@ -40,6 +50,8 @@ def convert_rich_text(rich_text: list, users: dict = None, page_index: dict = No
         users: Dict of user_id -> user info for @mentions
         page_index: Dict of page_id -> path for link resolution
         source_path: Path of source file for relative link calculation
+        links: LinkResolver for page_index, shared across pages; used for
+            links and page mentions in place of per-item resolution
     """
     if not rich_text:
         return ""
@@ -63,12 +75,11 @@ def convert_rich_text(rich_text: list, users: dict = None, page_index: dict = No
             elif mention_type == "page" and page_index:
                 page_id = mention.get("page", {}).get("id")
                 if page_id in page_index:
-                    local_path = page_index[page_id]
-                    # Calculate relative path if source_path provided
-                    if source_path:
-                        source_dir = os.path.dirname(source_path)
-                        if source_dir:
-                            local_path = os.path.relpath(local_path, source_dir)
+                    # Relative to source_path when provided
+                    if links:
+                        local_path = links.relative(page_id, source_path)
+                    else:
+                        local_path = relative_link(page_index[page_id], source_path)
                     text = f"[{text}]({local_path})"
             elif mention_type == "date":
                 # Keep plain_text for dates
@@ -86,8 +97,11 @@ def convert_rich_text(rich_text: list, users: dict = None, page_index: dict = No
 
         # Handle links with resolution
         if href and not (item_type == "mention" and "[" in text):
-            if page_index:
-                resolved_href, is_external = resolve_notion_link(href, page_index, source_path)
+            if links or page_index:
+                if links:
+                    resolved_href, is_external = links.resolve(href, source_path)
+                else:
+                    resolved_href, is_external = resolve_notion_link(href, page_index, source_path)
                 if is_external:
                     # Mark external Notion links with arrow indicator
                     text = f"[{text} ↗]({resolved_href})"
@@ -101,6 +115,34 @@ def convert_rich_text(rich_text: list, users: dict = None, page_index: dict = No
     return "".join(result)
 
 
+# Notion page URLs, in order of precedence:
+#   https://www.notion.so/workspace/abc123def456
+#   https://www.notion.so/abc123def456
+#   https://www.notion.so/Page-Title-abc123def456
+NOTION_PAGE_URL = re.compile(
+    r'notion\.so/(?:[^/]+/([a-f0-9]{32})|([a-f0-9]{32})|[^/]+-([a-f0-9]{32}))'
+)
+
+
+def notion_url_id(href: str) -> str:
+    """Return the 32-hex page id of a Notion page URL, or None."""
+    if "notion.so/" not in href:
+        return None
+    match = NOTION_PAGE_URL.search(href)
+    if not match:
+        return None
+    return match.group(1) or match.group(2) or match.group(3)
+
+
+def relative_link(target_path: str, source_path: str = None) -> str:
+    """Path to target_path from the directory of source_path, if given."""
+    if source_path:
+        source_dir = os.path.dirname(source_path)
+        if source_dir:
+            return os.path.relpath(target_path, source_dir)
+    return target_path
+
+
 def resolve_notion_link(href: str, page_index: dict, source_path: str = None) -> tuple:
     """Resolve a Notion URL to local path if possible.
 
@@ -116,261 +158,417 @@ def resolve_notion_link(href: str, page_index: dict, source_path: str = None) ->
     if not href or not page_index:
         return href, False
 
-    # Check for Notion page URLs
-    # Format: https://www.notion.so/Page-Title-abc123def456
-    # Or: https://www.notion.so/workspace/abc123def456
-    notion_patterns = [
-        r'notion\.so/[^/]+/([a-f0-9]{32})',
-        r'notion\.so/([a-f0-9]{32})',
-        r'notion\.so/[^/]+-([a-f0-9]{32})',
-    ]
-
-    for pattern in notion_patterns:
-        match = re.search(pattern, href)
-        if match:
-            # Convert to UUID format
-            raw_id = match.group(1)
-            page_id = f"{raw_id[:8]}-{raw_id[8:12]}-{raw_id[12:16]}-{raw_id[16:20]}-{raw_id[20:]}"
-
-            if page_id in page_index:
-                target_path = page_index[page_id]
-
-                # Calculate relative path if source_path provided
-                if source_path:
-                    source_dir = os.path.dirname(source_path)
-                    if source_dir:
-                        target_path = os.path.relpath(target_path, source_dir)
-
-                return target_path, False
-            else:
-                # Notion link to page not in export - mark as external
-                return href, True
+    raw_id = notion_url_id(href)
+    if not raw_id:
+        return href, False
+
+    # Convert to UUID format
+    page_id = f"{raw_id[:8]}-{raw_id[8:12]}-{raw_id[12:16]}-{raw_id[16:20]}-{raw_id[20:]}"
+    if page_id in page_index:
+        return relative_link(page_index[page_id], source_path), False
+
+    # Notion link to page not in export - mark as external
+    return href, True
+
 
-    return href, False
+class LinkResolver:
+    """Link resolution for one workspace, built once and shared by all pages.
+
+    Maps undashed page ids straight to pages and memoizes relative paths per
+    (source directory, target path), so each distinct link is resolved once
+    per directory rather than once per occurrence.
+    """
+
+    def __init__(self, page_index: dict):
+        self.page_index = page_index
+        self.by_hex = {page_id.replace("-", ""): page_id for page_id in page_index}
+        self.relpaths = {}
+
+    def relative(self, page_id: str, source_path: str = None) -> str:
+        """Path to an indexed page, relative to source_path's directory."""
+        target_path = self.page_index[page_id]
+        source_dir = os.path.dirname(source_path) if source_path else ""
+        if not source_dir:
+            return target_path
+        key = (source_dir, target_path)
+        path = self.relpaths.get(key)
+        if path is None:
+            path = self.relpaths[key] = os.path.relpath(target_path, source_dir)
+        return path
+
+    def resolve(self, href: str, source_path: str = None) -> tuple:
+        """Same contract as resolve_notion_link()."""
+        if not href or not self.page_index:
+            return href, False
+        raw_id = notion_url_id(href)
+        if not raw_id:
+            return href, False
+        page_id = self.by_hex.get(raw_id)
+        if page_id is None:
+            return href, True
+        return self.relative(page_id, source_path), False
 
 
 # =============================================================================
 # Block Conversion
 # =============================================================================
 
-def convert_block(block: dict, users: dict = None, page_index: dict = None,
-                  depth: int = 0, list_counter: dict = None,
-                  block_comments: dict = None, assets_map: dict = None,
-                  source_path: str = None) -> str:
-    """Convert a single Notion block to Markdown.
+class _Frame:
+    """One block on the render stack, plus the list its children render into.
+
+    A frame is "opened" once the first non-empty fragment of its subtree is
+    written; opening writes the separator that precedes it in its parent's
+    list. Blocks whose whole subtree is empty are therefore skipped without
+    any backtracking, just like the `if child_md` filter of a recursive join.
+    """
+
+    __slots__ = ("parent", "kind", "opened", "children", "depth", "indent", "count",
+                 "prefix", "sep", "suffix", "number", "prev_type", "deferred", "capture",
+                 "buffer", "first_item", "saved_out")
+
+    def __init__(self, parent, kind: str, children, depth: int, indent: str = "",
+                 prefix: str = "", sep: str = "\n", suffix: str = ""):
+        self.parent = parent
+        self.kind = kind             # Block type (None for the top level)
+        self.opened = False
+        self.children = children     # Iterator over child blocks still to render
+        self.depth = depth           # Depth the children render at
+        self.indent = indent         # Indent of the block itself
+        self.count = 0               # Non-empty children written so far
+        self.prefix = prefix         # Written before the first non-empty child
+        self.sep = sep               # Written between non-empty children
+        self.suffix = suffix         # Written after the children, if any
+        self.number = 0              # Numbered list counter for the children
+        self.prev_type = None        # Type of the previous child (top level only)
+        self.deferred = ""           # Own text, written only if no child is
+        self.capture = False         # Buffer the first child (table header row)
+        self.buffer = None
+        self.first_item = None
+        self.saved_out = None
+
+
+def table_header_separator(first_row: str, indent: str) -> str:
+    """Markdown header separator line to follow a table's first row."""
+    col_count = first_row.count("|") - 1
+    return "\n" + f"{indent}|" + " --- |" * col_count
+
+
+class BlockRenderer:
+    """Iterative Markdown renderer for a tree of Notion blocks.
+
+    Walks the tree with an explicit stack and passes each fragment to a
+    writer callable as soon as it is known, so nesting depth costs neither
+    recursion nor repeated string copies. The conversion context is bound
+    once per page instead of on every block.
 
     Args:
-        block: Notion block object
         users: Dict of user_id -> user info
         page_index: Dict of page_id -> path for link resolution
-        depth: Current nesting depth for indentation
-        list_counter: Counter for numbered lists
         block_comments: Dict of block_id -> comments
         assets_map: Dict of url -> local asset path
         source_path: Path of source file for relative link calculation
+        links: Shared LinkResolver for page_index
     """
-    block_type = block.get("type", "unsupported")
-    block_data = block.get(block_type, {})
-    block_id = block.get("id", "")
-    indent = "  " * depth
-
-    # Track numbered list counters
-    if list_counter is None:
-        list_counter = {}
-
-    def rt(rich_text):
-        return convert_rich_text(rich_text, users, page_index, source_path)
 
-    def get_asset_path(file_info):
+    def __init__(self, users: dict = None, page_index: dict = None,
+                 block_comments: dict = None, assets_map: dict = None,
+                 source_path: str = None, links: LinkResolver = None):
+        self.users = users
+        self.page_index = page_index
+        self.block_comments = block_comments
+        self.assets_map = assets_map
+        self.source_path = source_path
+        self.links = links
+        self.rt = partial(convert_rich_text, users=users, page_index=page_index,
+                          source_path=source_path, links=links)
+        self.out = None
+
+    def get_asset_path(self, file_info: dict) -> str:
         """Get local asset path if available."""
-        if assets_map and file_info:
+        if self.assets_map and file_info:
             url = file_info.get("url", "")
-            local_path = file_info.get("_local_path") or assets_map.get(url)
+            local_path = file_info.get("_local_path") or self.assets_map.get(url)
             if local_path:
                 return local_path
         return file_info.get("url", "") if file_info else ""
 
-    # Block type handlers
-    if block_type == "paragraph":
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}{text}" if text else ""
+    def block_text(self, block: dict, block_type: str, indent: str, number: int) -> str:
+        """Markdown for the block itself (without children), plus its inline comments."""
+        block_data = block.get(block_type, {})
+        rt = self.rt
+
+        # Block type handlers
+        if block_type == "paragraph":
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}{text}" if text else ""
+
+        elif block_type in ("heading_1", "heading_2", "heading_3"):
+            level = int(block_type[-1])
+            prefix = "#" * level
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}{prefix} {text}"
+
+        elif block_type == "bulleted_list_item":
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}- {text}"
+
+        elif block_type == "numbered_list_item":
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}{number}. {text}"
+
+        elif block_type == "to_do":
+            checked = "x" if block_data.get("checked") else " "
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}- [{checked}] {text}"
+
+        elif block_type == "toggle":
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}<details>\n{indent}<summary>{text}</summary>\n"
+
+        elif block_type == "code":
+            language = block_data.get("language", "")
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}```{language}\n{text}\n{indent}```"
+
+        elif block_type == "quote":
+            text = rt(block_data.get("rich_text", []))
+            # Handle multiline quotes
+            lines = text.split("\n")
+            result = "\n".join(f"{indent}> {line}" for line in lines)
+
+        elif block_type == "callout":
+            icon = block_data.get("icon", {})
+            emoji = icon.get("emoji", "") if icon.get("type") == "emoji" else ""
+            text = rt(block_data.get("rich_text", []))
+            result = f"{indent}> {emoji} {text}"
+
+        elif block_type == "divider":
+            result = f"{indent}---"
+
+        elif block_type == "image":
+            file_info = block_data.get("file", {}) or block_data.get("external", {})
+            path = self.get_asset_path(file_info)
+            caption = rt(block_data.get("caption", []))
+            result = f"{indent}![{caption}]({path})"
+
+        elif block_type in ("file", "video", "pdf"):
+            file_info = block_data.get("file", {}) or block_data.get("external", {})
+            path = self.get_asset_path(file_info)
+            default_caption = {"file": "Download", "video": "Video", "pdf": "PDF"}[block_type]
+            caption = rt(block_data.get("caption", [])) or default_caption
+            result = f"{indent}[{caption}]({path})"
+
+        elif block_type == "bookmark":
+            url = block_data.get("url", "")
+            caption = rt(block_data.get("caption", [])) or url
+            result = f"{indent}[{caption}]({url})"
+
+        elif block_type == "equation":
+            expression = block_data.get("expression", "")
+            result = f"{indent}$$\n{expression}\n$$"
+
+        elif block_type == "table_row":
+            cells = block_data.get("cells", [])
+            cell_texts = [rt(cell) for cell in cells]
+            result = f"{indent}| " + " | ".join(cell_texts) + " |"
+
+        elif block_type == "child_page":
+            title = block_data.get("title", "Untitled")
+            page_id = block.get("id")
+            if self.page_index and page_id in self.page_index:
+                if self.links:
+                    path = self.links.relative(page_id, self.source_path)
+                else:
+                    path = relative_link(self.page_index[page_id], self.source_path)
+                result = f"{indent}[{title}]({path})"
+            else:
+                result = f"{indent}[{title}](notion://{page_id})"
 
-    elif block_type in ("heading_1", "heading_2", "heading_3"):
-        level = int(block_type[-1])
-        prefix = "#" * level
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}{prefix} {text}"
+        elif block_type == "child_database":
+            title = block_data.get("title", "Untitled Database")
+            result = f"{indent}**Database:** {title}"
 
-    elif block_type == "bulleted_list_item":
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}- {text}"
+        elif block_type in ("table", "column_list", "column"):
+            # Containers: content comes from children
+            result = ""
 
-    elif block_type == "numbered_list_item":
-        # Track list numbering per depth level
-        key = f"numbered_{depth}"
-        list_counter[key] = list_counter.get(key, 0) + 1
-        num = list_counter[key]
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}{num}. {text}"
-
-    elif block_type == "to_do":
-        checked = "x" if block_data.get("checked") else " "
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}- [{checked}] {text}"
-
-    elif block_type == "toggle":
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}<details>\n{indent}<summary>{text}</summary>\n"
-
-    elif block_type == "code":
-        language = block_data.get("language", "")
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}```{language}\n{text}\n{indent}```"
-
-    elif block_type == "quote":
-        text = rt(block_data.get("rich_text", []))
-        # Handle multiline quotes
-        lines = text.split("\n")
-        result = "\n".join(f"{indent}> {line}" for line in lines)
-
-    elif block_type == "callout":
-        icon = block_data.get("icon", {})
-        emoji = icon.get("emoji", "") if icon.get("type") == "emoji" else ""
-        text = rt(block_data.get("rich_text", []))
-        result = f"{indent}> {emoji} {text}"
-
-    elif block_type == "divider":
-        result = f"{indent}---"
-
-    elif block_type == "image":
-        file_info = block_data.get("file", {}) or block_data.get("external", {})
-        path = get_asset_path(file_info)
-        caption = rt(block_data.get("caption", []))
-        result = f"{indent}![{caption}]({path})"
-
-    elif block_type == "file":
-        file_info = block_data.get("file", {}) or block_data.get("external", {})
-        path = get_asset_path(file_info)
-        caption = rt(block_data.get("caption", [])) or "Download"
-        result = f"{indent}[{caption}]({path})"
-
-    elif block_type == "video":
-        file_info = block_data.get("file", {}) or block_data.get("external", {})
-        path = get_asset_path(file_info)
-        caption = rt(block_data.get("caption", [])) or "Video"
-        result = f"{indent}[{caption}]({path})"
-
-    elif block_type == "pdf":
-        file_info = block_data.get("file", {}) or block_data.get("external", {})
-        path = get_asset_path(file_info)
-        caption = rt(block_data.get("caption", [])) or "PDF"
-        result = f"{indent}[{caption}]({path})"
-
-    elif block_type == "bookmark":
-        url = block_data.get("url", "")
-        caption = rt(block_data.get("caption", [])) or url
-        result = f"{indent}[{caption}]({url})"
-
-    elif block_type == "equation":
-        expression = block_data.get("expression", "")
-        result = f"{indent}$$\n{expression}\n$$"
-
-    elif block_type == "table":
-        # Tables are handled specially with table_row children
-        result = ""  # Table content comes from children
-
-    elif block_type == "table_row":
-        cells = block_data.get("cells", [])
-        cell_texts = [rt(cell) for cell in cells]
-        result = f"{indent}| " + " | ".join(cell_texts) + " |"
-
-    elif block_type == "child_page":
-        title = block_data.get("title", "Untitled")
-        page_id = block.get("id")
-        if page_index and page_id in page_index:
-            result = f"{indent}[{title}]({page_index[page_id]})"
         else:
-            result = f"{indent}[{title}](notion://{page_id})"
+            # Unsupported block type
+            result = f"{indent}<!-- Unsupported block type: {block_type} -->"
+
+        # Add inline comments for this block
+        block_comments = self.block_comments
+        block_id = block.get("id", "")
+        if block_comments and block_id in block_comments:
+            result += "".join(f"\n{indent}{render_inline_comment(comment, self.users)}"
+                              for comment in block_comments[block_id])
+
+        return result
+
+    def _open(self, frame: _Frame) -> None:
+        """Open frame and any unopened ancestors, writing their separators."""
+        chain = []
+        while not frame.opened:
+            chain.append(frame)
+            frame = frame.parent
+        for frame in reversed(chain):
+            parent = frame.parent
+            if parent.count:
+                self.out(parent.sep)
+            elif parent.capture:
+                # Table: hold the first row back to size the header separator
+                parent.first_item = frame
+                parent.saved_out = self.out
+                parent.buffer = []
+                self.out = parent.buffer.append
+            else:
+                self.out(parent.prefix)
+            parent.count += 1
+            frame.opened = True
+
+    def _write(self, frame: _Frame, text: str) -> None:
+        if text:
+            self._open(frame)
+            self.out(text)
+
+    def _write_leaf(self, parent: _Frame, text: str) -> None:
+        """Write the text of a childless block as the next child of parent."""
+        if not parent.opened:
+            self._open(parent)
+        if parent.count:
+            self.out(parent.sep)
+            self.out(text)
+        elif parent.capture:
+            self.out(text + table_header_separator(text, parent.indent))
+        else:
+            self.out(parent.prefix)
+            self.out(text)
+        parent.count += 1
+
+    def _close(self, frame: _Frame) -> None:
+        """Finish a frame once all of its children have been rendered."""
+        if frame.count:
+            if frame.suffix:
+                self.out(frame.suffix)
+        elif frame.deferred:
+            self._write(frame, frame.deferred)
+
+        parent = frame.parent
+        if parent is not None and parent.first_item is frame:
+            # First table row complete: emit it followed by the header separator
+            first_row = "".join(parent.buffer)
+            self.out = parent.saved_out
+            self.out(first_row + table_header_separator(first_row, parent.indent))
+            parent.first_item = parent.buffer = parent.saved_out = None
+
+    def _push(self, stack: list, parent: _Frame, block: dict) -> None:
+        """Render a block's own text and, if it has children, push its frame."""
+        block_type = block.get("type", "unsupported")
+        depth = parent.depth
+        indent = "  " * depth
+
+        children = block.get("children", [])
+
+        if parent.kind == "column_list":
+            # A column: its content renders at the column list's depth,
+            # blocks separated by blank lines
+            stack.append(_Frame(parent, block_type, iter(children), depth, indent, sep="\n\n"))
+            return
+
+        if parent.kind is None:
+            # Top level: reset numbering when a numbered list ends
+            if block_type != "numbered_list_item" and parent.prev_type == "numbered_list_item":
+                parent.number = 0
+            parent.prev_type = block_type
+        if block_type == "numbered_list_item":
+            parent.number += 1
+
+        text = self.block_text(block, block_type, indent, parent.number)
+
+        if not children:
+            if text:
+                self._write_leaf(parent, text)
+            return
 
-    elif block_type == "child_database":
-        title = block_data.get("title", "Untitled Database")
-        result = f"{indent}**Database:** {title}"
+        if block_type == "column_list":
+            # Columns are joined with an HR separator and replace the block's own text
+            columns = (column for column in children if column.get("type") == "column")
+            frame = _Frame(parent, block_type, columns, depth, indent,
+                           sep=f"\n\n{indent}---\n\n")
+            frame.deferred = text
+        elif block_type == "table":
+            # Rows replace the block's own text; the first row gets a header separator
+            frame = _Frame(parent, block_type, iter(children), depth + 1, indent)
+            frame.deferred = text
+            frame.capture = True
+        elif block_type == "toggle":
+            frame = _Frame(parent, block_type, iter(children), depth + 1, indent,
+                           suffix=f"\n{indent}</details>")
+            self._write(frame, text)
+        else:
+            frame = _Frame(parent, block_type, iter(children), depth + 1, indent, prefix="\n")
+            self._write(frame, text)
+        stack.append(frame)
+
+    def render(self, blocks: list, write, depth: int = 0, list_counter: dict = None) -> None:
+        """Render top-level blocks, separated by blank lines, to write().
+
+        Args:
+            blocks: List of Notion block objects
+            write: Callable receiving each Markdown fragment in order
+            depth: Nesting depth of the blocks
+            list_counter: Numbered list counters (keyed "numbered_<depth>"),
+                updated in place
+        """
+        root = _Frame(None, None, iter(blocks), depth, sep="\n\n")
+        root.opened = True
+        key = f"numbered_{depth}"
+        if list_counter:
+            root.number = list_counter.get(key, 0)
+
+        self.out = write
+        stack = [root]
+        while stack:
+            frame = stack[-1]
+            block = next(frame.children, None)
+            if block is None:
+                stack.pop()
+                if frame is not root:
+                    self._close(frame)
+            else:
+                self._push(stack, frame, block)
+        self.out = None
 
-    elif block_type == "column_list":
-        # Column list: process each column's content and join with separator
-        # Children (columns) are processed in the child handling section below
-        result = ""
+        if list_counter is not None and root.number:
+            list_counter[key] = root.number
 
-    elif block_type == "column":
-        # Individual column: just a container, content comes from children
-        result = ""
 
-    else:
-        # Unsupported block type
-        result = f"{indent}<!-- Unsupported block type: {block_type} -->"
-
-    # Add inline comments for this block
-    if block_comments and block_id in block_comments:
-        comments = block_comments[block_id]
-        for comment in comments:
-            comment_md = render_inline_comment(comment, users)
-            result += f"\n{indent}{comment_md}"
-
-    # Handle children (nested blocks)
-    children = block.get("children", [])
-    if children:
-        # Reset numbered list counter for nested lists
-        child_counter = {}
-        child_results = []
-
-        # Column list: process columns at same depth, join with HR separator
-        if block_type == "column_list":
-            column_contents = []
-            for column in children:
-                if column.get("type") == "column":
-                    column_children = column.get("children", [])
-                    col_child_results = []
-                    col_counter = {}
-                    for col_child in column_children:
-                        # Process column content at current depth (no extra indent)
-                        col_child_md = convert_block(col_child, users, page_index, depth,
-                                                     col_counter, block_comments, assets_map,
-                                                     source_path)
-                        if col_child_md:
-                            col_child_results.append(col_child_md)
-                    if col_child_results:
-                        column_contents.append("\n\n".join(col_child_results))
-            if column_contents:
-                # Join columns with horizontal rule separator
-                result = f"\n\n{indent}---\n\n".join(column_contents)
-        else:
-            for child in children:
-                child_md = convert_block(child, users, page_index, depth + 1, child_counter,
-                                         block_comments, assets_map, source_path)
-                if child_md:
-                    child_results.append(child_md)
-
-            if child_results:
-                if block_type == "toggle":
-                    result += "\n".join(child_results) + f"\n{indent}</details>"
-                elif block_type == "table":
-                    # Add table header separator after first row
-                    if child_results:
-                        first_row = child_results[0]
-                        col_count = first_row.count("|") - 1
-                        separator = f"{indent}|" + " --- |" * col_count
-                        result = first_row + "\n" + separator
-                        if len(child_results) > 1:
-                            result += "\n" + "\n".join(child_results[1:])
-                else:
-                    result += "\n" + "\n".join(child_results)
+def convert_block(block: dict, users: dict = None, page_index: dict = None,
+                  depth: int = 0, list_counter: dict = None,
+                  block_comments: dict = None, assets_map: dict = None,
+                  source_path: str = None, links: LinkResolver = None) -> str:
+    """Convert a single Notion block (and its children) to Markdown.
 
-    return result
+    Args:
+        block: Notion block object
+        users: Dict of user_id -> user info
+        page_index: Dict of page_id -> path for link resolution
+        depth: Current nesting depth for indentation
+        list_counter: Counter for numbered lists
+        block_comments: Dict of block_id -> comments
+        assets_map: Dict of url -> local asset path
+        source_path: Path of source file for relative link calculation
+        links: Shared LinkResolver for page_index
+    """
+    parts = []
+    renderer = BlockRenderer(users, page_index, block_comments, assets_map, source_path, links)
+    renderer.render([block], parts.append, depth, list_counter)
+    return "".join(parts)
 
 
 def convert_blocks(blocks: list, users: dict = None, page_index: dict = None,
                    block_comments: dict = None, assets_map: dict = None,
-                   source_path: str = None) -> str:
+                   source_path: str = None, links: LinkResolver = None) -> str:
     """Convert a list of blocks to Markdown.
 
     Args:
@@ -380,26 +578,12 @@ def convert_blocks(blocks: list, users: dict = None, page_index: dict = None,
         block_comments: Dict of block_id -> comments
         assets_map: Dict of url -> local asset path
         source_path: Path of source file for relative link calculation
+        links: Shared LinkResolver for page_index
     """
-    results = []
-    list_counter = {}
-    prev_type = None
-
-    for block in blocks:
-        block_type = block.get("type")
-
-        # Reset numbered list counter when list type changes
-        if block_type != "numbered_list_item" and prev_type == "numbered_list_item":
-            list_counter = {}
-
-        md = convert_block(block, users, page_index, 0, list_counter, block_comments,
-                          assets_map, source_path)
-        if md:
-            results.append(md)
-
-        prev_type = block_type
-
-    return "\n\n".join(results)
+    parts = []
+    renderer = BlockRenderer(users, page_index, block_comments, assets_map, source_path, links)
+    renderer.render(blocks, parts.append)
+    return "".join(parts)
 
 
 # =============================================================================
@@ -718,7 +902,8 @@ def generate_frontmatter(page: dict, users: dict = None) -> str:
 
 def convert_page(page: dict, users: dict = None, page_index: dict = None,
                  comments: dict = None, assets_map: dict = None,
-                 source_path: str = None) -> str:
+                 source_path: str = None, comment_map: dict = None,
+                 links: LinkResolver = None) -> str:
     """Convert a single page to Markdown with inline comments.
 
     Args:
@@ -728,11 +913,16 @@ def convert_page(page: dict, users: dict = None, page_index: dict = None,
         comments: Dict of page_id -> comments
         assets_map: Dict of url -> local asset path
         source_path: Path of output file for relative link calculation
+        comment_map: Prebuilt build_comment_map() result; when converting many
+            pages, build it once and pass it here instead of comments
+        links: LinkResolver for page_index; when converting many pages,
+            build it once and pass it here
     """
     parts = []
 
     # Build comment map for this page
-    comment_map = build_comment_map(comments) if comments else {"blocks": {}, "pages": {}}
+    if comment_map is None:
+        comment_map = build_comment_map(comments) if comments else {"blocks": {}, "pages": {}}
     block_comments = comment_map["blocks"]
     page_level_comments = comment_map["pages"].get(page.get("id"), [])
 
@@ -749,7 +939,7 @@ def convert_page(page: dict, users: dict = None, page_index: dict = None,
     blocks = page.get("blocks", [])
     if blocks:
         content = convert_blocks(blocks, users, page_index, block_comments, assets_map,
-                                source_path)
+                                source_path, links)
         parts.append(content)
 
     # Page-level comments (not attached to specific blocks) go at bottom
@@ -765,6 +955,561 @@ def convert_page(page: dict, users: dict = None, page_index: dict = None,
     return "\n".join(parts)
 
 
+# =============================================================================
+# Streaming Export Reader
+# =============================================================================
+
+class JsonStream:
+    """Incremental reader for one large JSON document.
+
+    Values are decoded with json.JSONDecoder.raw_decode from a buffer that is
+    refilled from the file on demand, so only the value being decoded is
+    held in memory rather than the whole document.
+    """
+
+    def __init__(self, f, chunk_size: int = 1 << 20):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Read at least size more characters. Returns False at end of file."""
+        if self.eof:
+            return False
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(max(size, self.chunk_size))
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.chunk_size):
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, got {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow geometrically so re-decoding a large value stays linear
+            self._fill(len(self.buf) - self.pos)
+
+    def items(self):
+        """Yield each key of the object at the cursor.
+
+        The caller must consume the key's value with value() or items()
+        before asking for the next key.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+class StreamingExport:
+    """export.json reader that never materializes every page at once.
+
+    scan() makes a light first pass: every top-level field except "pages"
+    is loaded (users, comments, assets, referenced databases) and each page
+    is reduced to a page_stub(). iter_pages() then decodes the full pages
+    one at a time for conversion.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.header = {}
+        self.stubs = {}
+
+    def _walk(self):
+        """Yield (page_id, page) in file order, loading other fields into header."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            stream = JsonStream(f)
+            for key in stream.items():
+                if key != "pages":
+                    self.header[key] = stream.value()
+                    continue
+                for page_id in stream.items():
+                    yield page_id, stream.value()
+
+    def scan(self) -> "StreamingExport":
+        """First pass: header fields and page stubs."""
+        self.stubs = {page_id: page_stub(page) for page_id, page in self._walk()}
+        return self
+
+    def get(self, key: str, default=None):
+        return self.header.get(key, default)
+
+    def index_data(self) -> dict:
+        """The subset of the export build_page_index() reads."""
+        return {"pages": self.stubs, "_databases": self.header.get("_databases", {})}
+
+    def iter_pages(self):
+        """Second pass: yield (page_id, page) with full content, one at a time."""
+        yield from self._walk()
+
+
+# =============================================================================
+# Incremental Output
+# =============================================================================
+
+MANIFEST_FILE = "_manifest.json"
+
+
+def content_hash(text: str) -> str:
+    """sha256 hex digest of text encoded as UTF-8."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def json_hash(value) -> str:
+    """Order-independent hash of a JSON-serializable value."""
+    return content_hash(json.dumps(value, sort_keys=True, ensure_ascii=False))
+
+
+def write_text(path: Path, text: str, only_if_changed: bool = False) -> bool:
+    """Write text to path, creating parent directories. Returns True if written.
+
+    With only_if_changed, a file that already holds exactly these bytes is
+    left untouched so its mtime (and git/editor state) does not change.
+    """
+    data = text.encode("utf-8")
+    if only_if_changed:
+        try:
+            if path.stat().st_size == len(data) and path.read_bytes() == data:
+                return False
+        except FileNotFoundError:
+            pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+# Bump when the Markdown produced for an unchanged page changes, so
+# incremental runs reconvert everything once.
+OUTPUT_VERSION = 3
+
+
+def output_context(users: dict) -> str:
+    """Hash of what every page's Markdown depends on, besides the page itself.
+
+    Links and assets are tracked per page instead (see page_links), since
+    asset URLs are re-signed on every export and any new page changes the
+    page index.
+    """
+    return json_hash([OUTPUT_VERSION, users])
+
+
+def link_targets(page: dict) -> set:
+    """Ids of the pages a page's Markdown may link to.
+
+    Page mentions and Notion URLs in rich text anywhere in the block tree,
+    and child pages. Ids not in the export count too: they render as plain
+    text or external links until they are.
+    """
+    targets = set()
+    stack = list(page.get("blocks", []))
+    while stack:
+        block = stack.pop()
+        if block.get("type") == "child_page":
+            targets.add(block.get("id"))
+        stack.extend(block.get("children", []))
+        values = [block.get(block.get("type"), {})]
+        while values:
+            value = values.pop()
+            if isinstance(value, list):
+                values.extend(value)
+            elif isinstance(value, dict) and "plain_text" in value:
+                mention = value.get("mention", {})
+                if mention.get("type") == "page":
+                    targets.add(mention.get("page", {}).get("id"))
+                raw_id = notion_url_id(value.get("href") or "")
+                if raw_id:
+                    targets.add(f"{raw_id[:8]}-{raw_id[8:12]}-{raw_id[12:16]}-{raw_id[16:20]}-{raw_id[20:]}")
+            elif isinstance(value, dict):
+                values.extend(value.values())
+    targets.discard(None)
+    return targets
+
+
+def page_links(page: dict, page_index: dict) -> str:
+    """Hash of the output paths (or absence) of the pages a page links to."""
+    return json_hash({page_id: page_index.get(page_id) for page_id in link_targets(page)})
+
+
+def empty_stats() -> dict:
+    """Counters reported by a conversion run."""
+    return {"pages": 0, "databases": 0, "entries": 0, "errors": 0,
+            "unchanged": 0, "written": 0, "moved": 0, "removed": 0}
+
+
+class OutputManifest:
+    """Record of what the previous run wrote, kept in _manifest.json.
+
+    Every page maps to its last_edited_time, a hash of its comments, its
+    output path, the paths of the pages it links to (page_links), the
+    assets it uses and a hash of the Markdown written there. In incremental
+    mode a page whose record still matches is not converted again, provided
+    output_context() (output version, users) hashes the same as last time;
+    pages whose path changed have their old file moved or deleted, and
+    pages gone from the export are removed in finish().
+    """
+
+    def __init__(self, output_dir: Path, context: str, comments: dict,
+                 previous: dict = None, incremental: bool = False):
+        self.output_dir = output_dir
+        self.context = context
+        self.incremental = incremental
+        self.comment_hashes = {page_id: json_hash(c) for page_id, c in comments.items()}
+        previous = previous or {}
+        self.previous = previous.get("pages", {}) if incremental else {}
+        self.same_context = incremental and previous.get("context") == context
+        self.pages = {}
+
+    @classmethod
+    def load(cls, output_dir: Path, context: str, comments: dict,
+             incremental: bool = False) -> "OutputManifest":
+        """Create a manifest, reading the previous run's record when incremental."""
+        previous = {}
+        manifest_file = output_dir / MANIFEST_FILE
+        if incremental and manifest_file.exists():
+            try:
+                with open(manifest_file, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable {manifest_file}: {e}")
+        return cls(output_dir, context, comments, previous, incremental)
+
+    def is_current(self, page_id: str, page: dict, rel_path: str, links: str,
+                   assets: list) -> bool:
+        """True if the page's output from the previous run is still valid."""
+        prev = self.previous.get(page_id)
+        return (self.same_context and prev is not None
+                and prev.get("path") == rel_path
+                and prev.get("last_edited_time") == page.get("last_edited_time")
+                and prev.get("comments") == self.comment_hashes.get(page_id)
+                and prev.get("links") == links
+                and prev.get("assets", []) == assets
+                and (self.output_dir / rel_path).exists())
+
+    def keep(self, page_id: str) -> None:
+        """Carry the previous record of an unchanged page into this run."""
+        self.pages[page_id] = self.previous[page_id]
+
+    def record(self, page_id: str, page: dict, rel_path: str, markdown_hash: str,
+               links: str = None, assets: list = None) -> None:
+        self.pages[page_id] = {
+            "object": page.get("object"),
+            "last_edited_time": page.get("last_edited_time"),
+            "comments": self.comment_hashes.get(page_id),
+            "path": rel_path,
+            "hash": markdown_hash,
+            "links": links,
+            "assets": assets or [],
+        }
+
+    def referenced_assets(self) -> set:
+        """File names under assets/ referenced by the pages recorded this run."""
+        return {name for record in self.pages.values() for name in record.get("assets", [])}
+
+    def relocate(self, page_id: str, rel_path: str, markdown_hash: str) -> bool:
+        """Deal with the old file of a page whose output path changed.
+
+        If the old file already holds the new content it is moved into place
+        (returns True, nothing left to write); otherwise it is deleted.
+        """
+        prev = self.previous.get(page_id)
+        if not prev or prev.get("path") == rel_path:
+            return False
+
+        old_file = self.output_dir / prev["path"]
+        new_file = self.output_dir / rel_path
+        moved = False
+        if old_file.exists():
+            if prev.get("hash") == markdown_hash and not new_file.exists():
+                new_file.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(old_file, new_file)
+                moved = True
+            else:
+                old_file.unlink()
+        if prev.get("object") == "database" and old_file.parent != new_file.parent:
+            (old_file.parent / "_schema.json").unlink(missing_ok=True)
+        return moved
+
+    def finish(self) -> dict:
+        """Remove output of pages gone from the export, prune emptied
+        directories and save the manifest. Returns counts."""
+        removed = 0
+        vacated = set()
+        for page_id, prev in self.previous.items():
+            current = self.pages.get(page_id)
+            if current and current["path"] == prev.get("path"):
+                continue
+            old_file = self.output_dir / prev["path"]
+            vacated.add(old_file.parent)
+            if current is None:
+                if old_file.exists():
+                    old_file.unlink()
+                    removed += 1
+                if prev.get("object") == "database":
+                    (old_file.parent / "_schema.json").unlink(missing_ok=True)
+
+        # Deepest first, so a parent emptied by its children is pruned too
+        root = self.output_dir.resolve()
+        for directory in sorted(vacated, key=lambda d: len(d.parts), reverse=True):
+            directory = directory.resolve()
+            while directory != root and root in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break  # Not empty (or already gone)
+                directory = directory.parent
+
+        manifest = {"context": self.context, "pages": self.pages}
+        write_text(self.output_dir / MANIFEST_FILE, json.dumps(manifest, indent=2),
+                   only_if_changed=True)
+        return {"removed": removed}
+
+
+# =============================================================================
+# Parallel Conversion
+# =============================================================================
+
+# Read-only conversion context. Set before the worker pool forks so every
+# worker inherits it instead of receiving it pickled with each task.
+_shared = {}
+
+
+def merge_stats(stats: dict, partial: dict) -> None:
+    """Add a worker's page counts into the overall stats."""
+    for key, count in partial.items():
+        stats[key] += count
+
+
+def convert_chunk(chunk: list) -> tuple:
+    """Worker task: convert a chunk of pages.
+
+    Items are page ids (looked up in the inherited pages dict or
+    ExportStore) or (page_id, page) pairs when pages are streamed from
+    disk. Returns the chunk's stats and its manifest records.
+    """
+    stats = empty_stats()
+    manifest = _shared["manifest"]
+    page_ids = []
+    for item in chunk:
+        page_id, page = (item, _shared["pages"][item]) if isinstance(item, str) else item
+        convert_page_file(page_id, page, _shared["output_dir"], _shared["page_index"],
+                          _shared["users"], _shared["comment_map"], _shared["assets_map"], stats,
+                          manifest, _shared["links"])
+        page_ids.append(page_id)
+    records = {page_id: manifest.pages[page_id] for page_id in page_ids if page_id in manifest.pages}
+    return stats, records
+
+
+def convert_pages_parallel(items, jobs: int, stats: dict, chunk_size: int = 32, **context) -> None:
+    """Convert pages on a pool of `jobs` forked processes, merging stats.
+
+    context holds output_dir, page_index, users, comment_map, assets_map,
+    manifest, links and optionally pages; it is shared with the workers through
+    fork. Manifest records made in the workers are sent back and merged
+    into the parent's manifest. At most two chunks per worker are queued
+    at a time, so streamed pages are not all read ahead into memory.
+    """
+    global _shared
+    _shared = context
+    manifest = context["manifest"]
+
+    def merge(result):
+        partial, records = result
+        merge_stats(stats, partial)
+        manifest.pages.update(records)
+
+    try:
+        try:
+            pool = multiprocessing.get_context("fork").Pool(jobs)
+        except ValueError:
+            logging.warning("Process fork not available, converting in a single process")
+            merge(convert_chunk(list(items)))
+            return
+
+        with pool:
+            pending = deque()
+            chunk = []
+            for item in items:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    pending.append(pool.apply_async(convert_chunk, (chunk,)))
+                    chunk = []
+                    if len(pending) >= jobs * 2:
+                        merge(pending.popleft().get())
+            if chunk:
+                pending.append(pool.apply_async(convert_chunk, (chunk,)))
+            while pending:
+                merge(pending.popleft().get())
+    finally:
+        _shared = {}
+
+
+# =============================================================================
+# Asset Publishing
+# =============================================================================
+
+ASSET_BLOCK_TYPES = ("image", "file", "video", "pdf")
+
+# Linux ioctl that makes dest share src's extents (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+
+def asset_name(file_info: dict, assets_map: dict) -> str:
+    """Name of the exported asset a file object points at, or None."""
+    if not file_info:
+        return None
+    local_path = file_info.get("_local_path") or (assets_map or {}).get(file_info.get("url", ""))
+    if local_path and local_path.startswith("assets/"):
+        return local_path[len("assets/"):]
+    return None
+
+
+def page_assets(page: dict, assets_map: dict = None) -> list:
+    """Sorted names of the exported assets a page's Markdown links to.
+
+    Covers the same places the exporter downloads from: image, file, video
+    and pdf blocks anywhere in the block tree, and files properties.
+    """
+    names = set()
+    stack = list(page.get("blocks", []))
+    while stack:
+        block = stack.pop()
+        block_type = block.get("type")
+        if block_type in ASSET_BLOCK_TYPES:
+            block_data = block.get(block_type, {})
+            names.add(asset_name(block_data.get("file") or block_data.get("external"), assets_map))
+        stack.extend(block.get("children", []))
+
+    for prop in page.get("properties", {}).values():
+        if prop.get("type") == "files":
+            for file_item in prop.get("files", []):
+                names.add(asset_name(file_item.get(file_item.get("type"), {}), assets_map))
+
+    names.discard(None)
+    return sorted(names)
+
+
+def reflink(src: Path, dest: Path) -> bool:
+    """Clone src to dest copy-on-write if the filesystem supports it."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dest, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        dest.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dest)
+    return True
+
+
+def link_asset(src: Path, dest: Path) -> str:
+    """Place src at dest as a hardlink, else a reflink, else a copy.
+
+    Returns "linked", "cloned" or "copied". dest is built next to its final
+    name and moved into place, so a reader never sees a partial file.
+    """
+    tmp = dest.with_name(f".{dest.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+        method = "linked"
+    except OSError:
+        if reflink(src, tmp):
+            method = "cloned"
+        else:
+            shutil.copy2(src, tmp)
+            method = "copied"
+    os.replace(tmp, dest)
+    return method
+
+
+def is_published(src: Path, dest: Path) -> bool:
+    """True if dest already holds src (same file, or same size and mtime)."""
+    try:
+        if os.path.samefile(src, dest):
+            return True
+        a, b = src.stat(), dest.stat()
+    except OSError:
+        return False
+    return a.st_size == b.st_size and int(a.st_mtime) == int(b.st_mtime)
+
+
+def publish_assets(source_assets_dir: Path, output_assets_dir: Path, referenced: set) -> dict:
+    """Make _assets/ hold exactly the referenced assets of the export.
+
+    Only files some converted page links to are published, as hardlinks to
+    the raw export where possible so dated exports and _assets/ share one
+    copy on disk. Files already in place are left alone and files no page
+    references any more are removed. Returns counts.
+    """
+    counts = {"assets": 0, "linked": 0, "cloned": 0, "copied": 0, "pruned": 0}
+    if source_assets_dir and source_assets_dir.exists():
+        for name in sorted(referenced):
+            src = source_assets_dir / name
+            if not src.is_file():
+                continue
+            counts["assets"] += 1
+            dest = output_assets_dir / name
+            if is_published(src, dest):
+                continue
+            output_assets_dir.mkdir(parents=True, exist_ok=True)
+            counts[link_asset(src, dest)] += 1
+
+    if output_assets_dir.exists():
+        for asset_file in output_assets_dir.iterdir():
+            if asset_file.is_file() and asset_file.name not in referenced:
+                asset_file.unlink()
+                counts["pruned"] += 1
+
+    published = counts["linked"] + counts["cloned"] + counts["copied"]
+    if published or counts["pruned"]:
+        logging.info(f"Assets: {counts['linked']} linked, {counts['cloned']} cloned, "
+                     f"{counts['copied']} copied, {counts['pruned']} pruned in {output_assets_dir}")
+    return counts
+
+
 # =============================================================================
 # Main Conversion
 # =============================================================================
@@ -780,91 +1525,96 @@ def resolve_path(path_str: str) -> Path:
     return Path(path_str).expanduser().resolve()
 
 
+def is_finished_store(path: Path) -> bool:
+    """Check whether an export.db holds a completed export."""
+    store = ExportStore(path)
+    try:
+        return store.get("exported_at") is not None
+    finally:
+        store.close()
+
+
 def find_latest_export(raw_export_path: Path) -> Path:
-    """Find the most recent export directory."""
+    """Find the export file in the most recent export directory.
+
+    A finished export.db is used when it is newer than the directory's
+    export.json (or there is none).
+    """
     exports = sorted(raw_export_path.glob("*"), reverse=True)
     for export_dir in exports:
         # Try new name first, fall back to old
+        found = None
         for filename in ["export.json", "notion_content.json"]:
             json_file = export_dir / filename
             if json_file.exists():
-                return json_file
+                found = json_file
+                break
+        store_file = export_dir / STORE_NAME
+        if store_file.exists() and is_finished_store(store_file):
+            if found is None or store_file.stat().st_mtime > found.stat().st_mtime:
+                found = store_file
+        if found:
+            return found
     raise FileNotFoundError(f"No exports found in {raw_export_path}")
 
 
-def copy_assets(source_assets_dir: Path, output_assets_dir: Path) -> int:
-    """Copy assets from export to output _assets directory."""
-    if not source_assets_dir.exists():
-        return 0
-
-    count = 0
-    output_assets_dir.mkdir(parents=True, exist_ok=True)
-
-    for asset_file in source_assets_dir.iterdir():
-        if asset_file.is_file():
-            dest = output_assets_dir / asset_file.name
-            # Handle duplicates - skip if already exists
-            if dest.exists():
-                continue
-            shutil.copy2(asset_file, dest)
-            count += 1
-
-    return count
-
-
-def convert_workspace(data: dict, output_dir: Path, source_assets_dir: Path = None) -> dict:
-    """Convert all pages to Markdown files."""
-    users = data.get("_users", {})
-    comments = data.get("_comments", {})
-    assets_map = data.get("_assets", {})
-    pages = data.get("pages", {})
-
-    # Build page index for link resolution
-    page_index = build_page_index(data)
+def write_workspace_files(output_dir: Path, page_index: dict, users: dict,
+                          incremental: bool = False) -> None:
+    """Write _index.json and _users.json.
 
+    In incremental mode files whose content is unchanged are not rewritten.
+    """
     # Save index file
     index_file = output_dir / "_index.json"
-    with open(index_file, "w", encoding="utf-8") as f:
-        json.dump(page_index, f, indent=2)
-    logging.info(f"Saved index: {index_file}")
+    if write_text(index_file, json.dumps(page_index, indent=2), only_if_changed=incremental):
+        logging.info(f"Saved index: {index_file}")
 
     # Save users file
     users_file = output_dir / "_users.json"
-    with open(users_file, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2)
-    logging.info(f"Saved users: {users_file}")
-
-    # Copy assets to _assets location (not assets/)
-    output_assets_dir = output_dir / "_assets"
-    asset_count = 0
-    if source_assets_dir:
-        asset_count = copy_assets(source_assets_dir, output_assets_dir)
-        if asset_count:
-            logging.info(f"Copied {asset_count} assets to {output_assets_dir}")
-
-    # Convert each page
-    stats = {"pages": 0, "databases": 0, "entries": 0, "errors": 0, "assets": asset_count}
-
-    for page_id, page in pages.items():
-        try:
-            obj_type = page.get("object")
-            title = get_title(page)
+    if write_text(users_file, json.dumps(users, indent=2), only_if_changed=incremental):
+        logging.info(f"Saved users: {users_file}")
 
-            # Get output path from index
-            rel_path = page_index.get(page_id)
-            if not rel_path:
-                continue
 
-            output_file = output_dir / rel_path
-            output_file.parent.mkdir(parents=True, exist_ok=True)
+def convert_page_file(page_id: str, page: dict, output_dir: Path, page_index: dict,
+                      users: dict, comment_map: dict, assets_map: dict, stats: dict,
+                      manifest: OutputManifest = None, links: LinkResolver = None) -> None:
+    """Convert one page to its Markdown file and update stats.
 
+    With an incremental manifest, pages unchanged since the previous run are
+    skipped and files whose bytes would not change are not rewritten. A
+    page that fails to convert keeps its previous output and record.
+    """
+    try:
+        obj_type = page.get("object")
+        title = get_title(page)
+
+        # Get output path from index
+        rel_path = page_index.get(page_id)
+        if not rel_path:
+            return
+
+        output_file = output_dir / rel_path
+        incremental = manifest is not None and manifest.incremental
+
+        if manifest is not None:
+            links_hash = page_links(page, page_index)
+            assets = page_assets(page, assets_map)
+        if incremental and manifest.is_current(page_id, page, rel_path, links_hash, assets):
+            manifest.keep(page_id)
+            stats["unchanged"] += 1
+        else:
             # Convert and write (pass rel_path for relative link calculation)
-            markdown = convert_page(page, users, page_index, comments, assets_map, rel_path)
-            output_file.write_text(markdown, encoding="utf-8")
+            markdown = convert_page(page, users, page_index, assets_map=assets_map,
+                                    source_path=rel_path, comment_map=comment_map, links=links)
+            markdown_hash = content_hash(markdown)
+            if manifest is not None:
+                if manifest.relocate(page_id, rel_path, markdown_hash):
+                    stats["moved"] += 1
+                manifest.record(page_id, page, rel_path, markdown_hash, links_hash, assets)
+            if write_text(output_file, markdown, only_if_changed=incremental):
+                stats["written"] += 1
 
-            # Update stats
             if obj_type == "database":
-                stats["databases"] += 1
                 logging.info(f"Database: {title}")
 
                 # Also write schema for databases
@@ -874,19 +1624,158 @@ def convert_workspace(data: dict, output_dir: Path, source_assets_dir: Path = No
                     "title": title,
                     "data_sources": page.get("data_sources_full", [])
                 }
-                with open(schema_file, "w", encoding="utf-8") as f:
-                    json.dump(schema, f, indent=2)
+                write_text(schema_file, json.dumps(schema, indent=2), only_if_changed=incremental)
+
+        # Update stats
+        if obj_type == "database":
+            stats["databases"] += 1
+        else:
+            parent = page.get("parent", {})
+            if parent.get("type") == "data_source_id":
+                stats["entries"] += 1
             else:
-                parent = page.get("parent", {})
-                if parent.get("type") == "data_source_id":
-                    stats["entries"] += 1
-                else:
-                    stats["pages"] += 1
+                stats["pages"] += 1
+
+    except Exception as e:
+        logging.error(f"Failed to convert {page_id}: {e}")
+        stats["errors"] += 1
+        if manifest is not None:
+            # Not gone from the export: keep its last good file and assets
+            if page_id in manifest.previous:
+                manifest.keep(page_id)
+            else:
+                manifest.pages.pop(page_id, None)
+
+
+def convert_workspace(data: dict, output_dir: Path, source_assets_dir: Path = None,
+                      jobs: int = 1, incremental: bool = False) -> dict:
+    """Convert all pages to Markdown files, on `jobs` processes when jobs > 1.
+
+    With incremental, only pages changed since the run recorded in
+    _manifest.json are converted and only changed files are written.
+    """
+    users = data.get("_users", {})
+    comments = data.get("_comments", {})
+    assets_map = data.get("_assets", {})
+    pages = data.get("pages", {})
+
+    # Build page index and link resolver, and the comment map once for all pages
+    page_index = build_page_index(data)
+    comment_map = build_comment_map(comments)
+    links = LinkResolver(page_index)
+    manifest = OutputManifest.load(output_dir, output_context(users),
+                                   comments, incremental)
+    write_workspace_files(output_dir, page_index, users, incremental)
+
+    # Convert each page
+    stats = empty_stats()
+
+    if jobs > 1:
+        convert_pages_parallel(iter(pages), jobs, stats, pages=pages, output_dir=output_dir,
+                               page_index=page_index, users=users, comment_map=comment_map,
+                               assets_map=assets_map, manifest=manifest, links=links)
+    else:
+        for page_id, page in pages.items():
+            convert_page_file(page_id, page, output_dir, page_index, users, comment_map,
+                              assets_map, stats, manifest, links)
+
+    stats.update(manifest.finish())
+    stats.update(publish_assets(source_assets_dir, output_dir / "_assets",
+                                manifest.referenced_assets()))
+    return stats
+
+
+def convert_workspace_streaming(export, output_dir: Path,
+                                source_assets_dir: Path = None, jobs: int = 1,
+                                incremental: bool = False) -> dict:
+    """Convert all pages to Markdown files, holding one full page in memory at a time.
 
-        except Exception as e:
-            logging.error(f"Failed to convert {page_id}: {e}")
-            stats["errors"] += 1
+    Expects a StreamingExport that has been through scan(), the light first
+    pass that collects ids, parents and titles for the page index, or an
+    ExportStore. The second pass converts and writes each page before
+    decoding the next. With an ExportStore, parallel workers read their
+    pages from export.db by id instead of receiving them from this process.
+    """
+    users = export.get("_users", {})
+    comments = export.get("_comments", {})
+    assets_map = export.get("_assets", {})
+
+    page_index = build_page_index(export.index_data())
+    comment_map = build_comment_map(comments)
+    links = LinkResolver(page_index)
+    manifest = OutputManifest.load(output_dir, output_context(users),
+                                   comments, incremental)
+    write_workspace_files(output_dir, page_index, users, incremental)
+
+    stats = empty_stats()
+
+    if jobs > 1 and isinstance(export, ExportStore):
+        convert_pages_parallel(iter(export.page_ids()), jobs, stats, pages=export,
+                               output_dir=output_dir, page_index=page_index, users=users,
+                               comment_map=comment_map, assets_map=assets_map,
+                               manifest=manifest, links=links)
+    elif jobs > 1:
+        convert_pages_parallel(export.iter_pages(), jobs, stats, output_dir=output_dir,
+                               page_index=page_index, users=users, comment_map=comment_map,
+                               assets_map=assets_map, manifest=manifest, links=links)
+    else:
+        for page_id, page in export.iter_pages():
+            convert_page_file(page_id, page, output_dir, page_index, users, comment_map,
+                              assets_map, stats, manifest, links)
+
+    stats.update(manifest.finish())
+    stats.update(publish_assets(source_assets_dir, output_dir / "_assets",
+                                manifest.referenced_assets()))
+    return stats
+
+
+def read_json_file(path: Path, default=None):
+    """A JSON file's content, or default if it is missing or unreadable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
 
+
+def patch_workspace(export: ExportStore, output_dir: Path, page_ids: list,
+                    source_assets_dir: Path = None) -> dict:
+    """Rewrite only the Markdown of the given pages, in place.
+
+    For sync.py, after it has patched those pages into export.db. Every
+    other page keeps its file and manifest record. If the page index
+    (titles, paths) or users changed since the last run, links and paths in
+    other pages may be stale too, so this falls back to an incremental
+    convert_workspace_streaming() over the whole export.
+    """
+    users = export.get("_users", {})
+    page_index = build_page_index(export.index_data())
+    if (read_json_file(output_dir / "_index.json") != page_index
+            or read_json_file(output_dir / "_users.json") != users
+            or not (output_dir / MANIFEST_FILE).exists()):
+        logging.info("Page index or users changed, converting incrementally")
+        return convert_workspace_streaming(export, output_dir, source_assets_dir, incremental=True)
+
+    comments = export.get("_comments", {})
+    assets_map = export.get("_assets", {})
+    manifest = OutputManifest.load(output_dir, output_context(users),
+                                   comments, incremental=True)
+    manifest.pages = dict(manifest.previous)
+    manifest.same_context = False  # Reconvert every listed page; unchanged bytes are not rewritten
+    comment_map = build_comment_map({page_id: comments[page_id]
+                                     for page_id in page_ids if page_id in comments})
+    links = LinkResolver(page_index)
+
+    stats = empty_stats()
+    for page_id in page_ids:
+        page = export.page(page_id)
+        if page is not None:
+            convert_page_file(page_id, page, output_dir, page_index, users, comment_map,
+                              assets_map, stats, manifest, links)
+
+    stats.update(manifest.finish())
+    stats.update(publish_assets(source_assets_dir, output_dir / "_assets",
+                                manifest.referenced_assets()))
     return stats
 
 
@@ -896,7 +1785,7 @@ def main():
 
     # Parse arguments
     if len(sys.argv) < 2:
-        print("Usage: python converter.py <space_name> [--input <json_path>]")
+        print("Usage: python converter.py <space_name> [--input <json_path>] [--stream] [--jobs N] [--incremental]")
         print()
         if config.get("spaces"):
             print("Available spaces:")
@@ -913,6 +1802,13 @@ def main():
         if idx + 1 < len(sys.argv):
             input_path = Path(sys.argv[idx + 1])
 
+    # Worker processes for page conversion
+    jobs = 1
+    if "--jobs" in sys.argv:
+        idx = sys.argv.index("--jobs")
+        if idx + 1 < len(sys.argv):
+            jobs = int(sys.argv[idx + 1])
+
     space_config = config.get("spaces", {}).get(space_name)
     if not space_config:
         logging.error(f"Unknown space: {space_name}")
@@ -931,9 +1827,15 @@ def main():
 
     logging.info(f"Input: {json_file}")
 
-    # Load export data
-    with open(json_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Load export data (--stream decodes one page at a time to bound memory;
+    # export.db is always read page by page)
+    if json_file.suffix == ".db":
+        data = ExportStore(json_file)
+    elif "--stream" in sys.argv:
+        data = StreamingExport(json_file).scan()
+    else:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
     logging.info(f"Loaded {data.get('page_count', 0)} pages, {data.get('database_count', 0)} databases")
     logging.info(f"  Users: {data.get('user_count', 0)}, Comments: {data.get('comment_count', 0)}, Assets: {data.get('asset_count', 0)}")
@@ -944,12 +1846,20 @@ def main():
 
     logging.info(f"Output: {output_dir}")
 
-    # Convert
-    stats = convert_workspace(data, output_dir, source_assets_dir)
+    # Convert (--incremental skips pages unchanged since the last run's _manifest.json)
+    incremental = "--incremental" in sys.argv
+    if isinstance(data, (StreamingExport, ExportStore)):
+        stats = convert_workspace_streaming(data, output_dir, source_assets_dir, jobs, incremental)
+    else:
+        stats = convert_workspace(data, output_dir, source_assets_dir, jobs, incremental)
 
     print()
     print(f"Done! Converted {stats['pages']} pages, {stats['databases']} databases, {stats['entries']} entries")
-    print(f"  Assets: {stats['assets']}")
+    print(f"  Assets: {stats['assets']} ({stats['linked']} linked, {stats['cloned']} cloned, "
+          f"{stats['copied']} copied, {stats['pruned']} pruned)")
+    if incremental:
+        print(f"  Unchanged: {stats['unchanged']}, Written: {stats['written']}, "
+              f"Moved: {stats['moved']}, Removed: {stats['removed']}")
     if stats["errors"]:
         print(f"Errors: {stats['errors']}")
 
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Notion Export Store - SQLite Backend
+
+An alternative to export.json that keeps an export in export.db, with
+pages, blocks, users, comments, assets and referenced databases in tables
+keyed by id. The exporter (--sqlite) commits each fetched page in its own
+transaction, and converter.py reads export.db directly: any page, its
+blocks or the pages under a parent can be looked up without reading the
+rest of the export.
+
+Run as a script to materialize the legacy export.json from an export.db,
+for tools that still read the single-document layout.
+
+Usage:
+    python export_store.py <export.db> [--output <export.json>]
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+STORE_NAME = "export.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id TEXT PRIMARY KEY,
+    object TEXT,
+    parent_type TEXT,
+    parent_id TEXT,
+    last_edited_time TEXT,
+    has_blocks INTEGER NOT NULL,
+    stub TEXT NOT NULL,            -- page_stub(): what the page index needs
+    data TEXT NOT NULL             -- the page without its blocks
+);
+CREATE INDEX IF NOT EXISTS pages_parent ON pages (parent_id);
+CREATE TABLE IF NOT EXISTS blocks (
+    page_id TEXT NOT NULL,
+    position INTEGER NOT NULL,     -- pre-order position within the page
+    parent_position INTEGER,       -- NULL for top-level blocks
+    id TEXT,
+    nested INTEGER NOT NULL,       -- the block had a "children" list
+    data TEXT NOT NULL,            -- the block without its children
+    PRIMARY KEY (page_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS blocks_id ON blocks (id);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS comments (
+    page_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL             -- the page's comment list
+);
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    local_path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS databases (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS db_chunks (
+    seq INTEGER PRIMARY KEY,
+    database_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+# Header fields stored as tables rather than in meta
+TABLE_FIELDS = ("_users", "_comments", "_assets", "_databases")
+
+
+def dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def dump_nested(value, level: int) -> str:
+    """Serialize a value as json.dump(indent=2) would at the given nesting level."""
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + "  " * level)
+
+
+def write_export_json(output_file: Path, header: dict, pages) -> None:
+    """Write the export.json layout from header fields and (page_id, page) pairs.
+
+    Pages are written one at a time, and the output is byte-identical to
+    json.dump(export, indent=2, ensure_ascii=False). Replaces output_file
+    atomically.
+    """
+    tmp_file = output_file.with_suffix(".json.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as out:
+        out.write("{")
+        for key, value in header.items():
+            out.write(f"\n  {json.dumps(key)}: {dump_nested(value, 1)},")
+        out.write('\n  "pages": {')
+        count = 0
+        for page_id, page in pages:
+            sep = "," if count else ""
+            out.write(f"{sep}\n    {json.dumps(page_id)}: {dump_nested(page, 2)}")
+            count += 1
+        out.write("\n  }\n}" if count else "}\n}")
+    os.replace(tmp_file, output_file)
+
+
+def page_stub(page: dict) -> dict:
+    """Keep only the fields build_page_index and get_title need."""
+    properties = {
+        name: prop for name, prop in page.get("properties", {}).items()
+        if prop.get("type") in ("title", "rich_text")
+    }
+    stub = {
+        "id": page.get("id"),
+        "object": page.get("object"),
+        "parent": page.get("parent", {}),
+        "last_edited_time": page.get("last_edited_time"),
+        "properties": properties,
+    }
+    if isinstance(page.get("title"), list):
+        stub["title"] = page["title"]
+    return stub
+
+
+def flatten_blocks(page_id: str, blocks: list) -> list:
+    """Block tree -> blocks table rows, in pre-order so parents precede children."""
+    rows = []
+    stack = [(None, block) for block in reversed(blocks)]
+    while stack:
+        parent_position, block = stack.pop()
+        position = len(rows)
+        data = {key: value for key, value in block.items() if key != "children"}
+        rows.append((page_id, position, parent_position, block.get("id"),
+                     "children" in block, dumps(data)))
+        stack.extend((position, child) for child in reversed(block.get("children", [])))
+    return rows
+
+
+class ExportStore:
+    """An export held in SQLite, written page by page and read by id.
+
+    Reads mirror StreamingExport (get, index_data, iter_pages) so the
+    converter can use either. The connection is reopened in a forked
+    process, so converter workers can read pages by id themselves.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = None
+        self._pid = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            # The async exporter saves database chunks from its event loop
+            # thread while the main thread waits, so use is never concurrent
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def put_page(self, page_id: str, page: dict, assets: dict = None) -> None:
+        """Store a page/database, its blocks and the assets downloaded for it in one transaction.
+
+        A page stored again is replaced but keeps its original position in
+        iter_pages(). Saved database chunks for the id are dropped.
+        """
+        parent = page.get("parent", {})
+        parent_type = parent.get("type")
+        data = {key: value for key, value in page.items() if key != "blocks"}
+        with self.conn as conn:
+            conn.execute(
+                "INSERT INTO pages (id, object, parent_type, parent_id, last_edited_time, "
+                "has_blocks, stub, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET object = excluded.object, "
+                "parent_type = excluded.parent_type, parent_id = excluded.parent_id, "
+                "last_edited_time = excluded.last_edited_time, has_blocks = excluded.has_blocks, "
+                "stub = excluded.stub, data = excluded.data",
+                (page_id, page.get("object"), parent_type, parent.get(parent_type),
+                 page.get("last_edited_time"), "blocks" in page, dumps(page_stub(page)), dumps(data)),
+            )
+            conn.execute("DELETE FROM blocks WHERE page_id = ?", (page_id,))
+            conn.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                             flatten_blocks(page_id, page.get("blocks", [])))
+            if assets:
+                conn.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?)", assets.items())
+            conn.execute("DELETE FROM db_chunks WHERE database_id = ?", (page_id,))
+
+    def put_comments(self, page_id: str, comments: list) -> None:
+        """Replace a page's comments (dropping them when the list is empty)."""
+        with self.conn as conn:
+            if comments:
+                conn.execute("INSERT INTO comments VALUES (?, ?) "
+                             "ON CONFLICT (page_id) DO UPDATE SET data = excluded.data",
+                             (page_id, dumps(comments)))
+            else:
+                conn.execute("DELETE FROM comments WHERE page_id = ?", (page_id,))
+
+    def put_database(self, database_id: str, database: dict) -> None:
+        """Store a referenced database object."""
+        with self.conn as conn:
+            conn.execute("INSERT INTO databases VALUES (?, ?) "
+                         "ON CONFLICT (id) DO UPDATE SET data = excluded.data",
+                         (database_id, dumps(database)))
+
+    def update_header(self, fields: dict) -> None:
+        """Set header fields kept in meta (counts, exported_at, ...) in place."""
+        with self.conn as conn:
+            conn.executemany("INSERT INTO meta VALUES (?, ?) "
+                             "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                             [(key, dumps(value)) for key, value in fields.items()
+                              if key not in TABLE_FIELDS])
+
+    def put_chunk(self, database_id: str, chunk: dict) -> None:
+        """Save one query page of a database still being fetched."""
+        with self.conn as conn:
+            conn.execute("INSERT INTO db_chunks (database_id, data) VALUES (?, ?)",
+                         (database_id, dumps(chunk)))
+
+    def chunks(self):
+        """Yield (database_id, chunk) for databases left part-way through, in save order."""
+        for database_id, data in self.conn.execute(
+                "SELECT database_id, data FROM db_chunks ORDER BY seq"):
+            yield database_id, json.loads(data)
+
+    def finish(self, header: dict) -> None:
+        """Store the export header, users, comments, assets and referenced databases."""
+        with self.conn as conn:
+            conn.execute("DELETE FROM meta")
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                (key, dumps(value)) for key, value in header.items() if key not in TABLE_FIELDS
+            ])
+            for table, key, rows in (
+                ("users", "_users", header.get("_users", {})),
+                ("comments", "_comments", header.get("_comments", {})),
+                ("assets", "_assets", header.get("_assets", {})),
+                ("databases", "_databases", header.get("_databases", {})),
+            ):
+                conn.execute(f"DELETE FROM {table}")
+                if table == "assets":
+                    conn.executemany("INSERT INTO assets VALUES (?, ?)", rows.items())
+                else:
+                    conn.executemany(f"INSERT INTO {table} VALUES (?, ?)",
+                                     [(item_id, dumps(value)) for item_id, value in rows.items()])
+            conn.execute("DELETE FROM db_chunks")
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def get(self, key: str, default=None):
+        """A header field, as it appears at the top level of export.json."""
+        if key == "_assets":
+            return dict(self.conn.execute("SELECT url, local_path FROM assets ORDER BY rowid"))
+        if key in TABLE_FIELDS:
+            table = key[1:]
+            id_column = "page_id" if table == "comments" else "id"
+            return {item_id: json.loads(data) for item_id, data in self.conn.execute(
+                f"SELECT {id_column}, data FROM {table} ORDER BY rowid")}
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def header(self) -> dict:
+        """Every header field, in export.json order."""
+        header = {key: json.loads(value)
+                  for key, value in self.conn.execute("SELECT key, value FROM meta ORDER BY rowid")}
+        for key in TABLE_FIELDS:
+            header[key] = self.get(key)
+        return header
+
+    def object_counts(self) -> dict:
+        """Stored pages, databases and the data sources of those databases."""
+        pages, databases, data_sources = self.conn.execute(
+            "SELECT COUNT(*) FILTER (WHERE object = 'page'), "
+            "COUNT(*) FILTER (WHERE object = 'database'), "
+            "COALESCE(SUM(json_array_length(data, '$.data_sources_full')) "
+            "FILTER (WHERE object = 'database'), 0) FROM pages"
+        ).fetchone()
+        return {"page_count": pages, "database_count": databases, "data_source_count": data_sources}
+
+    def summary(self) -> dict:
+        """The count fields of the export header, counted from the tables."""
+        users, comments, assets, databases = self.conn.execute(
+            "SELECT (SELECT COUNT(*) FROM users), "
+            "(SELECT COALESCE(SUM(json_array_length(data)), 0) FROM comments), "
+            "(SELECT COUNT(*) FROM assets), (SELECT COUNT(*) FROM databases)"
+        ).fetchone()
+        return {**self.object_counts(), "referenced_database_count": databases,
+                "user_count": users, "comment_count": comments, "asset_count": assets}
+
+    def newest_edit(self) -> str:
+        """The latest last_edited_time of any stored page or database."""
+        return self.conn.execute("SELECT MAX(last_edited_time) FROM pages").fetchone()[0]
+
+    def page_ids(self) -> list:
+        return [row[0] for row in self.conn.execute("SELECT id FROM pages ORDER BY rowid")]
+
+    def stub(self, page_id: str) -> dict:
+        """The page_stub() of a page (title, parent, last_edited_time), or None."""
+        row = self.conn.execute("SELECT stub FROM pages WHERE id = ?", (page_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def children(self, parent_id: str) -> list:
+        """Ids of the pages directly under a page, block or data source."""
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM pages WHERE parent_id = ? ORDER BY rowid", (parent_id,))]
+
+    def blocks(self, page_id: str) -> list:
+        """A page's block tree."""
+        blocks, nodes = [], []
+        for parent_position, nested, data in self.conn.execute(
+                "SELECT parent_position, nested, data FROM blocks WHERE page_id = ? ORDER BY position",
+                (page_id,)):
+            block = json.loads(data)
+            if nested:
+                block["children"] = []
+            nodes.append(block)
+            (blocks if parent_position is None else nodes[parent_position]["children"]).append(block)
+        return blocks
+
+    def _page(self, page_id: str, has_blocks: int, data: str) -> dict:
+        page = json.loads(data)
+        if has_blocks:
+            page["blocks"] = self.blocks(page_id)
+        return page
+
+    def page(self, page_id: str) -> dict:
+        """A page or database with its blocks, or None."""
+        row = self.conn.execute("SELECT has_blocks, data FROM pages WHERE id = ?",
+                                (page_id,)).fetchone()
+        return self._page(page_id, *row) if row else None
+
+    def __getitem__(self, page_id: str) -> dict:
+        page = self.page(page_id)
+        if page is None:
+            raise KeyError(page_id)
+        return page
+
+    def index_data(self) -> dict:
+        """The subset of the export build_page_index() reads."""
+        stubs = {page_id: json.loads(stub) for page_id, stub in self.conn.execute(
+            "SELECT id, stub FROM pages ORDER BY rowid")}
+        return {"pages": stubs, "_databases": self.get("_databases", {})}
+
+    def iter_pages(self):
+        """Yield (page_id, page) with full content, one at a time."""
+        rows = self.conn.execute("SELECT id, has_blocks, data FROM pages ORDER BY rowid")
+        for page_id, has_blocks, data in rows:
+            yield page_id, self._page(page_id, has_blocks, data)
+
+    def to_dict(self) -> dict:
+        """The whole export as json.load(export.json) would return it."""
+        return {**self.header(), "pages": dict(self.iter_pages())}
+
+    def write_json(self, output_file: Path) -> None:
+        """Materialize the legacy export.json."""
+        write_export_json(output_file, self.header(), self.iter_pages())
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(__doc__)
+        sys.exit(0 if sys.argv[1:] else 1)
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s: %(message)s", level=logging.INFO)
+
+    store_file = Path(sys.argv[1]).expanduser()
+    if not store_file.exists():
+        logging.error(f"Not found: {store_file}")
+        sys.exit(1)
+
+    output_file = store_file.parent / "export.json"
+    if "--output" in sys.argv:
+        idx = sys.argv.index("--output")
+        if idx + 1 < len(sys.argv):
+            output_file = Path(sys.argv[idx + 1]).expanduser()
+
+    store = ExportStore(store_file)
+    if store.get("exported_at") is None:
+        logging.error(f"{store_file} is an unfinished export (resume it with exporter.py --resume)")
+        sys.exit(1)
+    store.write_json(output_file)
+    print(f"Wrote {output_file} ({len(store.page_ids())} pages)")
+
+
+if __name__ == "__main__":
+    main()
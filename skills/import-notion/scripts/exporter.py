@@ -6,25 +6,44 @@ Exports all Notion pages shared with the integration to raw JSON format.
 Based on notion4ever's export approach with added rate limiting.
 
 Usage:
-    python exporter.py [space_name]
+    python exporter.py [space_name] [--concurrency N] [--incremental] [--resume] [--sqlite]
 
 Example:
     python exporter.py viran
+    python exporter.py viran --concurrency 6
+    python exporter.py viran --incremental
+    python exporter.py viran --resume
+    python exporter.py viran --sqlite
 """
 
+import asyncio
+import bisect
+import copy
+import hashlib
 import json
 import logging
 import os
+import queue
+import random
 import re
+import shutil
 import sys
+import threading
 import time
+import uuid
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from urllib.parse import urlparse, unquote
 
 import httpx
 from dotenv import load_dotenv
-from notion_client import Client, APIResponseError
+from notion_client import AsyncClient, Client, APIResponseError
+from notion_client.client import ClientOptions
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from export_store import STORE_NAME, ExportStore, write_export_json
 
 # =============================================================================
 # Configuration
@@ -35,51 +54,494 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# =============================================================================
+# Metrics
+# =============================================================================
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Path segments that are object ids, collapsed so endpoints aggregate
+ID_SEGMENT = re.compile(r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$", re.I)
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Endpoint label for a request, e.g. "GET /blocks/{id}/children"."""
+    parts = ["{id}" if ID_SEGMENT.match(p) else p for p in path.split("/") if p and p != "v1"]
+    return f"{method} /{'/'.join(parts)}"
+
+
+def prom_escape(value) -> str:
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Duration histogram with cumulative buckets, as Prometheus exposes them."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> list:
+        """(upper bound label, observations <= bound) pairs, ending with +Inf."""
+        total, result = 0, []
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 3),
+            "mean": round(self.sum / self.count, 4) if self.count else 0,
+            "max": round(self.max, 3),
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class ExportMetrics:
+    """Thread-safe counters and timings for one export.
+
+    HTTP requests are recorded per endpoint by MeteredTransport (count,
+    status, latency, bytes); the rate-limited clients add retries, throttle
+    and backoff time; export_workspace adds per-phase and per-page fetch
+    times and block recursion depth; AssetDownloader adds download times.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = utc_now()
+        self.started = time.perf_counter()
+        self.endpoints = {}       # endpoint -> {"requests", "errors", "bytes", "statuses", "latency"}
+        self.counters = Counter()  # throttle_seconds, backoff_seconds, gave_up, asset_bytes, ...
+        self.retries = Counter()   # reason (status or error type) -> retries
+        self.timings = {}          # name -> Histogram
+        self.block_depth = Counter()  # recursion depth -> block children lists fetched
+        self.phases = {}           # export phase -> seconds
+        self._phase = None
+
+    def record_request(self, endpoint: str, status: int, seconds: float, nbytes: int) -> None:
+        """Record one HTTP request; status is None when no response arrived."""
+        with self.lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    "requests": 0, "errors": 0, "bytes": 0, "statuses": Counter(), "latency": Histogram(),
+                }
+            stats["requests"] += 1
+            stats["bytes"] += nbytes
+            stats["latency"].observe(seconds)
+            if status is None or status >= 400:
+                stats["errors"] += 1
+            stats["statuses"][str(status or "error")] += 1
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.counters[name] += value
+
+    def retry(self, reason: str, delay: float) -> None:
+        with self.lock:
+            self.retries[reason] += 1
+            self.counters["backoff_seconds"] += delay
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self.lock:
+            histogram = self.timings.get(name)
+            if histogram is None:
+                histogram = self.timings[name] = Histogram()
+            histogram.observe(seconds)
+
+    def depth(self, depth: int) -> None:
+        with self.lock:
+            self.block_depth[depth] += 1
+
+    def begin_phase(self, name: str = None) -> None:
+        """End the current export phase (if any) and start timing `name`."""
+        now = time.perf_counter()
+        if self._phase:
+            phase, started = self._phase
+            self.phases[phase] = self.phases.get(phase, 0) + now - started
+        self._phase = (name, now) if name else None
+
+    def totals(self) -> dict:
+        endpoints = list(self.endpoints.values())
+        return {
+            "requests": sum(e["requests"] for e in endpoints),
+            "errors": sum(e["errors"] for e in endpoints),
+            "bytes": sum(e["bytes"] for e in endpoints),
+            "retries": sum(self.retries.values()),
+            "throttle_seconds": round(self.counters["throttle_seconds"], 3),
+            "backoff_seconds": round(self.counters["backoff_seconds"], 3),
+        }
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "duration_seconds": round(time.perf_counter() - self.started, 3),
+                "totals": self.totals(),
+                "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                "endpoints": {
+                    name: {**stats, "statuses": dict(stats["statuses"]),
+                           "latency": stats["latency"].to_dict()}
+                    for name, stats in sorted(self.endpoints.items())
+                },
+                "retries": dict(self.retries),
+                "counters": {name: round(value, 3) for name, value in self.counters.items()},
+                "timings": {name: h.to_dict() for name, h in self.timings.items()},
+                "block_depth": {str(d): n for d, n in sorted(self.block_depth.items())},
+            }
+
+    def write_json(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write a node_exporter textfile-collector file (atomically, as it requires)."""
+        data = self.to_dict()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list):
+            lines.append(f"# HELP notion_export_{name} {help_text}")
+            lines.append(f"# TYPE notion_export_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{prom_escape(v)}"' for k, v in labels.items())
+                lines.append(f"notion_export_{name}{suffix}{{{label_text}}} {value}"
+                             if label_text else f"notion_export_{name}{suffix} {value}")
+
+        def histogram(name: str, help_text: str, histograms: dict, label: str = None):
+            samples = []
+            for key, h in histograms.items():
+                labels = {label: key} if label else {}
+                for bound, count in h["buckets"].items():
+                    samples.append(("_bucket", {**labels, "le": bound}, count))
+                samples.append(("_sum", labels, h["sum"]))
+                samples.append(("_count", labels, h["count"]))
+            metric(name, "histogram", help_text, samples)
+
+        endpoints = data["endpoints"]
+        metric("requests_total", "counter", "HTTP requests to the Notion API.",
+               [("", {"endpoint": e, "status": status}, n)
+                for e, stats in endpoints.items() for status, n in stats["statuses"].items()])
+        metric("response_bytes_total", "counter", "Response body bytes received from the Notion API.",
+               [("", {"endpoint": e}, stats["bytes"]) for e, stats in endpoints.items()])
+        histogram("request_seconds", "Notion API request latency.",
+                  {e: stats["latency"] for e, stats in endpoints.items()}, "endpoint")
+        metric("retries_total", "counter", "Requests retried, by status or error type.",
+               [("", {"reason": reason}, n) for reason, n in data["retries"].items()])
+        metric("throttle_seconds_total", "counter", "Time requests waited for the rate limiter, summed over concurrent requests.",
+               [("", {}, data["totals"]["throttle_seconds"])])
+        metric("backoff_seconds_total", "counter", "Time spent backing off before retries.",
+               [("", {}, data["totals"]["backoff_seconds"])])
+        for name, h in data["timings"].items():
+            histogram(f"{name}_seconds", f"Duration of each {name.replace('_', ' ')}.", {"": h})
+        metric("block_lists_total", "counter", "Block children lists fetched, by recursion depth.",
+               [("", {"depth": d}, n) for d, n in data["block_depth"].items()])
+        metric("phase_seconds", "gauge", "Duration of each export phase.",
+               [("", {"phase": p}, seconds) for p, seconds in data["phases"].items()])
+        for name, value in data["counters"].items():
+            if name not in ("throttle_seconds", "backoff_seconds"):
+                metric(f"{name}_total", "counter", f"Export counter {name}.", [("", {}, value)])
+        metric("duration_seconds", "gauge", "Duration of the export.", [("", {}, data["duration_seconds"])])
+        metric("last_run_timestamp_seconds", "gauge", "When the export finished.", [("", {}, int(time.time()))])
+
+        tmp_file = path.with_name(f".{path.name}.tmp")
+        tmp_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(tmp_file, path)
+
+
+class MeteredTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """httpx transport that records every request it sends in an ExportMetrics."""
+
+    def __init__(self, metrics: ExportMetrics, transport):
+        self.metrics = metrics
+        self.transport = transport
+
+    def _record(self, request: httpx.Request, started: float, status: int = None, body: bytes = b""):
+        self.metrics.record_request(endpoint_name(request.method, request.url.path), status,
+                                    time.perf_counter() - started, len(body))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+            body = b"".join(response.iter_raw())
+            response.close()
+        except httpx.TransportError:
+            self._record(request, started)
+            raise
+        self._record(request, started, response.status_code, body)
+        return httpx.Response(response.status_code, headers=response.headers, content=body,
+                              extensions=response.extensions)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+            await response.aclose()
+        except httpx.TransportError:
+            self._record(request, started)
+            raise
+        self._record(request, started, response.status_code, body)
+        return httpx.Response(response.status_code, headers=response.headers, content=body,
+                              extensions=response.extensions)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
 # =============================================================================
 # Rate-Limited Client
 # =============================================================================
 
+# Requests are retried on these statuses and on timeouts/connection errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5   # First retry waits ~0.5s, doubling per attempt
+BACKOFF_MAX = 30.0
+
+
+class RequestFailedError(Exception):
+    """A request that still failed after every retry; the last error is its __cause__."""
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Seconds to wait before retrying after error, or None if it is not retryable.
+
+    Retry-After is honored when the server sends it (plus up to 20% jitter so
+    concurrent requests don't return in lockstep); otherwise the delay is an
+    exponential backoff with jitter.
+    """
+    if isinstance(error, HTTPResponseError):
+        if error.status not in RETRY_STATUSES:
+            return None
+        retry_after = error.headers.get("retry-after") if error.headers else None
+        if retry_after and retry_after.strip().isdigit():
+            return int(retry_after) * random.uniform(1.0, 1.2)
+    elif not isinstance(error, (RequestTimeoutError, httpx.TransportError)):
+        return None
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def make_notion_client(client_class, api_key: str, base_url: str = None,
+                       metrics: ExportMetrics = None):
+    """Create a Client/AsyncClient with notion_client's own retries turned off.
+
+    The rate-limited clients below retry themselves so every 429 also slows
+    the shared rate; letting the SDK retry first would hide them. With
+    metrics, every HTTP request is recorded through a MeteredTransport.
+    """
+    options = {"auth": api_key}
+    if metrics is not None:
+        if client_class is AsyncClient:
+            options["client"] = httpx.AsyncClient(transport=MeteredTransport(metrics, httpx.AsyncHTTPTransport()))
+        else:
+            options["client"] = httpx.Client(transport=MeteredTransport(metrics, httpx.HTTPTransport()))
+    if base_url:
+        options["base_url"] = base_url
+    if "retry" in getattr(ClientOptions, "__dataclass_fields__", {}):
+        options["retry"] = False
+    return client_class(**options)
+
+
+class TokenBucket:
+    """Thread-safe, adaptive token bucket shared by every in-flight request.
+
+    Tokens refill at `rate` per second up to `capacity`, so short bursts are
+    allowed while the long-run average stays at `rate`. A 429 halves the
+    rate (down to `min_rate`) and pauses the bucket for the server's
+    Retry-After; 429s arriving while that pause is in effect (answers to
+    requests already in flight) only extend it. Each success then raises
+    the rate again by a small step until it is back at `max_rate`.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, min_rate: float = None):
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 8
+        self.step = rate / 50  # ~25 successes recover from one halving
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it.
+
+        Tokens may go negative; each waiter queues behind the debt of the
+        ones before it, so callers are released in order at `rate`.
+        """
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def slow_down(self, pause: float):
+        """Back off after a 429: hold every caller for `pause` seconds and halve
+        the rate, unless an earlier pause is still in effect."""
+        with self.lock:
+            self._refill()
+            if self.updated >= self.paused_until:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.paused_until = max(self.paused_until, self.updated + pause)
+            self.tokens = min(self.tokens, -pause * self.rate)
+
+    def speed_up(self):
+        """Creep back towards max_rate after a successful request."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.step)
+
+
 class RateLimitedClient:
-    """Wraps notion_client with throttling and retry logic."""
+    """Wraps notion_client with adaptive throttling and retry logic.
+
+    Requests are paced by a TokenBucket starting at `rate` per second
+    (Notion allows an average of 3); rate=0 disables pacing. Requests,
+    retries and throttling are recorded in `metrics`.
+    """
 
-    def __init__(self, api_key: str):
-        self.client = Client(auth=api_key)
-        self.last_request_time = 0
-        self.min_interval = 0.35  # 350ms (~2.8 req/sec, under 3/sec limit)
+    is_async = False
+
+    def __init__(self, api_key: str, base_url: str = None, rate: float = 3.0):
+        self.metrics = ExportMetrics()
+        self.client = make_notion_client(Client, api_key, base_url, self.metrics)
+        self.bucket = TokenBucket(rate) if rate else None
 
     def _throttle(self):
-        """Ensure minimum interval between requests."""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
+        """Wait for a rate token."""
+        if self.bucket:
+            delay = self.bucket.reserve()
+            if delay:
+                self.metrics.count("throttle_seconds", delay)
+                time.sleep(delay)
+
+    def _backoff(self, error: Exception, attempt: int, max_retries: int) -> float:
+        """Delay before the next attempt; raises if error is final."""
+        delay = retry_delay(error, attempt)
+        if delay is None:
+            raise error
+        if attempt >= max_retries:
+            self.metrics.count("gave_up")
+            raise RequestFailedError(f"Request failed after {max_retries} retries: {error}") from error
+        self.metrics.retry(str(getattr(error, "status", "") or type(error).__name__), delay)
+        if getattr(error, "status", None) == 429 and self.bucket:
+            self.bucket.slow_down(delay)
+            logging.warning(f"Rate limited, pausing {delay:.1f}s (rate now {self.bucket.rate:.2f}/s)")
+            return 0.0  # The bucket holds the retry back
+        logging.warning(f"Request failed ({error}), retrying in {delay:.1f}s...")
+        return delay
+
+    def request(self, fn, max_retries: int = MAX_RETRIES):
+        """Execute a request with throttling, retrying rate limits and transient errors."""
+        attempt = 0
+        while True:
+            self._throttle()
+            try:
+                result = fn()
+            except (HTTPResponseError, RequestTimeoutError, httpx.TransportError) as e:
+                time.sleep(self._backoff(e, attempt, max_retries))
+                attempt += 1
+                continue
+            if self.bucket:
+                self.bucket.speed_up()
+            return result
+
 
-    def request(self, fn, max_retries: int = 3):
-        """Execute a request with throttling and retry on rate limit."""
-        self._throttle()
+class AsyncRateLimitedClient(RateLimitedClient):
+    """Concurrent Notion client: up to `concurrency` requests in flight under a shared rate.
 
-        for attempt in range(max_retries):
+    notion_client.AsyncClient runs on a background event loop so the
+    synchronous export loop can drive it through run(). The fetch functions
+    detect this client and schedule sibling requests concurrently.
+    """
+
+    is_async = True
+
+    def __init__(self, api_key: str, concurrency: int = 4, rate: float = 3.0,
+                 base_url: str = None):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.metrics = ExportMetrics()
+        self.client = make_notion_client(AsyncClient, api_key, base_url, self.metrics)
+        self.bucket = TokenBucket(rate) if rate else None
+        self.semaphore = self.run(self._make_semaphore(concurrency))
+
+    @staticmethod
+    async def _make_semaphore(concurrency: int) -> asyncio.Semaphore:
+        return asyncio.Semaphore(concurrency)
+
+    def run(self, coro):
+        """Run a coroutine on the client's event loop and wait for the result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def request(self, fn, max_retries: int = MAX_RETRIES):
+        """Blocking request, for the sequential passes (search, users, databases)."""
+        return self.run(self.arequest(fn, max_retries))
+
+    async def arequest(self, fn, max_retries: int = MAX_RETRIES):
+        """Await a request once a rate token and an in-flight slot are available."""
+        attempt = 0
+        while True:
+            delay = self.bucket.reserve() if self.bucket else 0
+            if delay:
+                self.metrics.count("throttle_seconds", delay)
+                await asyncio.sleep(delay)
             try:
-                self.last_request_time = time.time()
-                return fn()
-            except APIResponseError as e:
-                if e.status == 429:  # Rate limited
-                    wait_time = 1 + attempt
-                    logging.warning(f"Rate limited, waiting {wait_time}s...")
-                    time.sleep(wait_time)
-                    continue
-                raise
-        raise Exception("Max retries exceeded")
+                async with self.semaphore:
+                    result = await fn()
+            except (HTTPResponseError, RequestTimeoutError, httpx.TransportError) as e:
+                await asyncio.sleep(self._backoff(e, attempt, max_retries))
+                attempt += 1
+                continue
+            if self.bucket:
+                self.bucket.speed_up()
+            return result
+
+    def close(self):
+        """Close the HTTP pool and stop the background loop."""
+        self.run(self.client.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
 
 
 # =============================================================================
 # Block Fetching (ported from notion4ever)
 # =============================================================================
 
-def fetch_all_blocks(client: RateLimitedClient, block_id: str) -> list:
+def fetch_all_blocks(client: RateLimitedClient, block_id: str, depth: int = 0) -> list:
     """
     Recursively fetch all blocks and their children.
     Ported from notion4ever's block_parser.
     """
+    if client.is_async:
+        return client.run(fetch_all_blocks_async(client, block_id, depth))
+
+    client.metrics.depth(depth)
     blocks = []
     start_cursor = None
 
@@ -105,7 +567,7 @@ def fetch_all_blocks(client: RateLimitedClient, block_id: str) -> list:
     # Recursively fetch children for blocks that have them
     for block in blocks:
         if block.get("has_children") and block["type"] not in ["child_page", "child_database"]:
-            block["children"] = fetch_all_blocks(client, block["id"])
+            block["children"] = fetch_all_blocks(client, block["id"], depth + 1)
 
     return blocks
 
@@ -116,6 +578,9 @@ def fetch_all_blocks(client: RateLimitedClient, block_id: str) -> list:
 
 def fetch_page_content(client: RateLimitedClient, page_id: str) -> dict:
     """Fetch page metadata and all its blocks."""
+    if client.is_async:
+        return client.run(fetch_page_content_async(client, page_id))
+
     logging.debug(f"Fetching page: {page_id}")
 
     # Get page metadata
@@ -127,8 +592,28 @@ def fetch_page_content(client: RateLimitedClient, page_id: str) -> dict:
     return page
 
 
-def fetch_database_content(client: RateLimitedClient, database_id: str) -> dict:
-    """Fetch database metadata and all its entries with their content."""
+def fetch_database_content(client: RateLimitedClient, database_id: str,
+                           previous_entries: dict = None,
+                           checkpoint: "DatabaseCheckpoint" = None,
+                           shared: "SharedEntries" = None,
+                           exclude: "ExcludeFilter" = None) -> dict:
+    """Fetch database metadata and all its entries with their content.
+
+    Entries found in previous_entries (entry_id -> entry from an earlier
+    export) with an unchanged last_edited_time reuse their stored blocks.
+    With a checkpoint, entries are saved after every query page and a
+    resumed export continues from the last saved cursor. Freshly fetched
+    entries are offered to shared for their own page items. Entries
+    excluded by `exclude` are dropped before their blocks are fetched.
+    """
+    if client.is_async:
+        return client.run(
+            fetch_database_content_async(client, database_id, previous_entries, checkpoint, shared,
+                                         exclude)
+        )
+
+    previous_entries = previous_entries or {}
+
     logging.debug(f"Fetching database: {database_id}")
 
     # Get database metadata (now contains data_sources array, not properties)
@@ -151,11 +636,12 @@ def fetch_database_content(client: RateLimitedClient, database_id: str) -> dict:
         )
         data_sources_full.append(data_source)
 
-        # Query entries from this data source with pagination
-        entries = []
-        start_cursor = None
+        # Query entries page by page, fetching each page's content before the next
+        entries, start_cursor, done = checkpoint.restore(ds_id) if checkpoint else ([], None, False)
+        if entries:
+            logging.info(f"    Resuming after {len(entries)} saved entries")
 
-        while True:
+        while not done:
             if start_cursor is None:
                 response = client.request(
                     lambda ds_id=ds_id: client.client.data_sources.query(data_source_id=ds_id)
@@ -168,15 +654,23 @@ def fetch_database_content(client: RateLimitedClient, database_id: str) -> dict:
                     )
                 )
 
-            entries.extend(response["results"])
-            start_cursor = response.get("next_cursor")
-            if not start_cursor:
-                break
+            # Fetch full content for each entry
+            chunk = exclude.drop_entries(response["results"]) if exclude else response["results"]
+            for entry in chunk:
+                previous = previous_entries.get(entry["id"])
+                if is_unchanged(previous, entry):
+                    entry["blocks"] = previous.get("blocks", [])
+                else:
+                    logging.info(f"    Entry {len(entries) + 1}: {get_title(entry)}")
+                    entry["blocks"] = fetch_all_blocks(client, entry["id"])
+                    if shared:
+                        shared.offer(entry)
+                entries.append(entry)
 
-        # Fetch full content for each entry
-        for i, entry in enumerate(entries):
-            logging.info(f"    Entry {i + 1}/{len(entries)}: {get_title(entry)}")
-            entry["blocks"] = fetch_all_blocks(client, entry["id"])
+            start_cursor = response.get("next_cursor")
+            done = not start_cursor
+            if checkpoint:
+                checkpoint.save(ds_id, chunk, start_cursor)
 
         all_entries.extend(entries)
 
@@ -223,6 +717,17 @@ def fetch_all_users(client: RateLimitedClient) -> dict:
     return users
 
 
+def fetch_workspace_users(client: RateLimitedClient) -> dict:
+    """fetch_all_users, or no users when the integration lacks the capability."""
+    try:
+        return fetch_all_users(client)
+    except APIResponseError as e:
+        if e.status == 403:
+            logging.warning("Users API not available (missing capability). Continuing without user data.")
+            return {}
+        raise
+
+
 # =============================================================================
 # Database Fetching (for path resolution)
 # =============================================================================
@@ -233,13 +738,8 @@ def fetch_referenced_databases(client: RateLimitedClient, pages: dict) -> dict:
     This enables the converter to resolve database names for directory paths.
     """
     # Collect unique database_ids from pages with data_source_id parent
-    database_ids = set()
-    for page_id, page in pages.items():
-        parent = page.get("parent", {})
-        if parent.get("type") == "data_source_id":
-            db_id = parent.get("database_id")
-            if db_id:
-                database_ids.add(db_id)
+    database_ids = {referenced_database_id(page) for page in pages.values()}
+    database_ids.discard(None)
 
     if not database_ids:
         return {}
@@ -248,24 +748,40 @@ def fetch_referenced_databases(client: RateLimitedClient, pages: dict) -> dict:
 
     databases = {}
     for db_id in database_ids:
-        try:
-            database = client.request(
-                lambda db_id=db_id: client.client.databases.retrieve(database_id=db_id)
-            )
+        database = fetch_referenced_database(client, db_id)
+        if database is not None:
             databases[db_id] = database
-            # Extract title for logging
-            title = "".join(t.get("plain_text", "") for t in database.get("title", [])) or "Untitled"
-            logging.info(f"  Database: {title}")
-        except APIResponseError as e:
-            if e.status == 404:
-                logging.warning(f"  Database {db_id} not found (may not be shared)")
-            else:
-                logging.warning(f"  Failed to fetch database {db_id}: {e}")
 
     logging.info(f"  Fetched {len(databases)} databases")
     return databases
 
 
+def referenced_database_id(page: dict) -> str:
+    """Database id of a page with a data_source_id parent, else None."""
+    parent = page.get("parent", {})
+    if parent.get("type") == "data_source_id":
+        return parent.get("database_id")
+    return None
+
+
+def fetch_referenced_database(client: RateLimitedClient, db_id: str) -> dict:
+    """Fetch one referenced database object, or None if it cannot be read."""
+    try:
+        database = client.request(
+            lambda: client.client.databases.retrieve(database_id=db_id)
+        )
+    except APIResponseError as e:
+        if e.status == 404:
+            logging.warning(f"  Database {db_id} not found (may not be shared)")
+        else:
+            logging.warning(f"  Failed to fetch database {db_id}: {e}")
+        return None
+    # Extract title for logging
+    title = "".join(t.get("plain_text", "") for t in database.get("title", [])) or "Untitled"
+    logging.info(f"  Database: {title}")
+    return database
+
+
 # =============================================================================
 # Comments Fetching
 # =============================================================================
@@ -300,8 +816,18 @@ def fetch_comments_for_block(client: RateLimitedClient, block_id: str) -> list:
     return comments
 
 
+def fetch_page_comments(client: RateLimitedClient, page_id: str) -> list:
+    """Fetch all comments for one page with either client."""
+    if client.is_async:
+        return client.run(fetch_comments_for_block_async(client, page_id))
+    return fetch_comments_for_block(client, page_id)
+
+
 def fetch_all_comments(client: RateLimitedClient, pages: dict) -> dict:
     """Fetch comments for all pages."""
+    if client.is_async:
+        return client.run(fetch_all_comments_async(client, pages))
+
     all_comments = {}
     page_ids = list(pages.keys())
 
@@ -317,130 +843,1013 @@ def fetch_all_comments(client: RateLimitedClient, pages: dict) -> dict:
     return all_comments
 
 
+# =============================================================================
+# Concurrent Fetching (AsyncRateLimitedClient)
+# =============================================================================
+
+async def paginate_async(client: AsyncRateLimitedClient, list_fn) -> list:
+    """Collect every result of a paginated endpoint. list_fn(**kwargs) returns a coroutine."""
+    results = []
+    start_cursor = None
+
+    while True:
+        if start_cursor is None:
+            response = await client.arequest(lambda: list_fn())
+        else:
+            cursor = start_cursor
+            response = await client.arequest(lambda: list_fn(start_cursor=cursor))
+
+        results.extend(response["results"])
+        start_cursor = response.get("next_cursor")
+        if not start_cursor:
+            return results
+
+
+async def fetch_all_blocks_async(client: AsyncRateLimitedClient, block_id: str,
+                                 depth: int = 0) -> list:
+    """Fetch a block tree, requesting the children of sibling blocks concurrently."""
+    client.metrics.depth(depth)
+    blocks = await paginate_async(
+        client, lambda **kw: client.client.blocks.children.list(block_id=block_id, **kw)
+    )
+
+    nested = [
+        block for block in blocks
+        if block.get("has_children") and block["type"] not in ["child_page", "child_database"]
+    ]
+    children = await asyncio.gather(*(fetch_all_blocks_async(client, b["id"], depth + 1)
+                                      for b in nested))
+    for block, block_children in zip(nested, children):
+        block["children"] = block_children
+
+    return blocks
+
+
+async def fetch_page_content_async(client: AsyncRateLimitedClient, page_id: str) -> dict:
+    """Fetch page metadata and its blocks concurrently."""
+    logging.debug(f"Fetching page: {page_id}")
+
+    page, blocks = await asyncio.gather(
+        client.arequest(lambda: client.client.pages.retrieve(page_id=page_id)),
+        fetch_all_blocks_async(client, page_id),
+    )
+    page["blocks"] = blocks
+    return page
+
+
+async def fetch_data_source_async(client: AsyncRateLimitedClient, ds_info: dict,
+                                  previous_entries: dict,
+                                  checkpoint: "DatabaseCheckpoint" = None,
+                                  shared: "SharedEntries" = None,
+                                  exclude: "ExcludeFilter" = None) -> tuple:
+    """Fetch one data source's schema and entries, with entry blocks fetched concurrently.
+
+    Entries are queried one page at a time; each page's entries are fetched
+    concurrently and checkpointed before the next page is requested.
+    """
+    ds_id = ds_info["id"]
+    logging.info(f"  Data source: {ds_info.get('name', 'Unnamed')}")
+
+    schema_task = asyncio.ensure_future(
+        client.arequest(lambda: client.client.data_sources.retrieve(data_source_id=ds_id))
+    )
+
+    async def fetch_entry(entry: dict):
+        previous = previous_entries.get(entry["id"])
+        if is_unchanged(previous, entry):
+            entry["blocks"] = previous.get("blocks", [])
+            return
+        entry["blocks"] = await fetch_all_blocks_async(client, entry["id"])
+        if shared:
+            shared.offer(entry)
+        logging.info(f"    Entry: {get_title(entry)}")
+
+    entries, start_cursor, done = checkpoint.restore(ds_id) if checkpoint else ([], None, False)
+    if entries:
+        logging.info(f"    Resuming after {len(entries)} saved entries")
+
+    while not done:
+        if start_cursor is None:
+            response = await client.arequest(
+                lambda: client.client.data_sources.query(data_source_id=ds_id)
+            )
+        else:
+            cursor = start_cursor
+            response = await client.arequest(
+                lambda: client.client.data_sources.query(data_source_id=ds_id, start_cursor=cursor)
+            )
+
+        chunk = exclude.drop_entries(response["results"]) if exclude else response["results"]
+        await asyncio.gather(*(fetch_entry(entry) for entry in chunk))
+        entries.extend(chunk)
+
+        start_cursor = response.get("next_cursor")
+        done = not start_cursor
+        if checkpoint:
+            checkpoint.save(ds_id, chunk, start_cursor)
+
+    return await schema_task, entries
+
+
+async def fetch_database_content_async(client: AsyncRateLimitedClient, database_id: str,
+                                       previous_entries: dict = None,
+                                       checkpoint: "DatabaseCheckpoint" = None,
+                                       shared: "SharedEntries" = None,
+                                       exclude: "ExcludeFilter" = None) -> dict:
+    """Fetch database metadata and all data sources concurrently."""
+    logging.debug(f"Fetching database: {database_id}")
+
+    database = await client.arequest(
+        lambda: client.client.databases.retrieve(database_id=database_id)
+    )
+    results = await asyncio.gather(
+        *(fetch_data_source_async(client, ds_info, previous_entries or {}, checkpoint, shared, exclude)
+          for ds_info in database.get("data_sources", []))
+    )
+
+    database["data_sources_full"] = [data_source for data_source, _ in results]
+    database["entries"] = [entry for _, entries in results for entry in entries]
+    return database
+
+
+async def fetch_comments_for_block_async(client: AsyncRateLimitedClient, block_id: str) -> list:
+    """Fetch all comments for a block or page."""
+    try:
+        return await paginate_async(
+            client, lambda **kw: client.client.comments.list(block_id=block_id, **kw)
+        )
+    except APIResponseError as e:
+        if e.status == 403:
+            # Comments capability not enabled or no access
+            return []
+        raise
+
+
+async def fetch_all_comments_async(client: AsyncRateLimitedClient, pages: dict) -> dict:
+    """Fetch comments for all pages concurrently."""
+    page_ids = list(pages.keys())
+    logging.info(f"Fetching comments for {len(page_ids)} pages...")
+
+    results = await asyncio.gather(
+        *(fetch_comments_for_block_async(client, page_id) for page_id in page_ids)
+    )
+    all_comments = {page_id: comments for page_id, comments in zip(page_ids, results) if comments}
+
+    logging.info(f"  Found comments on {len(all_comments)} pages")
+    return all_comments
+
+
 # =============================================================================
 # Asset Downloading
 # =============================================================================
 
-def get_asset_filename(url: str, block_id: str) -> str:
-    """Generate a unique filename for an asset."""
-    parsed = urlparse(url)
-    path = unquote(parsed.path)
+ASSET_CHUNK_SIZE = 256 * 1024
+
+
+def get_asset_extension(url: str, name: str = "") -> str:
+    """Pick a file extension from the original file name or the URL path."""
+    for candidate in (name, unquote(urlparse(url).path)):
+        if "." in candidate:
+            ext = "." + candidate.rsplit(".", 1)[-1].split("?")[0].lower()
+            # Validate extension
+            if len(ext) <= 5 and ext[1:].isalnum():
+                return ext
+    return ".bin"
 
-    # Try to get extension from path
-    ext = ""
-    if "." in path:
-        ext = "." + path.rsplit(".", 1)[-1].split("?")[0].lower()
-        # Validate extension
-        if len(ext) > 5 or not ext[1:].isalnum():
-            ext = ""
 
-    # Use short block ID for uniqueness
-    short_id = block_id.replace("-", "")[:12]
-    return f"{short_id}{ext}" if ext else f"{short_id}.bin"
+ASSET_CACHE_NAME = ".asset-cache"
+DEFAULT_ASSET_CACHE_MB = 2048
 
 
-def download_asset(url: str, output_path: Path, timeout: int = 30) -> bool:
-    """Download an asset from URL to local path."""
+def file_sha256(path: Path) -> str:
+    """sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(ASSET_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(source: Path, dest: Path) -> None:
+    """Hardlink source to dest, copying when the filesystem does not allow it."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with httpx.Client(timeout=timeout, follow_redirects=True) as http_client:
-            response = http_client.get(url)
-            response.raise_for_status()
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_bytes(response.content)
-            return True
-    except Exception as e:
-        logging.warning(f"Failed to download asset: {e}")
-        return False
+        os.link(source, dest)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+class AssetCache:
+    """Assets downloaded by earlier exports, keyed by the block or property that owns them.
+
+    Notion file URLs are signed and change on every export, so they cannot
+    identify a file across runs; the owner's id and last_edited_time can, as
+    replacing the file edits its block (or page). Files are kept under their
+    content-hash name, shared by all keys with the same content. index.json
+    records each file's size, sha256 and last use: a file whose size changed
+    is dropped, one whose mtime changed is hashed again before being trusted,
+    and the least recently used files are evicted once the cache grows past
+    max_bytes.
+    """
 
+    INDEX_NAME = "index.json"
 
-def process_block_assets(block: dict, assets_dir: Path, downloaded: dict) -> None:
-    """Download assets from a block and update URLs to local paths."""
-    block_type = block.get("type")
-    block_id = block.get("id", "unknown")
-    block_data = block.get(block_type, {})
-
-    # Handle image and file blocks
-    if block_type in ("image", "file", "video", "pdf"):
-        file_info = block_data.get("file") or block_data.get("external")
-        if file_info:
-            url = file_info.get("url", "")
-            if url and url.startswith("http") and url not in downloaded:
-                filename = get_asset_filename(url, block_id)
-                local_path = assets_dir / filename
-
-                if download_asset(url, local_path):
-                    downloaded[url] = f"assets/{filename}"
-                    logging.info(f"    Asset: {filename}")
-                else:
-                    downloaded[url] = url  # Keep original on failure
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_ASSET_CACHE_MB << 20):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.keys = {}   # owner key -> file name
+        self.files = {}  # file name -> {"size", "sha256", "mtime_ns", "used"}
+        index_file = cache_dir / self.INDEX_NAME
+        if index_file.exists():
+            try:
+                with open(index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                self.keys, self.files = index.get("keys", {}), index.get("files", {})
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable asset cache index {index_file}: {e}")
+
+    @staticmethod
+    def key(owner_id: str, last_edited_time: str, slot: str = "") -> str:
+        """Cache key for the file in `slot` of a block or property, or None if unversioned."""
+        if not owner_id or not last_edited_time:
+            return None
+        return f"{owner_id}@{last_edited_time}/{slot}"
+
+    def get(self, key: str) -> Path:
+        """Path of the cached file for key, or None if absent or no longer intact."""
+        with self.lock:
+            filename = self.keys.get(key)
+            info = self.files.get(filename)
+            if info is None:
+                return None
+            path = self.cache_dir / filename
+            try:
+                stat = path.stat()
+                intact = stat.st_size == info["size"] and (
+                    stat.st_mtime_ns == info["mtime_ns"] or file_sha256(path) == info["sha256"])
+            except OSError:
+                intact = False
+            if not intact:
+                logging.warning(f"Dropping damaged cached asset {filename}")
+                self._drop(filename)
+                return None
+            info["mtime_ns"] = stat.st_mtime_ns
+            info["used"] = time.time()
+            return path
+
+    def put(self, key: str, path: Path, sha256: str) -> None:
+        """Record a downloaded file under key, linking it into the cache."""
+        with self.lock:
+            filename = path.name
+            if filename not in self.files:
+                cached = self.cache_dir / filename
+                link_or_copy(path, cached)
+                self.files[filename] = {"size": cached.stat().st_size, "sha256": sha256,
+                                        "mtime_ns": cached.stat().st_mtime_ns}
+            self.files[filename]["used"] = time.time()
+            self.keys[key] = filename
+
+    def _drop(self, filename: str) -> None:
+        self.files.pop(filename, None)
+        (self.cache_dir / filename).unlink(missing_ok=True)
+        self.keys = {key: name for key, name in self.keys.items() if name != filename}
+
+    def save(self) -> int:
+        """Evict least recently used files beyond max_bytes and write the index.
+
+        Returns the number of files evicted.
+        """
+        with self.lock:
+            total = sum(info["size"] for info in self.files.values())
+            evicted = 0
+            for filename, info in sorted(self.files.items(), key=lambda kv: kv[1].get("used", 0)):
+                if total <= self.max_bytes:
+                    break
+                total -= info["size"]
+                self._drop(filename)
+                evicted += 1
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{self.INDEX_NAME}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"keys": self.keys, "files": self.files}, f)
+            os.replace(tmp, self.cache_dir / self.INDEX_NAME)
+        if evicted:
+            logging.info(f"Evicted {evicted} assets from {self.cache_dir}")
+        return evicted
+
+
+class AssetDownloader:
+    """Downloads assets on a bounded worker pool sharing one HTTP connection pool.
+
+    Downloads run in the background while the export keeps fetching blocks.
+    Bodies are streamed to disk in chunks and stored under their content hash,
+    so a file referenced from many pages (or re-uploaded) is kept once.
+    With an AssetCache, files whose owner is unchanged since an earlier
+    export are linked from the cache without any HTTP request.
+    """
+
+    def __init__(self, assets_dir: Path, workers: int = 4, timeout: int = 30,
+                 http_client: httpx.Client = None, metrics: ExportMetrics = None,
+                 cache: AssetCache = None):
+        self.assets_dir = assets_dir
+        self.metrics = metrics
+        self.cache = cache
+        self.http = http_client or httpx.Client(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=workers, max_keepalive_connections=workers),
+        )
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset")
+        self.lock = threading.Lock()
+        self.futures = {}  # url -> Future resolving to local path (or url on failure)
+
+    def submit(self, url: str, name: str = "", key: str = None) -> Future:
+        """Queue a download, or return the pending one for the same URL.
+
+        key (see AssetCache.key) identifies the file across exports.
+        """
+        with self.lock:
+            future = self.futures.get(url)
+            if future is None:
+                future = self.pool.submit(self._download, url, name, key)
+                self.futures[url] = future
+            return future
+
+    def forget(self) -> None:
+        """Drop finished downloads from the URL map.
+
+        For long-lived downloaders (sync.py): file URLs are re-signed about
+        hourly, so the map would otherwise grow for ever.
+        """
+        with self.lock:
+            self.futures = {url: future for url, future in self.futures.items() if not future.done()}
+
+    def _download(self, url: str, name: str, key: str = None) -> str:
+        if self.cache and key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                link_or_copy(cached, self.assets_dir / cached.name)
+                if self.metrics:
+                    self.metrics.count("asset_cache_hits")
+                return f"assets/{cached.name}"
+            if self.metrics:
+                self.metrics.count("asset_cache_misses")
+
+        self.assets_dir.mkdir(parents=True, exist_ok=True)
+        part_file = self.assets_dir / f".{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        started = time.perf_counter()
+        size = 0
+        try:
+            with self.http.stream("GET", url) as response:
+                response.raise_for_status()
+                with open(part_file, "wb") as f:
+                    for chunk in response.iter_bytes(ASSET_CHUNK_SIZE):
+                        digest.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+            if self.metrics:
+                self.metrics.observe("asset_download", time.perf_counter() - started)
+                self.metrics.count("asset_bytes", size)
+
+            filename = f"{digest.hexdigest()[:16]}{get_asset_extension(url, name)}"
+            dest = self.assets_dir / filename
+            if dest.exists():
+                part_file.unlink()  # Same content already stored
+            else:
+                os.replace(part_file, dest)
+            if self.cache and key:
+                self.cache.put(key, dest, digest.hexdigest())
+            logging.info(f"    Asset: {filename}")
+            return f"assets/{filename}"
+
+        except Exception as e:
+            logging.warning(f"Failed to download asset: {e}")
+            if self.metrics:
+                self.metrics.count("asset_failures")
+            if part_file.exists():
+                part_file.unlink()
+            return url  # Keep original on failure
 
-            # Update URL to local path
-            if url in downloaded:
-                file_info["_local_path"] = downloaded[url]
+    def close(self):
+        """Wait for queued downloads and release the connection pool."""
+        self.pool.shutdown(wait=True)
+        self.http.close()
 
-    # Recurse into children
-    for child in block.get("children", []):
-        process_block_assets(child, assets_dir, downloaded)
 
+def queue_file_asset(file_info: dict, name: str, downloader: AssetDownloader,
+                     downloaded: dict, pending: list, key: str = None) -> bool:
+    """Point file_info at its local copy, queueing a download if needed.
 
-def download_page_assets(page: dict, assets_dir: Path, downloaded: dict) -> int:
-    """Download all assets for a page. Returns count of new downloads."""
-    initial_count = len(downloaded)
-    for block in page.get("blocks", []):
-        process_block_assets(block, assets_dir, downloaded)
-    return len(downloaded) - initial_count
+    key identifies the file across exports for the asset cache.
+    Returns True when a new download was queued.
+    """
+    url = file_info.get("url", "")
+    if not url or not url.startswith("http"):
+        return False
+
+    if url in downloaded:
+        file_info["_local_path"] = downloaded[url]
+        return False
 
+    pending.append((url, file_info, downloader.submit(url, name, key)))
+    return True
+
+
+def process_block_assets(block: dict, downloader: AssetDownloader, downloaded: dict,
+                         pending: list) -> int:
+    """Queue downloads for assets in a block tree. Returns count queued."""
+    count = 0
+    stack = [block]
+    while stack:
+        block = stack.pop()
+        block_type = block.get("type")
+        block_data = block.get(block_type, {})
+
+        # Handle image and file blocks
+        if block_type in ("image", "file", "video", "pdf"):
+            file_info = block_data.get("file") or block_data.get("external")
+            key = AssetCache.key(block.get("id"), block.get("last_edited_time"))
+            if file_info and queue_file_asset(file_info, "", downloader, downloaded, pending, key):
+                count += 1
+
+        stack.extend(block.get("children", []))
+    return count
+
+
+def download_page_assets(page: dict, downloader: AssetDownloader, downloaded: dict,
+                         pending: list) -> int:
+    """Queue downloads for all block assets of a page. Returns count queued."""
+    return sum(
+        process_block_assets(block, downloader, downloaded, pending)
+        for block in page.get("blocks", [])
+    )
 
-def process_property_assets(page: dict, assets_dir: Path, downloaded: dict) -> int:
-    """Download assets from files properties. Returns count of new downloads."""
-    initial_count = len(downloaded)
 
-    for prop_name, prop in page.get("properties", {}).items():
+def process_property_assets(page: dict, downloader: AssetDownloader, downloaded: dict,
+                            pending: list) -> int:
+    """Queue downloads for files properties. Returns count queued."""
+    count = 0
+    for prop in page.get("properties", {}).values():
         if prop.get("type") != "files":
             continue
 
-        for file_item in prop.get("files", []):
-            file_type = file_item.get("type")
-            file_info = file_item.get(file_type, {})
-            url = file_info.get("url", "")
+        for index, file_item in enumerate(prop.get("files", [])):
+            file_info = file_item.get(file_item.get("type"), {})
+            name = file_item.get("name", "")
+            key = AssetCache.key(page.get("id"), page.get("last_edited_time"),
+                                 f"{prop.get('id', '')}/{index}/{name}")
+            if queue_file_asset(file_info, name, downloader, downloaded, pending, key):
+                count += 1
+    return count
+
+
+def resolve_pending_assets(pending: list, downloaded: dict) -> dict:
+    """Wait for a page's queued downloads and record their local paths.
+
+    Returns the url -> local path entries added by this page.
+    """
+    new_assets = {}
+    for url, file_info, future in pending:
+        local_path = future.result()
+        file_info["_local_path"] = local_path
+        if url not in downloaded:
+            downloaded[url] = new_assets[url] = local_path
+    return new_assets
+
+
+# =============================================================================
+# Export Journal
+# =============================================================================
+
+def export_header(summary: dict, users: dict, comments: dict, assets: dict, databases: dict,
+                  total_items: int, completed: int) -> dict:
+    """Top-level export fields, in export.json order, that precede "pages"."""
+    return {
+        "exported_at": utc_now(),
+        "api_version": "2025-09-03",
+        "export_status": "complete" if completed >= total_items else "in_progress",
+        "progress": f"{completed}/{total_items}",
+        **summary,
+        "_users": users,
+        "_comments": comments,
+        "_assets": assets,  # url -> local_path mapping
+        "_databases": databases,  # database_id -> database object (for path resolution)
+    }
 
-            if not url or not url.startswith("http") or url in downloaded:
+
+class ExportJournal:
+    """Append-only record of an export in progress.
+
+    Every fetched page/database is appended to export.ndjson as one JSON line
+    as soon as it completes, and manifest.json carries the progress counters.
+    Nothing already written is ever re-serialized; compact() folds the journal
+    into the export.json layout read by converter.py once the export finishes.
+    """
+
+    JOURNAL_NAME = "export.ndjson"
+    MANIFEST_NAME = "manifest.json"
+
+    def __init__(self, export_dir: Path):
+        self.export_dir = export_dir
+        self.journal_file = export_dir / self.JOURNAL_NAME
+        self.manifest_file = export_dir / self.MANIFEST_NAME
+        self._fh = None
+
+    def append(self, kind: str, item_id: str, data) -> None:
+        """Append one record and flush it to disk."""
+        if self._fh is None:
+            self._fh = open(self.journal_file, "a", encoding="utf-8")
+        record = {"kind": kind, "id": item_id, "data": data}
+        self._fh.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._fh.flush()
+
+    def record_page(self, page_id: str, content: dict, assets: dict = None) -> None:
+        """Record a fetched page/database and the assets downloaded for it."""
+        if assets:
+            self.append("assets", page_id, assets)
+        self.append("page", page_id, content)
+
+    def write_manifest(self, total_items: int, completed: int, **extra) -> None:
+        """Atomically rewrite the (small) manifest with current progress."""
+        manifest = {
+            "updated_at": utc_now(),
+            "export_status": "complete" if completed >= total_items else "in_progress",
+            "progress": f"{completed}/{total_items}",
+            "total_items": total_items,
+            "completed": completed,
+            "journal": self.JOURNAL_NAME,
+        }
+        manifest.update(extra)
+        tmp_file = self.manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+
+    def records(self):
+        """Yield journal records in write order."""
+        for _, record in self._indexed_records():
+            yield record
+
+    def _indexed_records(self):
+        """Yield (byte offset, record) pairs, ignoring a torn final line."""
+        if not self.journal_file.exists():
+            return
+        with open(self.journal_file, "rb") as f:
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # End of file, or interrupted mid-write
+                yield offset, json.loads(line)
+
+    def is_resumable(self) -> bool:
+        """Check for an interrupted export left in this directory."""
+        if not self.journal_file.exists() or not self.manifest_file.exists():
+            return False
+        with open(self.manifest_file, "r", encoding="utf-8") as f:
+            return json.load(f).get("export_status") == "in_progress"
+
+    def load_progress(self) -> tuple:
+        """Read back an interrupted export.
+
+        Returns (pages, assets, checkpoints): page_id -> {"object", "parent"}
+        for finished items, the url -> local path map, and
+        database_id -> data_source_id -> saved entries and cursor for
+        databases that were part-way through.
+        """
+        pages, assets, checkpoints = {}, {}, {}
+        for record in self.records():
+            kind, item_id, data = record["kind"], record["id"], record["data"]
+            if kind == "page":
+                pages[item_id] = {"object": data.get("object"), "parent": data.get("parent", {})}
+                checkpoints.pop(item_id, None)
+            elif kind == "assets":
+                assets.update(data)
+            elif kind == "db_chunk":
+                saved = checkpoints.setdefault(item_id, {}).setdefault(
+                    data["data_source_id"], {"entries": [], "next_cursor": None}
+                )
+                saved["entries"].extend(data["entries"])
+                saved["next_cursor"] = data["next_cursor"]
+        return pages, assets, checkpoints
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def compact(self, output_file: Path, users: dict, comments: dict, assets: dict,
+                databases: dict, total_items: int, completed: int) -> dict:
+        """Write export.json from the journal, streaming one page at a time.
+
+        Later records for the same id replace earlier ones. Returns the
+        summary counts written to the export header.
+        """
+        self.close()
+
+        # First pass: locate the latest record per page and count object types
+        offsets = {}
+        kinds = {}
+        data_sources = {}
+        for offset, record in self._indexed_records():
+            if record["kind"] != "page":
                 continue
+            page = record["data"]
+            offsets[record["id"]] = offset
+            kinds[record["id"]] = page.get("object")
+            data_sources[record["id"]] = len(page.get("data_sources_full", []))
+
+        summary = {
+            "page_count": sum(1 for k in kinds.values() if k == "page"),
+            "database_count": sum(1 for k in kinds.values() if k == "database"),
+            "data_source_count": sum(
+                count for page_id, count in data_sources.items() if kinds[page_id] == "database"
+            ),
+            "referenced_database_count": len(databases),
+            "user_count": len(users),
+            "comment_count": sum(len(c) for c in comments.values()),
+            "asset_count": len(assets),
+        }
+        header = export_header(summary, users, comments, assets, databases, total_items, completed)
+
+        # Second pass: stream pages into place, same layout as json.dump(indent=2)
+        def latest_pages():
+            with open(self.journal_file, "rb") as f:
+                for page_id, offset in offsets.items():
+                    f.seek(offset)
+                    yield page_id, json.loads(f.readline())["data"]
+
+        write_export_json(output_file, header, latest_pages())
+
+        return summary
+
+    def discard(self) -> None:
+        """Remove the journal once it has been compacted."""
+        self.close()
+        if self.journal_file.exists():
+            self.journal_file.unlink()
+
+
+class SqliteJournal(ExportJournal):
+    """Export journal kept in an ExportStore (export.db) instead of export.ndjson.
+
+    Each fetched page/database is committed in its own transaction along
+    with its blocks and assets, and database chunks go to their own table.
+    compact() only adds the header tables: export.db is the finished export
+    and no export.json is written (export_store.py can materialize one).
+    """
 
-            # Generate filename from file name or fallback to hash
-            original_name = file_item.get("name", "")
-            if original_name:
-                # Slugify the filename but keep extension
-                name_parts = original_name.rsplit(".", 1)
-                base = re.sub(r'[^\w\s-]', '', name_parts[0].lower())
-                base = re.sub(r'[-\s]+', '-', base).strip('-')
-                ext = f".{name_parts[1].lower()}" if len(name_parts) > 1 else ""
-                filename = f"{base}{ext}" if base else get_asset_filename(url, prop_name)
-            else:
-                filename = get_asset_filename(url, prop_name)
+    JOURNAL_NAME = STORE_NAME
 
-            local_path = assets_dir / filename
+    def __init__(self, export_dir: Path):
+        super().__init__(export_dir)
+        self.store = ExportStore(self.journal_file)
+        self.finished = False
 
-            # Handle duplicates by adding suffix
-            counter = 1
-            while local_path.exists() and counter < 100:
-                name_parts = filename.rsplit(".", 1)
-                if len(name_parts) > 1:
-                    local_path = assets_dir / f"{name_parts[0]}-{counter}.{name_parts[1]}"
-                else:
-                    local_path = assets_dir / f"{filename}-{counter}"
-                counter += 1
+    def append(self, kind: str, item_id: str, data) -> None:
+        if kind != "db_chunk":
+            raise ValueError(f"Unexpected journal record: {kind}")
+        self.store.put_chunk(item_id, data)
 
-            if download_asset(url, local_path):
-                downloaded[url] = f"assets/{local_path.name}"
-                logging.info(f"    Property asset: {local_path.name}")
-            else:
-                downloaded[url] = url  # Keep original on failure
+    def record_page(self, page_id: str, content: dict, assets: dict = None) -> None:
+        self.store.put_page(page_id, content, assets)
+
+    def load_progress(self) -> tuple:
+        pages = {page_id: {"object": stub.get("object"), "parent": stub.get("parent", {})}
+                 for page_id, stub in self.store.index_data()["pages"].items()}
+        checkpoints = {}
+        for database_id, data in self.store.chunks():
+            saved = checkpoints.setdefault(database_id, {}).setdefault(
+                data["data_source_id"], {"entries": [], "next_cursor": None}
+            )
+            saved["entries"].extend(data["entries"])
+            saved["next_cursor"] = data["next_cursor"]
+        return pages, self.store.get("_assets"), checkpoints
+
+    def close(self) -> None:
+        self.store.close()
+
+    def compact(self, output_file: Path, users: dict, comments: dict, assets: dict,
+                databases: dict, total_items: int, completed: int) -> dict:
+        """Store the header tables in export.db; output_file is not written."""
+        summary = {
+            **self.store.object_counts(),
+            "referenced_database_count": len(databases),
+            "user_count": len(users),
+            "comment_count": sum(len(c) for c in comments.values()),
+            "asset_count": len(assets),
+        }
+        self.store.finish(export_header(summary, users, comments, assets, databases,
+                                        total_items, completed))
+        self.finished = True
+        return summary
+
+    def discard(self) -> None:
+        """Remove an unfinished export.db; a compacted one is the export."""
+        self.close()
+        if self.finished:
+            return
+        for path in (self.journal_file, self.journal_file.with_name(STORE_NAME + "-wal"),
+                     self.journal_file.with_name(STORE_NAME + "-shm")):
+            if path.exists():
+                path.unlink()
+
+
+class DatabaseCheckpoint:
+    """Saves a database's entries to the journal one query page at a time.
+
+    A resumed export restores the saved entries and continues each data
+    source from its last pagination cursor instead of from entry 1.
+    """
+
+    def __init__(self, journal: ExportJournal, database_id: str, saved: dict = None):
+        self.journal = journal
+        self.database_id = database_id
+        self.saved = saved or {}  # data_source_id -> {"entries", "next_cursor"}
 
-            # Store local path in the file info
-            file_info["_local_path"] = downloaded[url]
+    def restore(self, data_source_id: str) -> tuple:
+        """Return (entries, next cursor, done) saved for a data source."""
+        saved = self.saved.get(data_source_id)
+        if not saved:
+            return [], None, False
+        return list(saved["entries"]), saved["next_cursor"], saved["next_cursor"] is None
 
-    return len(downloaded) - initial_count
+    def save(self, data_source_id: str, entries: list, next_cursor: str) -> None:
+        """Record one query page of fully fetched entries and the cursor after it."""
+        self.journal.append("db_chunk", self.database_id, {
+            "data_source_id": data_source_id,
+            "next_cursor": next_cursor,
+            "entries": entries,
+        })
+
+
+# =============================================================================
+# Incremental Export
+# =============================================================================
+
+def load_previous_export(raw_export_path: Path) -> tuple:
+    """Load the most recent export.json (or finished export.db) under rawExportPath.
+
+    Returns (data, export_dir), or (None, None) when there is no earlier export.
+    """
+    for export_dir in sorted(raw_export_path.glob("*"), reverse=True):
+        export_file = export_dir / "export.json"
+        if export_file.exists():
+            with open(export_file, "r", encoding="utf-8") as f:
+                return json.load(f), export_dir
+        store = ExportStore(export_dir / STORE_NAME)
+        if not store.path.exists():
+            continue
+        try:
+            if store.get("exported_at") is not None:
+                return store.to_dict(), export_dir
+        finally:
+            store.close()  # Also when skipping an unfinished export.db
+    return None, None
+
+
+def is_unchanged(previous: dict, item: dict) -> bool:
+    """Check whether a previously exported item is still current."""
+    if not previous:
+        return False
+    edited = item.get("last_edited_time")
+    return bool(edited) and previous.get("last_edited_time") == edited
+
+
+def iter_file_infos(content: dict):
+    """Yield every file/external info dict referenced by a page's blocks and properties."""
+    stack = list(content.get("blocks", []))
+    for entry in content.get("entries", []):
+        stack.extend(entry.get("blocks", []))
+    while stack:
+        block = stack.pop()
+        block_type = block.get("type")
+        if block_type in ("image", "file", "video", "pdf"):
+            block_data = block.get(block_type, {})
+            file_info = block_data.get("file") or block_data.get("external")
+            if file_info:
+                yield file_info
+        stack.extend(block.get("children", []))
+
+    for prop in content.get("properties", {}).values():
+        if prop.get("type") == "files":
+            for file_item in prop.get("files", []):
+                file_info = file_item.get(file_item.get("type"), {})
+                if file_info:
+                    yield file_info
+
+
+def carry_over_assets(content: dict, previous_dir: Path, assets_dir: Path, downloaded: dict) -> dict:
+    """Bring a reused page's downloaded assets into this export.
+
+    Returns the url -> local path entries added to downloaded.
+    """
+    carried = {}
+    for file_info in iter_file_infos(content):
+        local_path = file_info.get("_local_path")
+        url = file_info.get("url", local_path)
+        if not local_path or not local_path.startswith("assets/") or url in downloaded:
+            continue
+        downloaded[url] = carried[url] = local_path
+
+        source = previous_dir / local_path
+        dest = assets_dir / Path(local_path).name
+        if source.exists() and not dest.exists():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, dest)
+    return carried
+
+
+# =============================================================================
+# Fetch Planning
+# =============================================================================
+
+def plan_items_streaming(items):
+    """Order search results, as they arrive, so databases come before their entry pages.
+
+    Search returns database entries twice: inside their database (through
+    data_sources.query) and as pages of their own. Fetching the database
+    first lets the entry pages reuse what it fetched (see SharedEntries).
+    Items are yielded as they come, except entry pages whose database has
+    not been yielded yet: those are held back (search metadata only) and
+    follow their database as soon as it is. Entry pages whose database
+    never shows up come last.
+    """
+    databases = set()
+    waiting = {}  # database_id -> entry page items
+    for item in items:
+        db_id = referenced_database_id(item) if item["object"] == "page" else None
+        if db_id and db_id not in databases:
+            waiting.setdefault(db_id, []).append(item)
+            continue
+        yield item
+        if item["object"] == "database":
+            databases.add(item["id"])
+            yield from waiting.pop(item["id"], [])
+    for group in waiting.values():
+        yield from group
+
+
+def block_request_count(blocks: list) -> int:
+    """Block children requests it took to fetch a block tree (100 children per request)."""
+    count = max(1, -(-len(blocks) // 100))
+    for block in blocks:
+        if "children" in block:
+            count += block_request_count(block["children"])
+    return count
+
+
+class SharedEntries:
+    """Database entries fetched with their database, kept for their own page items.
+
+    Only ids in `wanted` (the ids search has produced so far, see read_ahead;
+    search when streaming) are kept, and each is handed out once. Counts
+    the pages.retrieve and block requests this saves.
+    """
+
+    def __init__(self, wanted: set):
+        self.wanted = wanted
+        self.entries = {}
+        self.count = 0
+        self.requests_saved = 0
+
+    def __contains__(self, page_id: str) -> bool:
+        return page_id in self.entries
+
+    def offer(self, entry: dict) -> None:
+        if entry["id"] in self.wanted:
+            self.entries[entry["id"]] = entry
+
+    def take(self, page_id: str) -> dict:
+        """Hand out an entry as its page's content.
+
+        Returns a copy, so asset paths filled in for the page do not leak
+        into the database's entries depending on download timing.
+        """
+        entry = copy.deepcopy(self.entries.pop(page_id))
+        self.count += 1
+        self.requests_saved += 1 + block_request_count(entry.get("blocks", []))
+        return entry
+
+
+# =============================================================================
+# Pipeline
+# =============================================================================
+
+SEARCH_READ_AHEAD = 200  # search results buffered ahead of the page fetcher
+PAGES_IN_FLIGHT = 32     # fetched pages held while their assets download
+STAGE_DEPTH = 64         # queued comment / referenced database lookups
+STAGE_WORKERS = 2
+
+
+def read_ahead(iterable, depth: int, seen: set = None):
+    """Iterate `iterable` on a background thread, at most `depth` items ahead.
+
+    The producer blocks while the buffer is full, so a fast search never
+    gets far ahead of a slow consumer. Ids of produced items are added to
+    `seen`. An exception in the producer is re-raised in the consumer.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    done = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in iterable:
+                if seen is not None:
+                    seen.add(item["id"])
+                while not stop.is_set():
+                    try:
+                        buffer.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            buffer.put(done)
+        except BaseException as e:
+            buffer.put(e)
+
+    thread = threading.Thread(target=produce, name="search", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+class PipelineStage:
+    """Worker threads draining a bounded queue of keyed lookups.
+
+    put() blocks while `depth` jobs are waiting, so the export loop is held
+    back instead of queueing without limit. Each key is looked up once and
+    its result kept; join() waits for the rest and re-raises the first error,
+    cancel() abandons them.
+    """
+
+    def __init__(self, name: str, fn, workers: int = STAGE_WORKERS, depth: int = STAGE_DEPTH):
+        self.fn = fn
+        self.jobs = queue.Queue(maxsize=depth)
+        self.keys = []
+        self.queued = set()
+        self.results = {}
+        self.error = None
+        self.cancelled = False
+        self.threads = [threading.Thread(target=self._work, name=f"{name}-{n}", daemon=True)
+                        for n in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            key = self.jobs.get()
+            if key is None:
+                return
+            if self.error is not None or self.cancelled:
+                continue  # Drain without working once a lookup has failed
+            try:
+                self.results[key] = self.fn(key)
+            except Exception as e:
+                self.error = self.error or e
+
+    def put(self, key: str) -> None:
+        """Queue a lookup for key unless it was already queued."""
+        if key in self.queued:
+            return
+        self.queued.add(key)
+        self.keys.append(key)
+        self.jobs.put(key)
+
+    def join(self) -> dict:
+        """Wait for every lookup; returns key -> result in the order keys were queued."""
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+        return {key: self.results[key] for key in self.keys if key in self.results}
+
+    def cancel(self) -> None:
+        """Stop the workers without waiting for queued lookups or raising their errors."""
+        self.cancelled = True
+        while True:
+            try:
+                self.jobs.get_nowait()
+            except queue.Empty:
+                break
+        for _ in self.threads:
+            self.jobs.put(None)
 
 
 # =============================================================================
@@ -462,159 +1871,411 @@ def get_title(item: dict) -> str:
     return "Untitled"
 
 
+def fetch_requests_estimate(item: dict) -> int:
+    """Fewest requests exporting an item takes: metadata, blocks or queries, comments."""
+    if item.get("object") == "database":
+        return 2 + 2 * len(item.get("data_sources", []))
+    return 3
+
+
+class ExcludeFilter:
+    """excludePatterns applied to whole subtrees of the page hierarchy.
+
+    An item is excluded when its title matches one of the patterns
+    (compiled once, case-insensitive) or any of its ancestors is excluded,
+    so nothing below an excluded page or database is fetched. Pages inside
+    columns, toggles or synced blocks are traced to their page with
+    blocks.retrieve, once per block.
+
+    Search returns children before their parents as often as not: filter()
+    holds an item back until its parent has been decided, and releases
+    items whose parent never appears (not shared with the integration) as
+    roots at the end. With `lookup` (item id -> item, or None if unknown),
+    parents are looked up there instead and nothing is held back.
+
+    Counts the items excluded and the requests exporting them would
+    have taken, at least.
+    """
+
+    def __init__(self, patterns: list, client: RateLimitedClient = None, lookup=None):
+        self.pattern = (re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+                        if patterns else None)
+        self.client = client
+        self.lookup = lookup
+        self.excluded = {}      # item id -> True if excluded, False if kept
+        self.block_owners = {}  # block id -> id of the page or database holding it
+        self.count = 0
+        self.requests_pruned = 0
+        self.lock = threading.Lock()  # Search and database entries skip from different threads
+
+    def __bool__(self) -> bool:
+        return self.pattern is not None
+
+    def matches(self, item: dict) -> bool:
+        return bool(self.pattern and self.pattern.search(get_title(item)))
+
+    def parent_id(self, item: dict) -> str:
+        """Id of the page or database an item sits in, or None at the top level."""
+        parent = item.get("parent", {})
+        parent_type = parent.get("type")
+        if parent_type in ("page_id", "database_id"):
+            return parent.get(parent_type)
+        if parent_type == "data_source_id":
+            return parent.get("database_id")
+        if parent_type == "block_id":
+            return self.block_owner(parent["block_id"])
+        return None
+
+    def block_owner(self, block_id: str) -> str:
+        """The page or database a (possibly nested) block belongs to."""
+        chain = []
+        owner = None
+        while self.client is not None:
+            if block_id in self.block_owners:
+                owner = self.block_owners[block_id]
+                break
+            chain.append(block_id)
+            try:
+                block = self.client.request(
+                    lambda b=block_id: self.client.client.blocks.retrieve(block_id=b)
+                )
+            except APIResponseError as e:
+                logging.warning(f"  Cannot resolve parent block {block_id}: {e}")
+                break
+            if block.get("type") in ("child_page", "child_database"):
+                owner = block_id  # Pages and databases are blocks too
+                break
+            parent = block.get("parent", {})
+            if parent.get("type") != "block_id":
+                owner = parent.get(parent.get("type")) if parent.get("type") != "workspace" else None
+                break
+            block_id = parent["block_id"]
+        for block in chain:
+            self.block_owners[block] = owner
+        return owner
+
+    def decide(self, item: dict):
+        """True if excluded, False if kept, None while its parent is undecided."""
+        if item["id"] in self.excluded:
+            return self.excluded[item["id"]]
+        if self.matches(item):
+            return True
+        parent_id = self.parent_id(item)
+        if parent_id is None:
+            return False
+        if parent_id in self.excluded:
+            return self.excluded[parent_id]
+        if self.lookup is None:
+            return None
+        parent = self.lookup(parent_id)
+        excluded = bool(parent) and self.decide(parent)
+        self.excluded[parent_id] = excluded
+        return excluded
+
+    def drop_entries(self, entries: list) -> list:
+        """Database entries whose titles are not excluded."""
+        if not self:
+            return entries
+        kept = []
+        for entry in entries:
+            if self.matches(entry):
+                self.skip(entry)
+            else:
+                kept.append(entry)
+        return kept
+
+    def skip(self, item: dict) -> None:
+        """Settle an item as excluded, counting it the first time."""
+        with self.lock:
+            if self.excluded.get(item["id"]):
+                return  # Already skipped as a database entry, or seen twice
+            self.excluded[item["id"]] = True
+            self.count += 1
+            self.requests_pruned += fetch_requests_estimate(item)
+        if self.matches(item):
+            logging.info(f"  Skipping: {get_title(item)}")
+        else:
+            logging.debug(f"  Skipping {get_title(item)} (inside an excluded item)")
+
+    def _release(self, item: dict, excluded: bool, waiting: dict):
+        """Settle an item, then the held-back items below it."""
+        stack = [(item, excluded)]
+        while stack:
+            item, excluded = stack.pop()
+            if excluded:
+                self.skip(item)
+            else:
+                self.excluded[item["id"]] = False
+                yield item
+            for child in reversed(waiting.pop(item["id"], [])):
+                stack.append((child, excluded or self.matches(child)))
+
+    def filter(self, items):
+        """Yield the items that are not excluded, in search order where possible."""
+        if not self:
+            yield from items
+            return
+        waiting = {}  # undecided parent id -> items held back
+        for item in items:
+            excluded = self.decide(item)
+            if excluded is None:
+                waiting.setdefault(self.parent_id(item), []).append(item)
+            else:
+                yield from self._release(item, excluded, waiting)
+
+        # Parents that never appeared are out of reach: their items are top level.
+        # Release those first; everything else waits on an item held in there.
+        while waiting:
+            held = {item["id"] for group in waiting.values() for item in group}
+            parent_id = next(p for p in waiting if p not in held)
+            self.excluded[parent_id] = False
+            for item in waiting.pop(parent_id):
+                yield from self._release(item, self.matches(item), waiting)
+
+
 def search_all_pages(client: RateLimitedClient, exclude_patterns: list = None) -> list:
     """Search for all pages/databases shared with the integration."""
-    results = []
+    return list(iter_search_results(client, ExcludeFilter(exclude_patterns or [], client)))
+
+
+# Newest edits first, so a sync can stop at the last edit it has seen
+SORT_BY_LAST_EDITED = {"direction": "descending", "timestamp": "last_edited_time"}
+
+
+def iter_search_results(client: RateLimitedClient, exclude: ExcludeFilter = None,
+                        sort: dict = None):
+    """Yield pages/databases shared with the integration, one search page at a time.
+
+    The next search page is only requested once the caller has consumed
+    the previous one, so a caller that stops early stops paginating.
+    Items in subtrees excluded by `exclude` are left out.
+    """
+    if exclude:
+        yield from exclude.filter(iter_search_results(client, sort=sort))
+        return
+
+    found = 0
     start_cursor = None
-    exclude_patterns = exclude_patterns or []
+    options = {"page_size": 100, "sort": sort} if sort else {"page_size": 100}
 
     logging.info("Searching for shared pages...")
 
     while True:
         if start_cursor is None:
             response = client.request(
-                lambda: client.client.search(page_size=100)
+                lambda: client.client.search(**options)
             )
         else:
             cursor = start_cursor
             response = client.request(
-                lambda: client.client.search(page_size=100, start_cursor=cursor)
+                lambda: client.client.search(**options, start_cursor=cursor)
             )
 
         for item in response["results"]:
             if item["object"] in ["page", "database"]:
-                title = get_title(item)
-
-                # Check exclude patterns
-                if any(re.search(p, title, re.IGNORECASE) for p in exclude_patterns):
-                    logging.info(f"  Skipping: {title}")
-                    continue
-
-                results.append(item)
+                found += 1
+                yield item
 
         start_cursor = response.get("next_cursor")
-        logging.info(f"  Found {len(results)} items...")
+        logging.info(f"  Found {found} items...")
 
         if not start_cursor:
             break
 
-    return results
-
-
-def save_export_state(output_file: Path, pages: dict, users: dict, comments: dict,
-                      assets: dict, databases: dict, total_items: int, completed: int):
-    """Save current export state to JSON file (incremental save)."""
-    # Count data sources across all databases
-    data_source_count = sum(
-        len(p.get("data_sources_full", []))
-        for p in pages.values()
-        if p.get("object") == "database"
-    )
-
-    result = {
-        "exported_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-        "api_version": "2025-09-03",
-        "export_status": "complete" if completed >= total_items else "in_progress",
-        "progress": f"{completed}/{total_items}",
-        "page_count": len([p for p in pages.values() if p.get("object") == "page"]),
-        "database_count": len([p for p in pages.values() if p.get("object") == "database"]),
-        "data_source_count": data_source_count,
-        "referenced_database_count": len(databases),
-        "user_count": len(users),
-        "comment_count": sum(len(c) for c in comments.values()),
-        "asset_count": len(assets),
-        "_users": users,
-        "_comments": comments,
-        "_assets": assets,  # url -> local_path mapping
-        "_databases": databases,  # database_id -> database object (for path resolution)
-        "pages": pages
-    }
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
-
 
-def export_workspace(client: RateLimitedClient, export_dir: Path, exclude_patterns: list = None) -> dict:
-    """Export all shared pages and databases with assets, saving incrementally."""
+def export_workspace(client: RateLimitedClient, export_dir: Path, exclude_patterns: list = None,
+                     previous: dict = None, previous_dir: Path = None, resume: bool = False,
+                     http_client: httpx.Client = None, sqlite: bool = False,
+                     asset_cache: AssetCache = None) -> dict:
+    """Export all shared pages and databases with assets, journaling as items complete.
+
+    The export runs as a pipeline under the client's shared rate budget:
+    users are fetched in the background, search results are read ahead
+    on their own thread while pages are fetched, assets download on the
+    AssetDownloader pool, and comments and referenced databases are looked
+    up by PipelineStage workers as soon as their page is known. Every hand-off
+    is a bounded queue, so a fast stage waits for a slow one instead of
+    buffering the workspace in memory.
+
+    When a previous export is given, pages and database entries whose
+    last_edited_time has not changed reuse its blocks, assets and comments
+    instead of being fetched again. With resume, items already in the
+    export_dir journal are skipped and databases continue from their last
+    saved cursor. http_client, if given, is used for asset downloads.
+    With sqlite, the export is written to export.db (see export_store.py)
+    instead of export.json. With asset_cache, assets of blocks and
+    properties unchanged since an earlier export are not downloaded again.
+    Items matching exclude_patterns are skipped with everything below them
+    (see ExcludeFilter), before any of their blocks are fetched.
+    Phase, page fetch and asset download timings go to client.metrics.
+    """
+    metrics = client.metrics
     output_file = export_dir / "export.json"
     assets_dir = export_dir / "assets"
-
-    # Fetch users first (warn if capability missing)
-    try:
-        users = fetch_all_users(client)
-    except APIResponseError as e:
-        if e.status == 403:
-            logging.warning("Users API not available (missing capability). Continuing without user data.")
-            users = {}
-        else:
-            raise
-
-    # Search for all shared items
-    items = search_all_pages(client, exclude_patterns)
-    total_items = len(items)
-    logging.info(f"\nExporting {total_items} items...\n")
-
-    pages = {}
-    downloaded_assets = {}  # url -> local_path mapping
-
-    for i, item in enumerate(items):
-        title = get_title(item)
-        item_type = item["object"]
-        logging.info(f"[{i + 1}/{total_items}] {item_type}: {title}")
-
-        try:
-            if item_type == "database":
-                content = fetch_database_content(client, item["id"])
-            else:
-                content = fetch_page_content(client, item["id"])
-
-            # Download assets for this page (blocks and file properties)
-            asset_count = download_page_assets(content, assets_dir, downloaded_assets)
-            prop_asset_count = process_property_assets(content, assets_dir, downloaded_assets)
-            total_assets = asset_count + prop_asset_count
-            if total_assets:
-                logging.info(f"  Downloaded {total_assets} assets ({prop_asset_count} from properties)")
-
-            pages[item["id"]] = content
-
-            # Save after each item (incremental)
-            save_export_state(output_file, pages, users, {}, downloaded_assets, {}, total_items, i + 1)
-
-        except Exception as e:
-            logging.error(f"  Failed to export {title}: {e}")
-
-    # Fetch referenced databases (for pages with data_source_id parent)
-    # This enables the converter to resolve database names for directory paths
-    referenced_databases = fetch_referenced_databases(client, pages)
-
-    # Fetch comments after all pages are exported (warn if capability missing)
+    journal = SqliteJournal(export_dir) if sqlite else ExportJournal(export_dir)
+
+    previous_pages = previous.get("pages", {}) if previous else {}
+    previous_comments = previous.get("_comments", {}) if previous else {}
+    previous_entries = dict(previous_pages)
+    for prev in previous_pages.values():
+        for entry in prev.get("entries", []):
+            previous_entries.setdefault(entry["id"], entry)
+    reused = set()
+
+    # Full content lives in the journal; keep only what the later passes need
+    if resume:
+        pages, downloaded_assets, checkpoints = journal.load_progress()
+        logging.info(f"Resuming: {len(pages)} items already exported")
+    else:
+        journal.discard()  # Leftovers from an abandoned run today
+        pages, downloaded_assets, checkpoints = {}, {}, {}
+    # pages: page_id -> {"object", "parent"}; downloaded_assets: url -> local_path
+    # Totals grow as search pages arrive, so the status is set explicitly
+    journal.write_manifest(0, 0, export_status="in_progress")
+    metrics.begin_phase("items")
+
+    # Users are only needed at the end; fetch them alongside everything else
+    users_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="users")
+    users_future = users_pool.submit(fetch_workspace_users, client)
+
+    # Search runs ahead of the fetch loop; each database is fetched before the
+    # entry pages seen so far, which then reuse what it fetched
+    seen = set()
+    exclude = ExcludeFilter(exclude_patterns or [], client)
+    items = plan_items_streaming(read_ahead(iter_search_results(client, exclude),
+                                            SEARCH_READ_AHEAD, seen))
+    shared = SharedEntries(seen)
+
+    downloader = AssetDownloader(assets_dir, http_client=http_client, metrics=metrics,
+                                 cache=asset_cache)
+    comment_stage = PipelineStage("comments", lambda page_id: fetch_page_comments(client, page_id))
+    database_stage = PipelineStage("databases", lambda db_id: fetch_referenced_database(client, db_id))
+    in_flight = []  # (page_id, content, new assets, pending downloads), in fetch order
+
+    def journal_finished_pages(wait: bool = False):
+        """Journal fetched pages once their asset downloads have completed.
+
+        Beyond PAGES_IN_FLIGHT pages, waits for the oldest page's downloads.
+        """
+        while in_flight and (wait or len(in_flight) > PAGES_IN_FLIGHT
+                             or all(future.done() for _, _, future in in_flight[0][3])):
+            page_id, content, new_assets, pending = in_flight.pop(0)
+            new_assets.update(resolve_pending_assets(pending, downloaded_assets))
+            journal.record_page(page_id, content, new_assets)
+
+    def follow_up(page_id: str, page: dict):
+        """Queue the comment and referenced database lookups a page needs."""
+        if page_id not in reused:
+            comment_stage.put(page_id)
+        db_id = referenced_database_id(page)
+        if db_id:
+            database_stage.put(db_id)
+
+    completed = 0
     try:
-        comments = fetch_all_comments(client, pages)
-    except APIResponseError as e:
-        if e.status == 403:
-            logging.warning("Comments API not available (missing capability). Continuing without comments.")
-            comments = {}
-        else:
-            raise
+        for item in items:
+            completed += 1
+            if item["id"] in pages:
+                follow_up(item["id"], pages[item["id"]])
+                continue  # Finished before the export was interrupted
 
-    # Final save with comments and referenced databases
-    save_export_state(output_file, pages, users, comments, downloaded_assets, referenced_databases, total_items, total_items)
+            title = get_title(item)
+            item_type = item["object"]
+            logging.info(f"[{completed}/{len(seen)}] {item_type}: {title}")
 
-    # Count data sources
-    data_source_count = sum(
-        len(p.get("data_sources_full", []))
-        for p in pages.values()
-        if p.get("object") == "database"
-    )
-
-    return {
-        "page_count": len([p for p in pages.values() if p.get("object") == "page"]),
-        "database_count": len([p for p in pages.values() if p.get("object") == "database"]),
-        "data_source_count": data_source_count,
-        "referenced_database_count": len(referenced_databases),
-        "user_count": len(users),
-        "comment_count": sum(len(c) for c in comments.values()),
-        "asset_count": len(downloaded_assets)
-    }
+            try:
+                carried = {}
+                if item_type == "page" and is_unchanged(previous_pages.get(item["id"]), item):
+                    content = previous_pages[item["id"]]
+                    carried = carry_over_assets(content, previous_dir, assets_dir, downloaded_assets)
+                    reused.add(item["id"])
+                    logging.info("  Unchanged, reusing previous export")
+                elif item_type == "database":
+                    started = time.perf_counter()
+                    checkpoint = DatabaseCheckpoint(journal, item["id"], checkpoints.get(item["id"]))
+                    content = fetch_database_content(client, item["id"], previous_entries, checkpoint, shared,
+                                                     exclude)
+                    metrics.observe("database_fetch", time.perf_counter() - started)
+                elif item["id"] in shared:
+                    content = shared.take(item["id"])
+                    logging.info("  Fetched with its database, reusing")
+                else:
+                    started = time.perf_counter()
+                    content = fetch_page_content(client, item["id"])
+                    metrics.observe("page_fetch", time.perf_counter() - started)
+
+                # Queue asset downloads for this page (blocks and file properties);
+                # they run in the background while the next pages are fetched
+                pending = []
+                asset_count = download_page_assets(content, downloader, downloaded_assets, pending)
+                prop_asset_count = process_property_assets(content, downloader, downloaded_assets, pending)
+                total_assets = asset_count + prop_asset_count
+                if total_assets:
+                    logging.info(f"  Queued {total_assets} assets ({prop_asset_count} from properties)")
+
+                in_flight.append((item["id"], content, carried, pending))
+                pages[item["id"]] = {"object": content.get("object"), "parent": content.get("parent", {})}
+                follow_up(item["id"], pages[item["id"]])
+
+            except Exception as e:
+                logging.error(f"  Failed to export {title}: {e}")
+
+            journal_finished_pages()
+            journal.write_manifest(len(seen), completed, export_status="in_progress")
+
+        if shared.count:
+            logging.info(f"Shared {shared.count} database entries with their pages, "
+                         f"saving {shared.requests_saved} requests")
+        metrics.count("entries_shared", shared.count)
+        metrics.count("requests_saved", shared.requests_saved)
+        if exclude.count:
+            logging.info(f"Excluded {exclude.count} items with their subtrees, "
+                         f"pruning at least {exclude.requests_pruned} requests")
+        metrics.count("items_excluded", exclude.count)
+        metrics.count("requests_pruned", exclude.requests_pruned)
+
+        # Pages journaled by an interrupted run that search no longer returns
+        for page_id, page in pages.items():
+            follow_up(page_id, page)
+
+        metrics.begin_phase("drain")
+        journal_finished_pages(wait=True)
+    except BaseException:
+        # Let the error through now; the queued lookups are of no use any more
+        comment_stage.cancel()
+        database_stage.cancel()
+        raise
+    finally:
+        downloader.close()
+        users_pool.shutdown(wait=False)
+    fetched_comments = comment_stage.join()
+    referenced_databases = database_stage.join()
+    if asset_cache:
+        metrics.count("asset_cache_evictions", asset_cache.save())
+    users = users_future.result()
+
+    # Comments in page order, then those of reused pages from the previous export
+    comments = {page_id: fetched_comments[page_id] for page_id in pages
+                if fetched_comments.get(page_id)}
+    logging.info(f"Found comments on {len(comments)} pages")
+    for page_id in reused:
+        if previous_comments.get(page_id):
+            comments[page_id] = previous_comments[page_id]
+    if previous is not None:
+        logging.info(f"Reused {len(reused)} unchanged pages from {previous_dir.name}")
+    referenced_databases = {db_id: db for db_id, db in referenced_databases.items() if db is not None}
+    logging.info(f"Fetched {len(referenced_databases)} referenced databases")
+
+    # Compact the journal into export.json (or finish export.db) with comments and referenced databases
+    metrics.begin_phase("compact")
+    total_items = len(seen)
+    summary = journal.compact(output_file, users, comments, downloaded_assets,
+                              referenced_databases, total_items, total_items)
+    journal.write_manifest(total_items, total_items, **summary)
+    journal.discard()
+    metrics.begin_phase(None)
+
+    return summary
 
 
 # =============================================================================
@@ -637,12 +2298,42 @@ def get_timestamp() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
 
+def utc_now() -> str:
+    """Get current UTC time as an ISO 8601 string with Z suffix."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def get_option(name: str, default: str = None) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
 def print_usage(config: dict = None):
     """Print usage information and available spaces."""
     print("Notion Exporter (Raw JSON)")
     print("=" * 30)
     print()
-    print("Usage: python exporter.py <space_name>")
+    print("Usage: python exporter.py <space_name> [--concurrency N] [--incremental] [--resume]")
+    print("                          [--base-url URL] [--metrics-textfile PATH] [--sqlite]")
+    print("                          [--asset-cache PATH] [--asset-cache-size MB] [--no-asset-cache]")
+    print()
+    print("Options:")
+    print("  --concurrency N   Keep up to N requests in flight (async client, default 1)")
+    print("  --incremental     Reuse unchanged pages from the previous export")
+    print("  --resume          Continue today's interrupted export where it stopped")
+    print("  --base-url URL    Send API requests to URL instead of api.notion.com")
+    print("  --metrics-textfile PATH")
+    print("                    Also write metrics in Prometheus textfile format to PATH")
+    print("  --sqlite          Write the export to export.db (SQLite) instead of export.json")
+    print("  --asset-cache PATH")
+    print(f"                    Reuse assets of unchanged blocks from PATH (default rawExportPath/{ASSET_CACHE_NAME})")
+    print("  --asset-cache-size MB")
+    print(f"                    Evict least recently used cached assets beyond MB (default {DEFAULT_ASSET_CACHE_MB})")
+    print("  --no-asset-cache  Download every asset again")
     print()
     if config:
         spaces = config.get("spaces", {})
@@ -695,31 +2386,88 @@ def main():
     # Resolve paths
     target_path = resolve_path(space_config["targetPath"])
     raw_export_path = target_path / space_config["rawExportPath"]
+
+    previous, previous_dir = None, None
+    if "--incremental" in sys.argv:
+        previous, previous_dir = load_previous_export(raw_export_path)
+        if previous is None:
+            logging.warning("No previous export found, running a full export")
+
     export_dir = raw_export_path / get_timestamp()
     export_dir.mkdir(parents=True, exist_ok=True)
 
+    sqlite = "--sqlite" in sys.argv or space_config.get("exportStore") == "sqlite"
+    journal_class = SqliteJournal if sqlite else ExportJournal
+
+    resume = "--resume" in sys.argv
+    if resume and not journal_class(export_dir).is_resumable():
+        logging.warning(f"No interrupted export in {export_dir}, starting a new one")
+        resume = False
+
     exclude_patterns = space_config.get("excludePatterns", [])
+    concurrency = int(get_option("--concurrency", space_config.get("concurrency", 1)))
+    base_url = get_option("--base-url", space_config.get("baseUrl"))
+    metrics_textfile = get_option("--metrics-textfile", space_config.get("metricsTextfile"))
+
+    asset_cache = None
+    cache_setting = space_config.get("assetCache", True)
+    if "--no-asset-cache" not in sys.argv and cache_setting is not False:
+        default_cache = raw_export_path / ASSET_CACHE_NAME
+        cache_dir = get_option("--asset-cache", cache_setting if isinstance(cache_setting, str) else None)
+        cache_mb = int(get_option("--asset-cache-size", space_config.get("assetCacheSize", DEFAULT_ASSET_CACHE_MB)))
+        asset_cache = AssetCache(resolve_path(cache_dir) if cache_dir else default_cache, cache_mb << 20)
 
     print(f"Space: {space_name}")
     print(f"Output: {export_dir}")
+    if concurrency > 1:
+        print(f"Concurrency: {concurrency}")
+    if base_url:
+        print(f"API: {base_url}")
+    if previous is not None:
+        print(f"Incremental: reusing unchanged pages from {previous_dir}")
+    if resume:
+        print("Resuming interrupted export")
     print()
 
     # Create client and export
-    client = RateLimitedClient(api_key)
+    if concurrency > 1:
+        client = AsyncRateLimitedClient(api_key, concurrency=concurrency, base_url=base_url)
+    else:
+        client = RateLimitedClient(api_key, base_url=base_url)
 
     try:
-        result = export_workspace(client, export_dir, exclude_patterns)
+        result = export_workspace(client, export_dir, exclude_patterns, previous, previous_dir, resume,
+                                  sqlite=sqlite, asset_cache=asset_cache)
 
         print()
         print(f"Done! Exported {result['page_count']} pages, {result['database_count']} databases, {result['data_source_count']} data sources")
         print(f"  Referenced databases: {result['referenced_database_count']}")
         print(f"  Users: {result['user_count']}, Comments: {result['comment_count']}, Assets: {result['asset_count']}")
-        print(f"Output: {export_dir / 'export.json'}")
+        if asset_cache:
+            print(f"  Asset cache: {client.metrics.counters['asset_cache_hits']:.0f} hits, "
+                  f"{client.metrics.counters['asset_cache_misses']:.0f} downloaded")
+        if client.metrics.counters["items_excluded"]:
+            print(f"  Excluded: {client.metrics.counters['items_excluded']:.0f} items, "
+                  f"at least {client.metrics.counters['requests_pruned']:.0f} requests pruned")
+        totals = client.metrics.totals()
+        print(f"  Requests: {totals['requests']} ({totals['retries']} retried, "
+              f"{client.metrics.counters['requests_saved']:.0f} saved by sharing database entries), "
+              f"throttled {totals['throttle_seconds']:.0f}s, backed off {totals['backoff_seconds']:.0f}s")
+        print(f"Output: {export_dir / (STORE_NAME if sqlite else 'export.json')}")
+        print(f"Metrics: {export_dir / 'metrics.json'}")
 
     except Exception as e:
         logging.error(f"\nExport failed: {e}")
         sys.exit(1)
 
+    finally:
+        if client.is_async:
+            client.close()
+        # Written even when the export fails, to show where the time went
+        client.metrics.write_json(export_dir / "metrics.json")
+        if metrics_textfile:
+            client.metrics.write_prometheus(resolve_path(metrics_textfile))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Notion Sync - Watch Mode
+
+Keeps a space's Markdown within minutes of Notion without full exports.
+Each cycle searches with results sorted by last_edited_time, newest first,
+and stops paginating a few minutes (LOOKBACK_SECONDS) below the high-water
+mark of the previous cycle, so items the search index surfaces late are
+still found. Only the pages and databases edited since then are fetched.
+last_edited_time has minute precision, so an item whose time has not
+changed is fetched again until a fetch happened after its minute was over,
+and counts as edited only if its content differs from the stored one.
+Edited items are patched into a living export.db, and only their Markdown
+files (and those of databases whose entries changed) are rewritten.
+
+The store lives in {rawExportPath}/.sync/ and is seeded from the latest
+finished export on first run. The high-water mark is persisted in
+sync-state.json, so a restarted sync continues where it stopped. Deleted
+pages, pages no longer shared and new users are not noticed; run a full
+export now and then for those.
+
+Usage:
+    python sync.py <space_name> [--interval SECONDS] [--once] [--concurrency N] [--base-url URL]
+
+Example:
+    python sync.py viran
+    python sync.py viran --interval 60
+    python sync.py viran --once
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from notion_client import APIResponseError
+
+from converter import find_latest_export, patch_workspace
+from export_store import STORE_NAME, ExportStore
+from exporter import (ASSET_CACHE_NAME, DEFAULT_ASSET_CACHE_MB, SORT_BY_LAST_EDITED, AssetCache,
+                      AssetDownloader, AsyncRateLimitedClient, ExcludeFilter, RateLimitedClient,
+                      download_page_assets, fetch_database_content, fetch_page_comments,
+                      fetch_page_content, fetch_referenced_database, get_option, get_title,
+                      iter_search_results, link_or_copy, load_config, process_property_assets,
+                      referenced_database_id, resolve_path, resolve_pending_assets, utc_now)
+
+logging.basicConfig(
+    format="%(asctime)s %(levelname)s: %(message)s",
+    level=logging.INFO
+)
+
+SYNC_DIR = ".sync"
+STATE_NAME = "sync-state.json"
+LOCK_NAME = "sync.lock"
+DEFAULT_INTERVAL = 300
+LOOKBACK_SECONDS = 300  # How late the search index may surface an edit
+
+
+# =============================================================================
+# Store & State
+# =============================================================================
+
+def seed_store(raw_export_path: Path, sync_dir: Path) -> ExportStore:
+    """Open the sync store, creating it from the latest finished export.
+
+    An export.db is copied with SQLite's backup API and an export.json is
+    loaded page by page. The export's assets are hardlinked alongside.
+    """
+    store = ExportStore(sync_dir / STORE_NAME)
+    if store.path.exists() and store.get("exported_at") is not None:
+        return store
+
+    source = find_latest_export(raw_export_path)
+    logging.info(f"Seeding sync store from {source}")
+    sync_dir.mkdir(parents=True, exist_ok=True)
+    if source.suffix == ".db":
+        seed = ExportStore(source)
+        seed.conn.backup(store.conn)
+        seed.close()
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        pages = data.pop("pages", {})
+        for page_id, page in pages.items():
+            store.put_page(page_id, page)
+        store.finish(data)
+
+    source_assets = source.parent / "assets"
+    if source_assets.exists():
+        for asset_file in source_assets.iterdir():
+            if asset_file.is_file():
+                link_or_copy(asset_file, sync_dir / "assets" / asset_file.name)
+    return store
+
+
+def load_state(state_file: Path, store: ExportStore) -> dict:
+    """The persisted sync cursor, starting from the newest edit in the store."""
+    if state_file.exists():
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"high_water": store.newest_edit() or "", "cycles": 0, "fetched": {}}
+
+
+def save_state(state_file: Path, state: dict) -> None:
+    tmp_file = state_file.with_suffix(".json.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def acquire_lock(sync_dir: Path):
+    """Hold an exclusive lock on the sync directory, or exit if another sync has it."""
+    try:
+        import fcntl
+    except ImportError:
+        return None
+    sync_dir.mkdir(parents=True, exist_ok=True)
+    lock = open(sync_dir / LOCK_NAME, "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        logging.error(f"Another sync is already running in {sync_dir}")
+        sys.exit(1)
+    return lock
+
+
+# =============================================================================
+# Sync Cycle
+# =============================================================================
+
+def shift_time(timestamp: str, seconds: float) -> str:
+    """A last_edited_time-style timestamp moved by `seconds`."""
+    moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00")) + timedelta(seconds=seconds)
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def minute_of(timestamp: str) -> str:
+    """The minute a timestamp falls in, as Notion reports last_edited_time."""
+    return shift_time(timestamp, 0)[:17] + "00.000Z"
+
+
+def content_fingerprint(content: dict) -> str:
+    """Hash of fetched content, ignoring what changes without an edit.
+
+    File URLs and their expiry are re-signed on every fetch, local asset
+    paths are filled in after download, and every response has its own
+    request_id.
+    """
+    def strip(value):
+        if isinstance(value, dict):
+            return {key: strip(item) for key, item in value.items()
+                    if key not in ("_local_path", "request_id")
+                    and not ("expiry_time" in value and key in ("url", "expiry_time"))}
+        if isinstance(value, list):
+            return [strip(item) for item in value]
+        return value
+    text = json.dumps(strip(content), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parent_lookup(client: RateLimitedClient, store: ExportStore):
+    """Look up an item's parent for ExcludeFilter: in the store, else from the API.
+
+    Excluded items are never stored, so a page added under one is only
+    recognised by fetching its parent.
+    """
+    def lookup(item_id: str) -> dict:
+        stub = store.stub(item_id)
+        if stub is not None:
+            return stub
+        try:
+            return client.request(lambda: client.client.pages.retrieve(page_id=item_id))
+        except APIResponseError:
+            pass
+        try:
+            return client.request(lambda: client.client.databases.retrieve(database_id=item_id))
+        except APIResponseError:
+            return None  # Not shared with the integration: the item is top level
+    return lookup
+
+
+def find_edited(client: RateLimitedClient, store: ExportStore, high_water: str,
+                fetched: dict, exclude: ExcludeFilter = None) -> tuple:
+    """Search newest edits first, down to LOOKBACK_SECONDS below high_water.
+
+    Returns (candidates, newest last_edited_time seen). Candidates are
+    items with a last_edited_time the store does not hold yet, and items
+    whose stored time is unchanged but which were last fetched (see
+    `fetched`: id -> [last_edited_time, fetched at]) within their edit
+    minute, when a later edit in that minute would not show.
+    """
+    since = shift_time(high_water, -LOOKBACK_SECONDS) if high_water else ""
+    candidates, newest = [], high_water
+    for item in iter_search_results(client, exclude, sort=SORT_BY_LAST_EDITED):
+        last_edited = item.get("last_edited_time") or ""
+        if last_edited < since:
+            break  # Everything further down was synced in an earlier cycle
+        newest = max(newest, last_edited)
+        stored = store.stub(item["id"])
+        if stored is None or stored.get("last_edited_time") != last_edited:
+            candidates.append(item)
+            continue
+        last_edited_then, fetched_at = fetched.get(item["id"], ["", ""])
+        if last_edited_then != last_edited or fetched_at < shift_time(last_edited, 60):
+            candidates.append(item)
+    return candidates, newest
+
+
+def patch_database_entry(store: ExportStore, database_id: str, entry: dict) -> bool:
+    """Replace (or add) an entry page inside its stored database. Returns True if stored."""
+    database = store.page(database_id)
+    if database is None or "entries" not in database:
+        return False
+    entries = database["entries"]
+    for i, existing in enumerate(entries):
+        if existing.get("id") == entry["id"]:
+            entries[i] = entry
+            break
+    else:
+        entries.append(entry)
+    store.put_page(database_id, database)
+    return True
+
+
+def sync_cycle(client: RateLimitedClient, store: ExportStore, state: dict, state_file: Path,
+               downloader: AssetDownloader, exclude_patterns: list = None) -> None:
+    """Fetch everything edited since the state's high-water mark into the store.
+
+    Candidates from find_edited() are fetched; one whose content matches
+    the stored version is left alone. The ids of pages whose Markdown must
+    be rewritten are added to the state's "pending" list, saved as each
+    page is stored, so a failure before conversion does not lose them. The
+    high-water mark is only advanced once every edited page is stored, and
+    never past the minute this cycle started in. Items matching
+    exclude_patterns, and everything below them, are left out.
+    """
+    started = minute_of(utc_now())
+    exclude = ExcludeFilter(exclude_patterns or [], client, lookup=parent_lookup(client, store))
+    fetched = state.setdefault("fetched", {})
+    candidates, newest = find_edited(client, store, state.get("high_water", ""), fetched, exclude)
+    known_databases = set(store.get("_databases", {}))
+    pending = state.setdefault("pending", [])
+    edited = 0
+
+    def mark(page_id: str):
+        if page_id not in pending:
+            pending.append(page_id)
+
+    for item in candidates:
+        fetched_at = utc_now()
+        previous = store.page(item["id"])
+        if item["object"] == "database":
+            previous_entries = {entry["id"]: entry for entry in (previous or {}).get("entries", [])}
+            content = fetch_database_content(client, item["id"], previous_entries, exclude=exclude)
+        else:
+            content = fetch_page_content(client, item["id"])
+        fetched[item["id"]] = [item.get("last_edited_time") or "", fetched_at]
+        if previous is not None and content_fingerprint(content) == content_fingerprint(previous):
+            save_state(state_file, state)
+            continue
+        logging.info(f"  {item['object']}: {get_title(item)}")
+        edited += 1
+
+        downloads, downloaded = [], {}
+        download_page_assets(content, downloader, downloaded, downloads)
+        process_property_assets(content, downloader, downloaded, downloads)
+        store.put_page(item["id"], content, resolve_pending_assets(downloads, downloaded))
+        store.put_comments(item["id"], fetch_page_comments(client, item["id"]))
+        mark(item["id"])
+
+        db_id = referenced_database_id(content)
+        if db_id:
+            if patch_database_entry(store, db_id, content):
+                mark(db_id)
+            if db_id not in known_databases:
+                database = fetch_referenced_database(client, db_id)
+                if database is not None:
+                    store.put_database(db_id, database)
+                known_databases.add(db_id)
+        save_state(state_file, state)
+
+    if exclude.count:
+        logging.info(f"Excluded {exclude.count} edited items, "
+                     f"pruning at least {exclude.requests_pruned} requests")
+    if edited:
+        store.update_header({"exported_at": utc_now(), **store.summary()})
+    downloader.forget()  # Every download of this cycle has been resolved
+    state["high_water"] = min(newest, started) if newest else newest
+    # Times older than the lookback window are never compared again
+    since = shift_time(state["high_water"], -LOOKBACK_SECONDS) if state["high_water"] else ""
+    state["fetched"] = {item_id: entry for item_id, entry in fetched.items() if entry[0] >= since}
+    save_state(state_file, state)
+
+
+# =============================================================================
+# Config & Main
+# =============================================================================
+
+def main():
+    config_path = Path.home() / ".claude" / "notion-exporter.config.json"
+    config = load_config(config_path) if config_path.exists() else {}
+
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(__doc__)
+        sys.exit(0 if sys.argv[1:] else 1)
+
+    space_name = sys.argv[1]
+    space_config = config.get("spaces", {}).get(space_name)
+    if not space_config:
+        logging.error(f"Unknown space: {space_name}")
+        sys.exit(1)
+
+    env_path = Path.home() / ".claude" / ".env"
+    load_dotenv(env_path, override=True)
+    api_key_env_var = space_config.get("apiKeyEnvVar")
+    api_key = os.getenv(api_key_env_var) if api_key_env_var else None
+    if not api_key:
+        logging.error(f"Missing {api_key_env_var or 'apiKeyEnvVar'} in {env_path}")
+        sys.exit(1)
+
+    target_path = resolve_path(space_config["targetPath"])
+    raw_export_path = target_path / space_config["rawExportPath"]
+    output_dir = target_path / "data" / "notion"
+    sync_dir = raw_export_path / SYNC_DIR
+    state_file = sync_dir / STATE_NAME
+
+    interval = float(get_option("--interval", space_config.get("syncInterval", DEFAULT_INTERVAL)))
+    concurrency = int(get_option("--concurrency", space_config.get("concurrency", 1)))
+    base_url = get_option("--base-url", space_config.get("baseUrl"))
+    exclude_patterns = space_config.get("excludePatterns", [])
+    once = "--once" in sys.argv
+
+    lock = acquire_lock(sync_dir)
+    try:
+        store = seed_store(raw_export_path, sync_dir)
+    except FileNotFoundError:
+        logging.error(f"No finished export in {raw_export_path}; run exporter.py first")
+        sys.exit(1)
+    state = load_state(state_file, store)
+
+    asset_cache = None
+    if space_config.get("assetCache", True) is not False:
+        cache_setting = space_config.get("assetCache")
+        cache_dir = resolve_path(cache_setting) if isinstance(cache_setting, str) else raw_export_path / ASSET_CACHE_NAME
+        asset_cache = AssetCache(cache_dir, int(space_config.get("assetCacheSize", DEFAULT_ASSET_CACHE_MB)) << 20)
+
+    if concurrency > 1:
+        client = AsyncRateLimitedClient(api_key, concurrency=concurrency, base_url=base_url)
+    else:
+        client = RateLimitedClient(api_key, base_url=base_url)
+    downloader = AssetDownloader(sync_dir / "assets", metrics=client.metrics, cache=asset_cache)
+
+    print(f"Syncing {space_name} into {output_dir}")
+    print(f"Store: {store.path}")
+    print(f"Since: {state.get('high_water') or 'the beginning'}")
+    if not once:
+        print(f"Every {interval:.0f}s (Ctrl-C to stop)")
+    print()
+
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                sync_cycle(client, store, state, state_file, downloader, exclude_patterns)
+                if state["pending"]:
+                    stats = patch_workspace(store, output_dir, state["pending"], sync_dir / "assets")
+                    logging.info(f"Synced {len(state['pending'])} pages: {stats['written']} files written")
+                    state["pending"] = []
+                if asset_cache:
+                    asset_cache.save()
+                state["cycles"] = state.get("cycles", 0) + 1
+                state["updated_at"] = utc_now()
+                save_state(state_file, state)
+                logging.info(f"Cycle {state['cycles']} done in {time.perf_counter() - started:.1f}s, "
+                             f"up to date as of {state['high_water']}")
+            except Exception as e:
+                # Keep watching: the cursor only moves once pages are stored,
+                # and stored pages stay pending until their Markdown is written
+                logging.error(f"Sync cycle failed: {e}")
+                if once:
+                    sys.exit(1)
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    finally:
+        downloader.close()
+        if client.is_async:
+            client.close()
+        store.close()
+        if lock:
+            lock.close()
+
+
+if __name__ == "__main__":
+    main()
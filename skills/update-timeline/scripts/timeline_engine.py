@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Timeline Engine - Source Discovery and Incremental Parsing
+
+Does the mechanical part of update-timeline: finds every source listed in
+sources/_registry.json, works out which ones are new or changed since the
+last run, parses only those, and prints one normalized, date-sorted event
+stream for merging into analysis/events-chronological.md.
+
+Each detected source unit (a Hyprnote session folder, a Notion transcript,
+a WhatsApp _chat.txt, a Hailer file) is stat'ed; units whose files kept
+their size and mtime are skipped without reading them, the rest are
+hashed and, when their content changed, parsed on a pool of worker
+processes. Parsed events are cached next to the state file, so unchanged
+units cost nothing on later runs.
+
+Events are printed as JSON lines sorted by timestamp:
+    {"ts": "2025-12-20T10:00:00Z", "source": "hyprnote", "type": "transcript",
+     "path": "data/transcripts/hyprnote/abc", "title": "...", "text": "...", ...}
+
+Usage:
+    python timeline_engine.py [--root .] [--state .claude/state/timeline-state.json]
+                              [--registry <skill>/sources/_registry.json] [--jobs N]
+                              [--all] [--output <events.ndjson>] [--dry-run]
+
+    --all       Print events of every source, not only new and changed ones
+    --dry-run   Report changes and print events without saving state
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_REGISTRY = SKILL_DIR / "sources" / "_registry.json"
+DEFAULT_STATE = ".claude/state/timeline-state.json"
+EVENTS_CACHE_NAME = "timeline-events.json"
+
+# Files making up one Hyprnote session, relative to its folder
+HYPRNOTE_FILES = ("_meta.json", "_transcript.json", "_memo.md")
+
+# [MM/DD/YY, HH:MM:SS] Sender: Message
+WHATSAPP_LINE = re.compile(
+    r"^\[(\d{1,2})/(\d{1,2})/(\d{2,4}),\s+(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([AP]M)?\]\s+([^:]+?):\s?(.*)$"
+)
+WHATSAPP_ATTACHMENT = re.compile(r"<attached:\s*([^>]+)>")
+HAILER_TIME = re.compile(r"^\d{1,2}:\d{2}$")
+# Timestamped names: 2025-12-12T01_00_00Z.md or WhatsApp folder export stamps
+NAME_TIMESTAMP = re.compile(r"(\d{4}-\d{2}-\d{2})(?:T(\d{2})_(\d{2})_(\d{2})Z)?")
+DIRECTION_MARKS = dict.fromkeys(map(ord, "\u200e\u200f\ufeff"))
+
+
+def get_option(name: str, default: str = None) -> str:
+    """Return the value following a command-line flag, or default."""
+    if name in sys.argv:
+        idx = sys.argv.index(name)
+        if idx + 1 < len(sys.argv):
+            return sys.argv[idx + 1]
+    return default
+
+
+def utc_now() -> str:
+    """Get current UTC time as an ISO 8601 string with Z suffix."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def write_json_atomic(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, path)
+
+
+# =============================================================================
+# Discovery
+# =============================================================================
+
+def load_registry(registry_file: Path) -> dict:
+    with open(registry_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def unit_files(source: dict, detected: Path) -> list:
+    """The files whose content makes up one detected source unit."""
+    if source.get("format", source["id"]) == "hyprnote":
+        return [detected.parent / name for name in HYPRNOTE_FILES
+                if (detected.parent / name).exists()]
+    return [detected]
+
+
+def unit_key(source: dict, detected: Path, root: Path) -> str:
+    """Stable key for a unit: the session folder for Hyprnote, else the file."""
+    path = detected.parent if source.get("format", source["id"]) == "hyprnote" else detected
+    return path.relative_to(root).as_posix()
+
+
+def discover(registry: dict, root: Path) -> list:
+    """Every source unit matching a registry detectPattern: [(source, key, files)]."""
+    units = []
+    for source in registry.get("sources", []):
+        excluded = {name.lower() for name in source.get("exclude", [])}
+        for detected in sorted(root.glob(source["detectPattern"])):
+            if detected.name.lower() in excluded or not detected.is_file():
+                continue
+            units.append((source, unit_key(source, detected, root), unit_files(source, detected)))
+    return units
+
+
+def unknown_sources(registry: dict, root: Path) -> list:
+    """Folders under unknownDataPaths that no registered detectPattern covers."""
+    known = [source["detectPattern"].split("*")[0].rstrip("/") for source in registry.get("sources", [])]
+    unknown = []
+    for pattern in registry.get("unknownDataPaths", []):
+        for folder in sorted(root.glob(pattern.rstrip("/"))):
+            rel = folder.relative_to(root).as_posix()
+            if folder.is_dir() and not any(k == rel or k.startswith(rel + "/") or rel.startswith(k + "/")
+                                           for k in known):
+                unknown.append(rel)
+    return unknown
+
+
+def signature(files: list) -> list:
+    """(name, size, mtime_ns) of each file: unchanged signature means unchanged unit."""
+    sig = []
+    for path in files:
+        stat = path.stat()
+        sig.append([path.name, stat.st_size, stat.st_mtime_ns])
+    return sig
+
+
+def hash_files(files: list) -> str:
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.name.encode() + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# =============================================================================
+# Parsers
+# =============================================================================
+
+def name_timestamp(name: str) -> str:
+    """ISO timestamp from a timestamped file/folder name, or None."""
+    match = NAME_TIMESTAMP.search(name)
+    if not match:
+        return None
+    day, hh, mm, ss = match.groups()
+    return f"{day}T{hh}:{mm}:{ss}Z" if hh else day
+
+
+def strip_frontmatter(text: str) -> str:
+    if text.startswith("---\n"):
+        end = text.find("\n---", 4)
+        if end != -1:
+            return text[end + 4:].lstrip("\n")
+    return text
+
+
+def parse_hyprnote(key: str, files: list) -> list:
+    """One transcript event per session: speaker turns plus the memo, if any."""
+    by_name = {path.name: path for path in files}
+    with open(by_name["_meta.json"], "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    turns, speakers = [], []
+    if "_transcript.json" in by_name:
+        with open(by_name["_transcript.json"], "r", encoding="utf-8") as f:
+            transcripts = json.load(f).get("transcripts", [])
+        # Every transcript of the session in order, as search_index.py reads them
+        channel, words = None, []
+        for transcript in transcripts:
+            for word in transcript.get("words", []):
+                if word.get("channel") != channel and words:
+                    turns.append({"speaker": channel, "text": "".join(words).strip()})
+                    words = []
+                channel = word.get("channel")
+                words.append(word.get("text", ""))
+        if words:
+            turns.append({"speaker": channel, "text": "".join(words).strip()})
+        speakers = sorted({turn["speaker"] for turn in turns}, key=str)
+
+    memo = None
+    if "_memo.md" in by_name:
+        memo = strip_frontmatter(by_name["_memo.md"].read_text(encoding="utf-8")).strip()
+
+    return [{
+        "ts": meta.get("created_at") or name_timestamp(Path(key).name),
+        "type": "transcript",
+        "title": meta.get("title") or "",
+        "session_id": meta.get("id"),
+        "participants": meta.get("participants", []),
+        "speakers": speakers,
+        "turns": turns,
+        "memo": memo,
+    }]
+
+
+def parse_markdown_transcript(key: str, files: list) -> list:
+    """One transcript event for a Markdown transcript dated by its file name."""
+    path = files[0]
+    text = strip_frontmatter(path.read_text(encoding="utf-8"))
+    heading = next((line[2:].strip() for line in text.splitlines() if line.startswith("# ")), "")
+    mtime = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+    return [{
+        "ts": name_timestamp(path.name) or mtime.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "type": "transcript",
+        "title": heading,
+        "text": text.strip(),
+    }]
+
+
+def whatsapp_timestamp(match) -> str:
+    month, day, year, hour, minute, second, ampm = match.groups()[:7]
+    year = int(year) + (2000 if len(year) == 2 else 0)
+    hour = int(hour)
+    if ampm:
+        hour = hour % 12 + (12 if ampm == "PM" else 0)
+    return f"{year:04d}-{int(month):02d}-{int(day):02d}T{hour:02d}:{minute}:{second or '00'}"
+
+
+def parse_whatsapp(key: str, files: list) -> list:
+    """One message event per chat message, read line by line.
+
+    Lines that do not start with a timestamp continue the previous message.
+    Timestamps are the exporting phone's local time (no zone).
+    """
+    events = []
+    with open(files[0], "r", encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n").translate(DIRECTION_MARKS)
+            match = WHATSAPP_LINE.match(line)
+            if not match:
+                if events and line:
+                    events[-1]["text"] += "\n" + line
+                continue
+            text = match.group(9)
+            event = {"ts": whatsapp_timestamp(match), "type": "message",
+                     "sender": match.group(8).strip(), "text": text, "line": number}
+            attachment = WHATSAPP_ATTACHMENT.search(text)
+            if attachment:
+                event["attachment"] = attachment.group(1).strip()
+            events.append(event)
+    return events
+
+
+def parse_hailer(key: str, files: list) -> list:
+    """One message event per Hailer message ("Username", "HH:MM", content lines).
+
+    Hailer pastes carry no message dates; the file name's upload date is
+    used and the event is marked date_from_upload.
+    """
+    path = files[0]
+    upload = name_timestamp(path.name)
+    if not upload:
+        upload = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).strftime("%Y-%m-%d")
+    day = upload[:10]
+
+    events = []
+    held = None  # (line number, text): a line is a sender only if a time line follows it
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n").translate(DIRECTION_MARKS).strip()
+            if held and held[1] and HAILER_TIME.match(line):
+                hour, minute = line.split(":")
+                events.append({"ts": f"{day}T{int(hour):02d}:{minute}", "type": "message",
+                               "sender": held[1], "text": "", "line": held[0],
+                               "date_from_upload": True})
+                held = None
+                continue
+            if held and events:
+                events[-1]["text"] += "\n" + held[1]
+            held = (number, line)
+    if held and events:
+        events[-1]["text"] += "\n" + held[1]
+    for event in events:
+        event["text"] = event["text"].strip()
+    return events
+
+
+PARSERS = {
+    "hyprnote": parse_hyprnote,
+    "markdown-transcript": parse_markdown_transcript,
+    "whatsapp": parse_whatsapp,
+    "hailer": parse_hailer,
+}
+
+
+def parse_unit(task: tuple) -> tuple:
+    """Worker task: (source id, format, key, file paths) -> (key, events, error)."""
+    source_id, fmt, key, paths = task
+    try:
+        events = PARSERS[fmt](key, [Path(p) for p in paths])
+    except Exception as e:
+        return key, [], f"{type(e).__name__}: {e}"
+    for seq, event in enumerate(events):
+        event["source"] = source_id
+        event["path"] = key
+        event["seq"] = seq
+    return key, events, None
+
+
+def parse_units(tasks: list, jobs: int) -> list:
+    """Parse units on `jobs` forked processes (in this process when jobs <= 1)."""
+    if jobs <= 1 or len(tasks) <= 1:
+        return [parse_unit(task) for task in tasks]
+    try:
+        pool = multiprocessing.get_context("fork").Pool(min(jobs, len(tasks)))
+    except ValueError:
+        logging.warning("Process fork not available, parsing in a single process")
+        return [parse_unit(task) for task in tasks]
+    with pool:
+        return list(pool.imap_unordered(parse_unit, tasks))
+
+
+# =============================================================================
+# Engine
+# =============================================================================
+
+def sort_key(event: dict) -> tuple:
+    return (event.get("ts") or "", event["source"], event["path"], event["seq"])
+
+
+def run(root: Path, registry: dict, state_file: Path, jobs: int = 1, emit_all: bool = False,
+        save: bool = True) -> tuple:
+    """Detect, parse and diff every registered source.
+
+    Returns (events, report): events of new and changed units (all units
+    with emit_all) sorted by timestamp, and per-status unit lists. State
+    is kept under "engine" in the timeline state file, leaving the
+    skill's own fields alone; parsed events are cached beside it.
+    """
+    state = {}
+    if state_file.exists():
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    engine = state.setdefault("engine", {})
+    known = engine.get("files", {})
+
+    cache_file = state_file.with_name(EVENTS_CACHE_NAME)
+    cache = {}
+    if cache_file.exists():
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+
+    report = {"new": [], "changed": [], "touched": [], "unchanged": [], "removed": [], "failed": []}
+    files_state = {}
+    tasks = []
+    unparsable = set()
+    for source, key, files in discover(registry, root):
+        fmt = source.get("format", source["id"])
+        if fmt not in PARSERS:
+            # Not tracked at all, so it is not reported as changed on every run
+            if source["id"] not in unparsable:
+                logging.warning(f"No parser for format '{fmt}' (source {source['id']})")
+                unparsable.add(source["id"])
+            continue
+        sig = signature(files)
+        previous = known.get(key)
+        record = {"source": source["id"], "signature": sig}
+        if previous and previous.get("signature") == sig and key in cache:
+            files_state[key] = previous
+            report["unchanged"].append(key)
+            continue
+        record["hash"] = hash_files(files)
+        files_state[key] = record
+        if previous and previous.get("hash") == record["hash"] and key in cache:
+            record["parsed_at"] = previous.get("parsed_at")
+            report["touched"].append(key)  # Same bytes, new mtime
+            continue
+        report["changed" if previous else "new"].append(key)
+        tasks.append((source["id"], fmt, key, [str(path) for path in files]))
+
+    for key, events, error in parse_units(tasks, jobs):
+        if error:
+            logging.error(f"Failed to parse {key}: {error}")
+            report["failed"].append(key)
+            # Keep the last good record and events; the old signature makes it retried next run
+            if key in known and key in cache:
+                files_state[key] = known[key]
+            else:
+                files_state.pop(key, None)
+            report["new" if key in report["new"] else "changed"].remove(key)
+            continue
+        cache[key] = events
+        files_state[key]["parsed_at"] = utc_now()
+        files_state[key]["events"] = len(events)
+
+    report["removed"] = sorted(known.keys() - files_state.keys() - set(report["failed"]))
+    for key in report["removed"]:
+        cache.pop(key, None)
+
+    emitted = set(files_state) if emit_all else set(report["new"]) | set(report["changed"])
+    events = [event for key in emitted for event in cache.get(key, [])]
+    events.sort(key=sort_key)
+
+    if save:
+        engine["files"] = files_state
+        engine["updated_at"] = utc_now()
+        write_json_atomic(cache_file, {key: cache[key] for key in sorted(files_state) if key in cache})
+        write_json_atomic(state_file, state)
+    return events, report
+
+
+def main():
+    if "-h" in sys.argv or "--help" in sys.argv:
+        print(__doc__)
+        sys.exit(0)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s", level=logging.INFO, stream=sys.stderr)
+
+    root = Path(get_option("--root", ".")).expanduser().resolve()
+    registry_file = Path(get_option("--registry", str(DEFAULT_REGISTRY))).expanduser()
+    state_file = root / get_option("--state", DEFAULT_STATE)
+    jobs = int(get_option("--jobs", str(os.cpu_count() or 1)))
+    output = get_option("--output")
+
+    registry = load_registry(registry_file)
+    for folder in unknown_sources(registry, root):
+        logging.warning(f"Unknown data source: {folder}/ (not in registry)")
+
+    events, report = run(root, registry, state_file, jobs, emit_all="--all" in sys.argv,
+                         save="--dry-run" not in sys.argv)
+
+    lines = (json.dumps(event, ensure_ascii=False) + "\n" for event in events)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
+
+    logging.info(", ".join(f"{len(keys)} {status}" for status, keys in report.items())
+                 + f"; {len(events)} events")
+    for status in ("new", "changed", "removed", "failed"):
+        for key in report[status]:
+            logging.info(f"  {status}: {key}")
+
+
+if __name__ == "__main__":
+    main()